@@ -1,4 +1,5 @@
 import time
+from contextlib import asynccontextmanager
 
 import alembic.config
 from fastapi import FastAPI, Request
@@ -8,12 +9,21 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from app_environment import AppEnvironment
 from controllers import api_router
 from env import env
+from services.features.product_intelligence.crawler.shopee_scraper import ShopeeScraper
 
 # Migrate the database to its latest version
 # Not thread safe, so it should be update once we are running multiple instances
 alembic.config.main(argv=["--raiseerr", "upgrade", "head"])
 
-app = FastAPI(debug=env.APP_DEBUG)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Pooled Chrome instances outlive requests; quit them with the app
+    ShopeeScraper.shutdown_driver_pools()
+
+
+app = FastAPI(debug=env.APP_DEBUG, lifespan=lifespan)
 
 # Add a simple request logging middleware
 class RequestLoggingMiddleware(BaseHTTPMiddleware):
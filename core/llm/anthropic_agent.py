@@ -24,14 +24,20 @@ class AnthropicAgent(BaseAgent):
         response_schema: Optional[Any] = None,
         json_mode: bool = False,
         timeout: Optional[float] = 30.0,
+        system: Optional[str] = None,
     ) -> LLMResponse:
+        kwargs = {}
+        if system:
+            kwargs["system"] = system
+
         try:
             response = self.client.messages.create(
                 model=self._model,
                 messages=[{"role": "user", "content": prompt}],
                 tools=tools,
                 max_tokens=4096,
-                timeout=timeout
+                timeout=timeout,
+                **kwargs
             )
 
             # Anthropic trả về content dạng list
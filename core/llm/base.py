@@ -15,9 +15,13 @@ class BaseAgent(ABC):
         tools: Optional[list] = None, 
         response_schema: Optional[Any] = None,
         json_mode: bool = False,
-        timeout: Optional[float] = 30.0
+        timeout: Optional[float] = 30.0,
+        system: Optional[str] = None
     ) -> LLMResponse:
-        """Generate content using LLM"""
+        """
+        Generate content using LLM.
+        `system` is sent as the provider's system prompt.
+        """
         pass
 
     @abstractmethod
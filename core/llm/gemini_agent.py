@@ -73,9 +73,11 @@ class GeminiAgent(BaseAgent):
         tools: Optional[list] = None, 
         response_schema: Optional[Any] = None, 
         json_mode: bool = False,
-        timeout: Optional[float] = 30.0
+        timeout: Optional[float] = 30.0,
+        system: Optional[str] = None
     ) -> LLMResponse:
         config = types.GenerateContentConfig(
+            system_instruction=system,
             tools=tools,
             response_mime_type="application/json" if json_mode or response_schema else None,
             response_schema=response_schema,
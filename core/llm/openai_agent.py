@@ -23,11 +23,16 @@ class OpenAIAgent(BaseAgent):
         response_schema: Optional[Any] = None,
         json_mode: bool = False,
         timeout: Optional[float] = 30.0,
+        system: Optional[str] = None,
     ) -> LLMResponse:
+        messages = [{"role": "user", "content": prompt}]
+        if system:
+            messages.insert(0, {"role": "system", "content": system})
+
         try:
             response = self.client.chat.completions.create(
                 model=self._model,
-                messages=[{"role": "user", "content": prompt}],
+                messages=messages,
                 tools=tools,
                 response_format=(
                     {"type": "json_object"} if (json_mode or response_schema) else None
@@ -30,6 +30,14 @@ class Settings:
     REDIS_DB: int = int(os.getenv("REDIS_DB", "0"))
     REDIS_PASSWORD: Optional[str] = os.getenv("REDIS_PASSWORD", None)
     
+    # Shopee Playwright search: headful by default (Shopee detects and blocks headless); set true only for testing
+    SHOPEE_PLAYWRIGHT_HEADLESS: bool = os.getenv("SHOPEE_PLAYWRIGHT_HEADLESS", "false").lower() == "true"
+    
+    # LLM parse cache: exact matches on normalized text; semantic lookup is opt-in and needs sentence-transformers
+    LLM_CACHE_SEMANTIC_ENABLED: bool = os.getenv("LLM_CACHE_SEMANTIC_ENABLED", "false").lower() == "true"
+    LLM_CACHE_EMBEDDING_MODEL: str = os.getenv("LLM_CACHE_EMBEDDING_MODEL", "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
+    LLM_CACHE_MAX_VECTORS: int = int(os.getenv("LLM_CACHE_MAX_VECTORS", "2048"))
+    
     @classmethod
     def validate_admin_secret_key(cls, key: str) -> bool:
         """Validate admin secret key"""
@@ -146,3 +146,18 @@ Trả về JSON (chỉ JSON thuần, không markdown):
 """
 
 
+
+# Shared system prompt for every LLM call of one project, rendered from stable project fields only.
+# Only project context belongs here - task rules stay in each task's own prompt.
+PROJECT_CONTEXT_SYSTEM_PROMPT = """
+Bạn là trợ lý AI của hệ thống Sale Smart AI, hỗ trợ nghiên cứu và lựa chọn sản phẩm trên các sàn thương mại điện tử Việt Nam.
+
+Bối cảnh dự án:
+- Tên dự án: {name}
+- Mô tả dự án: {description}
+- Sản phẩm mục tiêu: {target_product_name}
+- Danh mục sản phẩm: {target_product_category}
+- Ngân sách mục tiêu: {target_budget_range}
+- Đơn vị tiền tệ: {currency}
+- Loại pipeline: {pipeline_type}
+"""
@@ -1,7 +1,8 @@
-from typing import List, Optional, Type, TypedDict
+from typing import List, Optional, Set, Type, TypedDict
 from uuid import UUID
 
 from sqlalchemy import or_, and_
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from models.product import Product
@@ -90,3 +91,25 @@ class ProductRepository(BaseRepository[Product, ProductCreate, ProductUpdate]):
             .limit(limit)
             .all()
         )
+
+    def get_existing_urls(self, project_id: UUID, urls: List[str]) -> Set[str]:
+        """Return which of the given URLs already exist in the project (single query)"""
+        if not urls:
+            return set()
+        rows = (
+            self.db.query(Product.url)
+            .filter(Product.project_id == project_id, Product.url.in_(urls))
+            .all()
+        )
+        return {row.url for row in rows}
+
+    def bulk_create(self, rows: List[dict]) -> None:
+        """Insert many products in one round-trip; rows must already carry their ids"""
+        if not rows:
+            return
+        try:
+            self.db.bulk_insert_mappings(Product, rows)
+            self.db.commit()
+        except SQLAlchemyError:
+            self.db.rollback()
+            raise
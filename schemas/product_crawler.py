@@ -1,3 +1,4 @@
+from functools import cached_property
 from uuid import UUID
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
@@ -85,4 +86,9 @@ class CrawledProductItemExtended(BaseModel):
     image_urls: List[str] = []
     
     # Additional metadata
-    metadata: Dict[str, Any] = {}
\ No newline at end of file
+    metadata: Dict[str, Any] = {}
+    
+    @cached_property
+    def product_name_lower(self) -> str:
+        """Lowercased product name, computed once per instance (keyword filters/matching)"""
+        return self.product_name.lower() if self.product_name else ""
\ No newline at end of file
@@ -31,6 +31,11 @@ class ProductService(BaseService[Product, ProductCreate, ProductUpdate, ProductR
         if not permission_service.has_permission(user_id, "project:manage_products", payload.project_id):
             raise ValueError("You don't have permission to add products to this project")
         
+        self.normalize_payload(payload)
+        return self.create(payload=payload)
+
+    def normalize_payload(self, payload: ProductCreate) -> ProductCreate:
+        """Clean URL, detect platform and default the price, in place"""
         # Clean URL
         if payload.url:
              payload.url = self._clean_url(payload.url)
@@ -50,7 +55,7 @@ class ProductService(BaseService[Product, ProductCreate, ProductUpdate, ProductR
         if payload.current_price is None:
             payload.current_price = 0.0
 
-        return self.create(payload=payload)
+        return payload
 
     def update_product(self, product_id: uuid.UUID, payload: ProductUpdate, user_id: uuid.UUID) -> Optional[Product]:
         """Update product"""
@@ -1,5 +1,8 @@
 import uuid
+from dataclasses import dataclass
+from decimal import Decimal
 from typing import List, Optional
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from models.project import Project
 from repositories.project import ProjectFilters, ProjectRepository
@@ -9,10 +12,40 @@ from shared.enums import ProjectStatusEnum
 from .base import BaseService
 from .permission import PermissionService
 
+@dataclass(frozen=True, slots=True)
+class ProjectInfoDTO:
+    """Read-only projection of the project columns used by AI pipelines"""
+    name: str
+    description: Optional[str]
+    target_product_name: str
+    target_product_category: Optional[str]
+    target_budget_range: Optional[Decimal]
+    currency: Optional[str]
+    status: Optional[str]
+    pipeline_type: Optional[str]
+    assigned_model_id: Optional[uuid.UUID]
+
+
 class ProjectService(BaseService[Project, ProjectCreate, ProjectUpdate, ProjectRepository]):
     def __init__(self, db: Session):
         super().__init__(db, Project, ProjectRepository)
 
+    def get_info(self, project_id: uuid.UUID) -> Optional[ProjectInfoDTO]:
+        """Load only the columns in ProjectInfoDTO, bypassing the ORM identity map"""
+        stmt = select(
+            Project.name,
+            Project.description,
+            Project.target_product_name,
+            Project.target_product_category,
+            Project.target_budget_range,
+            Project.currency,
+            Project.status,
+            Project.pipeline_type,
+            Project.assigned_model_id,
+        ).where(Project.id == project_id)
+        row = self.db.execute(stmt).one_or_none()
+        return ProjectInfoDTO(*row) if row else None
+
     def update_project(self, project_id: uuid.UUID, payload: ProjectUpdate, user_id: uuid.UUID) -> Optional[Project]:
         """Update project"""
         db_project = self.get(project_id)
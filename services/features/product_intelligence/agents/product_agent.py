@@ -1,5 +1,6 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from uuid import UUID
+import asyncio
 import logging
 import re
 from sqlalchemy.orm import Session
@@ -26,7 +27,8 @@ class ProductAIAgent:
         project_info: Dict[str, Any], 
         user_id: UUID, 
         limit: int = 10,
-        platform: str = "all"
+        platform: str = "all",
+        system: Optional[str] = None
     ) -> ProductSearchResponse:
         search_keyword, budget, description = self._extract_project_data(project_info)
         
@@ -44,7 +46,8 @@ class ProductAIAgent:
             description=description,
             budget=budget,
             limit=limit,
-            platform=platform
+            platform=platform,
+            system=system
         )
         
         # Handle failures
@@ -70,6 +73,24 @@ class ProductAIAgent:
             limit=limit
         )
     
+    async def asearch_products(
+        self, 
+        project_info: Dict[str, Any], 
+        user_id: UUID, 
+        limit: int = 10,
+        platform: str = "all",
+        system: Optional[str] = None
+    ) -> ProductSearchResponse:
+        """Async variant of search_products; the blocking LLM calls run in a worker thread"""
+        return await asyncio.to_thread(
+            self.search_products,
+            project_info=project_info,
+            user_id=user_id,
+            limit=limit,
+            platform=platform,
+            system=system
+        )
+    
     @staticmethod
     def _extract_project_data(project_info: Dict[str, Any]) -> tuple:
         """Extract relevant data from project info with safe parsing"""
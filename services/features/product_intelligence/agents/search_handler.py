@@ -1,5 +1,5 @@
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from core.llm.base import BaseAgent
 from core.llm.utils import safe_json_parse
 from prompts.product_ai import ANALYZE_PRODUCTS_PROMPT, GENERATE_LINKS_PROMPT
@@ -28,18 +28,20 @@ class SearchHandler:
         description: str,
         budget: float,
         limit: int = 10,
-        platform: str = "all"
+        platform: str = "all",
+        system: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Execute 2-step search flow:
         Step 1: LLM analyzes and recommends prominent products
         Step 2: LLM generates Shopee links for those products
+        Both steps receive the same project-context `system` prompt
         """
         budget_text = f"{budget:,.0f} VND" if budget else "không giới hạn"
         
         # Step 1: Analyze and find prominent products
         analysis_result, grounding_metadata_1 = self._analyze_products(
-            search_keyword, description, budget_text, limit
+            search_keyword, description, budget_text, limit, system
         )
         
         if "error" in analysis_result or not analysis_result.get("products"):
@@ -55,7 +57,8 @@ class SearchHandler:
         # Step 2: Generate ecommerce links for analyzed products
         products_with_links, grounding_metadata_2 = self._generate_links(
             analysis_result.get("products", []),
-            platform=platform
+            platform=platform,
+            system=system
         )
         
         # Combine results
@@ -82,7 +85,8 @@ class SearchHandler:
         search_keyword: str, 
         description: str, 
         budget_text: str,
-        limit: int
+        limit: int,
+        system: Optional[str] = None
     ) -> tuple:
         """
         Step 1: Use LLM with grounding to find and analyze prominent products
@@ -116,7 +120,8 @@ class SearchHandler:
                 response = self.llm.generate(
                     prompt=prompt,
                     tools=search_tools,
-                    timeout=90.0  # Increased timeout for grounding search
+                    timeout=90.0,  # Increased timeout for grounding search
+                    system=system
                 )
                 
                 # Debug: Log raw response
@@ -164,7 +169,12 @@ class SearchHandler:
         # Should not reach here
         return {"error": "Unknown error", "products": []}, None
     
-    def _generate_links(self, products: List[Dict[str, Any]], platform: str = "all") -> tuple:
+    def _generate_links(
+        self,
+        products: List[Dict[str, Any]],
+        platform: str = "all",
+        system: Optional[str] = None
+    ) -> tuple:
         """
         Step 2: Use LLM to generate simple ecommerce search links for products
         Supports: shopee, lazada, tiki, or all platforms
@@ -194,7 +204,8 @@ class SearchHandler:
                 response = self.llm.generate(
                     prompt=prompt,
                     tools=None,
-                    timeout=30.0  # Reduced timeout (no grounding needed)
+                    timeout=30.0,  # Reduced timeout (no grounding needed)
+                    system=system
                 )
                 
                 result = safe_json_parse(response.text)
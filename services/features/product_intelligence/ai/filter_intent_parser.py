@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 from typing import Optional, Tuple
@@ -136,6 +137,10 @@ Trả về JSON format:
             else:
                 return None, f"Không thể phân tích yêu cầu: {error_str}"
     
+    async def aparse_user_intent(self, user_text: str) -> Tuple[Optional[ProductFilterCriteria], Optional[str]]:
+        """Async variant of parse_user_intent; the blocking LLM call runs in a worker thread"""
+        return await asyncio.to_thread(self.parse_user_intent, user_text)
+    
     def _validate_criteria(self, criteria: ProductFilterCriteria) -> Optional[str]:
         """Validate that criteria makes logical sense"""
         
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 from typing import Optional, Tuple
@@ -18,11 +19,15 @@ class FilterCriteriaValidator:
     def validate_criteria(
         self, 
         user_text: str, 
-        criteria: ProductFilterCriteria
+        criteria: ProductFilterCriteria,
+        system: Optional[str] = None
     ) -> Tuple[bool, Optional[str]]:
         """
         Validate that extracted criteria matches user intent
         
+        Args:
+            system: Shared project-context system prompt
+        
         Returns:
             (is_valid, error_message)
         """
@@ -66,7 +71,8 @@ Trả về JSON:
             response = self.llm.generate(
                 prompt=prompt,
                 json_mode=True,
-                timeout=30.0
+                timeout=30.0,
+                system=system
             )
             
             result = safe_json_parse(response.text)
@@ -86,4 +92,13 @@ Trả về JSON:
             logger.error(f"Validation failed: {str(e)}", exc_info=True)
             # If validation fails, assume invalid
             return False, f"Không thể xác thực yêu cầu: {str(e)}"
+    
+    async def avalidate_criteria(
+        self, 
+        user_text: str, 
+        criteria: ProductFilterCriteria,
+        system: Optional[str] = None
+    ) -> Tuple[bool, Optional[str]]:
+        """Async variant of validate_criteria; the blocking LLM call runs in a worker thread"""
+        return await asyncio.to_thread(self.validate_criteria, user_text, criteria, system)
 
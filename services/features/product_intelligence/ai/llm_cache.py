@@ -0,0 +1,214 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+import unicodedata
+from typing import Any, Callable, List, Optional, Tuple
+
+from core.cache import get_cache
+from core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Embedding lookup is optional and off by default (settings.LLM_CACHE_SEMANTIC_ENABLED);
+# without it, or without sentence-transformers, only normalized exact matches hit
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+_SPACE_RE = re.compile(r"\s+")
+# Numbers and symbols ("<", ">", "-", "%") carry the filter intent: a semantic hit must repeat them exactly
+_INTENT_TOKEN_RE = re.compile(r"\d+|[^\w\s]+")
+
+
+def normalize_text(text: str) -> str:
+    """Fold case and whitespace only; punctuation is kept because "< 500k" and "> 500k" differ"""
+    text = unicodedata.normalize("NFC", text).lower()
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def cache_scope(*parts: Any) -> str:
+    """Stable digest of every non-text input a cached parse depends on (ids, project fields, budgets)"""
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class _VectorStore:
+    """
+    Inner-product index over L2-normalized embeddings (cosine similarity).
+
+    Entries expire after `ttl` seconds and only the newest `max_entries` are kept.
+    Entries are appended in time order with one TTL, so both evictions drop a prefix.
+    """
+
+    def __init__(self, dim: int, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._index = faiss.IndexFlatIP(dim) if faiss is not None else None
+        self._vectors = np.empty((0, dim), dtype="float32")
+        # (scope, cache_key, normalized text, expires_at)
+        self._entries: List[Tuple[str, str, str, float]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self, now: float, reserve: int = 0) -> None:
+        drop = 0
+        while drop < len(self._entries) and self._entries[drop][3] <= now:
+            drop += 1
+        drop = max(drop, len(self._entries) + reserve - self.max_entries)
+        if drop <= 0:
+            return
+        self._entries = self._entries[drop:]
+        self._vectors = self._vectors[drop:]
+        if self._index is not None:
+            self._index.reset()
+            if len(self._vectors):
+                self._index.add(self._vectors)
+
+    def add(self, vector: Any, scope: str, cache_key: str, normalized: str) -> None:
+        now = time.time()
+        self._evict(now, reserve=1)
+        vector = vector.reshape(1, -1).astype("float32")
+        if self._index is not None:
+            self._index.add(vector)
+        self._vectors = np.vstack([self._vectors, vector])
+        self._entries.append((scope, cache_key, normalized, now + self.ttl))
+
+    def search(self, vector: Any, scope: str, normalized: str, threshold: float, k: int = 5) -> Optional[str]:
+        self._evict(time.time())
+        if not self._entries:
+            return None
+        vector = vector.reshape(1, -1).astype("float32")
+        if self._index is not None:
+            scores, ids = self._index.search(vector, min(k, len(self._entries)))
+            candidates = zip(scores[0], ids[0])
+        else:
+            scores = self._vectors @ vector[0]
+            top = np.argsort(-scores)[:k]
+            candidates = zip(scores[top], top)
+        tokens = _INTENT_TOKEN_RE.findall(normalized)
+        for score, idx in candidates:
+            if score < threshold:
+                break
+            entry_scope, cache_key, entry_text, _ = self._entries[idx]
+            # Near-identical embeddings may still differ in a price/rating/count or a comparison;
+            # those must never share a parse
+            if entry_scope == scope and _INTENT_TOKEN_RE.findall(entry_text) == tokens:
+                return cache_key
+        return None
+
+
+class SemanticLLMCache:
+    """
+    Cache LLM parse results keyed on (scope, normalized input).
+
+    Exact matches on the normalized text are served from the shared MemoryCache.
+    With semantic lookup enabled, inputs whose embedding has cosine similarity
+    >= threshold with a stored input in the same scope, and which contain the same
+    numbers and symbols, are served as well. Callers put everything the parser
+    reads besides the text into `scope`.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        embedder: Optional[Callable[[str], Any]] = None,
+        threshold: float = 0.92,
+        ttl: int = 3600,
+        semantic: Optional[bool] = None,
+        max_vectors: Optional[int] = None
+    ):
+        self.namespace = namespace
+        self.threshold = threshold
+        self.ttl = ttl
+        self.semantic = settings.LLM_CACHE_SEMANTIC_ENABLED if semantic is None else semantic
+        self.max_vectors = max_vectors or settings.LLM_CACHE_MAX_VECTORS
+        self._embedder = embedder
+        self._store: Optional[_VectorStore] = None
+        self._lock = threading.Lock()
+
+    def _key(self, scope: str, normalized: str) -> str:
+        digest = hashlib.sha1(f"{scope}\x00{normalized}".encode("utf-8")).hexdigest()
+        return f"llm_cache:{self.namespace}:{digest}"
+
+    def _embed(self, normalized: str) -> Optional[Any]:
+        if not self.semantic:
+            return None
+        if self._embedder is None:
+            self._embedder = _default_embedder()
+        if not self._embedder:
+            return None
+        try:
+            return self._embedder(normalized)
+        except Exception as e:
+            logger.warning(f"Embedding failed, skipping semantic lookup: {str(e)}")
+            return None
+
+    def get(self, text: str, scope: str = "") -> Optional[Any]:
+        normalized = normalize_text(text)
+        cache = get_cache()
+        value = cache.get(self._key(scope, normalized))
+        if value is not None:
+            return value
+
+        vector = self._embed(normalized)
+        if vector is None:
+            return None
+        with self._lock:
+            if self._store is None:
+                return None
+            cache_key = self._store.search(vector, scope, normalized, self.threshold)
+        return cache.get(cache_key) if cache_key else None
+
+    def set(self, text: str, value: Any, scope: str = "") -> None:
+        normalized = normalize_text(text)
+        cache_key = self._key(scope, normalized)
+        get_cache().set(cache_key, value, ex=self.ttl)
+
+        vector = self._embed(normalized)
+        if vector is None:
+            return
+        with self._lock:
+            if self._store is None:
+                self._store = _VectorStore(vector.shape[-1], self.max_vectors, self.ttl)
+            self._store.add(vector, scope, cache_key, normalized)
+
+
+_default_model = None
+_default_model_lock = threading.Lock()
+
+
+def _default_embedder() -> Any:
+    """Load the shared sentence-transformers model once; returns False when unavailable"""
+    global _default_model
+    if _default_model is None:
+        with _default_model_lock:
+            if _default_model is None:
+                if SentenceTransformer is None or not settings.LLM_CACHE_EMBEDDING_MODEL:
+                    _default_model = False
+                else:
+                    try:
+                        model = SentenceTransformer(settings.LLM_CACHE_EMBEDDING_MODEL)
+                        _default_model = lambda text: model.encode(text, normalize_embeddings=True)
+                    except Exception as e:
+                        logger.warning(f"Failed to load embedding model for LLM cache: {str(e)}")
+                        _default_model = False
+    return _default_model
+
+
+nl_parse_cache = SemanticLLMCache("nl_parse")
+filter_intent_cache = SemanticLLMCache("filter_intent")
@@ -1,17 +1,22 @@
 import logging
-from uuid import UUID
-from typing import List, Optional
+from uuid import UUID, uuid4
+from typing import Iterator, List, Optional, Tuple
 
 from sqlalchemy.orm import Session
 
 from schemas.product_crawler import CrawledProductItemExtended
 from schemas.product import ProductCreate
 from services.core.product import ProductService
+from services.core.permission import PermissionService
 from repositories.product import ProductRepository
 from models.product import Product
 
 logger = logging.getLogger(__name__)
 
+IMPORT_BATCH_SIZE = 50
+# Small imports are split into about this many commits so progress events track real inserts
+IMPORT_PROGRESS_STEPS = 5
+
 
 class AutoImportService:
     """Automatically import filtered products to database"""
@@ -30,68 +35,106 @@ class AutoImportService:
     ) -> List[UUID]:
         """Import products to database"""
         
-        imported_ids = []
+        return [
+            product_id
+            for product_id, _ in self.iter_import_products(products, project_id, user_id, crawl_session_id)
+            if product_id is not None
+        ]
+    
+    def iter_import_products(
+        self,
+        products: List[CrawledProductItemExtended],
+        project_id: UUID,
+        user_id: UUID,
+        crawl_session_id: Optional[UUID] = None
+    ) -> Iterator[Tuple[Optional[UUID], int]]:
+        """
+        Import products in batches, yielding after each product once its batch is committed.
+        Batches hold at most IMPORT_BATCH_SIZE products and are sized from len(products) so a
+        small import still commits in ~IMPORT_PROGRESS_STEPS steps instead of one.
+        
+        Yields:
+            (product_id, index) - product_id is None when the product was skipped or failed,
+            index is 1-based
+        """
+        
+        # Permission is per project, so check it once instead of once per product
+        permission_service = PermissionService(self.db)
+        if not permission_service.has_permission(user_id, "project:manage_products", project_id):
+            logger.warning(f"Failed to import products: user {user_id} cannot manage products of project {project_id}")
+            for index in range(1, len(products) + 1):
+                yield None, index
+            return
+        
+        # One SELECT for all duplicate checks (within same project)
+        cleaned_urls = [self._clean_url(p.product_url) for p in products]
+        seen_urls = self.product_repo.get_existing_urls(project_id, list(set(cleaned_urls)))
+        
+        imported_count = 0
         skipped_duplicates = 0
         failed_imports = 0
+        batch_size = max(1, min(IMPORT_BATCH_SIZE, -(-len(products) // IMPORT_PROGRESS_STEPS)))
         
-        for product_data in products:
-            try:
-                # Check for duplicate by URL (within same project)
-                cleaned_url = self._clean_url(product_data.product_url)
-                existing_products = self.product_repo.get_multi(
-                    filters={"project_id": project_id, "url": cleaned_url},
-                    limit=1
-                )
-                
-                if existing_products:
+        for batch_start in range(0, len(products), batch_size):
+            rows = []
+            outcomes = []
+            
+            batch = zip(
+                products[batch_start:batch_start + batch_size],
+                cleaned_urls[batch_start:batch_start + batch_size]
+            )
+            for index, (product_data, cleaned_url) in enumerate(batch, batch_start + 1):
+                if cleaned_url in seen_urls:
                     skipped_duplicates += 1
                     logger.debug(f"Skipping duplicate product: {product_data.product_url}")
+                    outcomes.append((None, index))
                     continue
                 
-                # Convert crawled data to ProductCreate schema
-                product_create = ProductCreate(
-                    project_id=project_id,
-                    crawl_session_id=crawl_session_id,
-                    name=product_data.product_name,
-                    brand=product_data.brand,
-                    category=product_data.category,
-                    subcategory=product_data.subcategory,
-                    platform=product_data.platform,
-                    url=product_data.product_url,
-                    current_price=product_data.price_current,
-                    original_price=product_data.price_original,
-                    discount_rate=product_data.discount_rate,
-                    currency="VND",
-                    data_source="auto_crawl"
-                )
-                
-                # Create product
-                product = self.product_service.create_product(
-                    payload=product_create,
-                    user_id=user_id
-                )
-                
-                imported_ids.append(product.id)
-                logger.debug(f"Imported product: {product.id} - {product.name}")
+                try:
+                    # Convert crawled data to ProductCreate schema
+                    product_create = ProductCreate(
+                        project_id=project_id,
+                        crawl_session_id=crawl_session_id,
+                        name=product_data.product_name,
+                        brand=product_data.brand,
+                        category=product_data.category,
+                        subcategory=product_data.subcategory,
+                        platform=product_data.platform,
+                        url=product_data.product_url,
+                        current_price=product_data.price_current,
+                        original_price=product_data.price_original,
+                        discount_rate=product_data.discount_rate,
+                        currency="VND",
+                        data_source="auto_crawl"
+                    )
+                except ValueError as e:
+                    # Validation errors
+                    failed_imports += 1
+                    logger.warning(f"Failed to import product {product_data.product_url}: {str(e)}")
+                    outcomes.append((None, index))
+                    continue
                 
-            except ValueError as e:
-                # Permission or validation errors
-                failed_imports += 1
-                logger.warning(f"Failed to import product {product_data.product_url}: {str(e)}")
-                continue
+                row = self.product_service.normalize_payload(product_create).model_dump()
+                row["id"] = uuid4()
+                rows.append(row)
+                seen_urls.add(cleaned_url)
+                outcomes.append((row["id"], index))
+            
+            try:
+                self.product_repo.bulk_create(rows)
+                imported_count += len(rows)
             except Exception as e:
-                # Other errors
-                failed_imports += 1
-                logger.error(f"Failed to import product {product_data.product_url}: {str(e)}", exc_info=True)
-                continue
+                failed_imports += len(rows)
+                logger.error(f"Failed to import batch of {len(rows)} products: {str(e)}", exc_info=True)
+                outcomes = [(None, index) for _, index in outcomes]
+            
+            yield from outcomes
         
         logger.info(
-            f"Import completed: {len(imported_ids)} imported, "
+            f"Import completed: {imported_count} imported, "
             f"{skipped_duplicates} duplicates skipped, "
             f"{failed_imports} failed"
         )
-        
-        return imported_ids
     
     def _clean_url(self, url: str) -> str:
         """Clean URL for duplicate checking (same as ProductService)"""
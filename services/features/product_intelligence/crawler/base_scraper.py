@@ -3,6 +3,10 @@ from typing import List, Dict, Any, Optional
 from schemas.product_crawler import CrawledProductItem, CrawledProductDetail
 
 class BaseScraper(ABC):
+    def warmup(self) -> None:
+        """Open the keep-alive connection to the platform ahead of the first crawl. No-op by default."""
+        pass
+
     @abstractmethod
     def crawl_search_results(self, search_url: str, max_products: int = 10) -> List[CrawledProductItem]:
         pass
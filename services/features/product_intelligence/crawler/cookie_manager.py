@@ -5,6 +5,8 @@ Manages cookies to avoid re-login on every request
 
 import json
 import os
+import hashlib
+import threading
 import time
 from typing import List, Dict, Optional
 from pathlib import Path
@@ -30,8 +32,20 @@ class CookieManager:
         self.cookies_dir.mkdir(parents=True, exist_ok=True)
         
         self.cookie_file = self.cookies_dir / f"shopee_{account_name}.json"
+        self._last_hash: Optional[bytes] = None
+        # Các thread crawl song song dùng chung manager; ghi file tuần tự để không lẫn nội dung
+        self._save_lock = threading.Lock()
         logger.info(f"Cookie file: {self.cookie_file}")
     
+    @staticmethod
+    def _hash_cookies(cookies: List[Dict]) -> bytes:
+        """Hash (name, value, domain) của cookies, không phụ thuộc thứ tự"""
+        key = sorted(
+            (c.get("name") or "", c.get("value") or "", c.get("domain") or "")
+            for c in cookies
+        )
+        return hashlib.blake2b(repr(key).encode("utf-8"), digest_size=16).digest()
+    
     def save_cookies(self, cookies: List[Dict]) -> None:
         """
         Lưu cookies vào file
@@ -46,14 +60,30 @@ class CookieManager:
         }
         
         try:
-            with open(self.cookie_file, "w", encoding="utf-8") as f:
-                json.dump(cookie_data, f, indent=2)
+            with self._save_lock:
+                with open(self.cookie_file, "w", encoding="utf-8") as f:
+                    json.dump(cookie_data, f, indent=2)
+                self._last_hash = self._hash_cookies(cookies)
             logger.info(f"✅ Saved {len(cookies)} cookies for account '{self.account_name}'")
             print(f"[COOKIE MANAGER] ✅ Saved {len(cookies)} cookies")
         except Exception as e:
             logger.error(f"Failed to save cookies: {e}")
             print(f"[COOKIE MANAGER] ❌ Failed to save cookies: {e}")
     
+    def save_cookies_if_changed(self, cookies: List[Dict]) -> bool:
+        """
+        Chỉ ghi file khi cookies khác lần load/save trước
+        
+        Returns:
+            True nếu đã ghi file
+        """
+        if self._last_hash is not None and self._hash_cookies(cookies) == self._last_hash:
+            logger.debug("Cookies unchanged, skip saving")
+            return False
+        
+        self.save_cookies(cookies)
+        return True
+    
     def load_cookies(self) -> Optional[List[Dict]]:
         """
         Load cookies từ file
@@ -81,6 +111,7 @@ class CookieManager:
                 print(f"[COOKIE MANAGER] ⚠️  Cookies are {age_hours:.1f} hours old")
                 return None
             
+            self._last_hash = self._hash_cookies(cookies)
             logger.info(f"✅ Loaded {len(cookies)} cookies (age: {age_hours:.1f} hours)")
             print(f"[COOKIE MANAGER] ✅ Loaded {len(cookies)} cookies ({age_hours:.1f}h old)")
             return cookies
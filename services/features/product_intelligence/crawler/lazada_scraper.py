@@ -1,15 +1,24 @@
 import re
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import urllib.parse
+import base64
 import json
+import sys
 from typing import List, Dict, Any, Optional
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 import time
+from contextlib import suppress
+from itertools import islice
 
 from services.features.product_intelligence.crawler.base_scraper import BaseScraper
 from schemas.product_crawler import CrawledProductItem, CrawledProductDetail, CrawledReview
 
+# Shared defaults for review fields that are missing on most Lazada reviews
+_ANONYMOUS = sys.intern("Anonymous")
+
 
 class LazadaScraper(BaseScraper):
     def __init__(self):
@@ -18,6 +27,22 @@ class LazadaScraper(BaseScraper):
             "Referer": "https://www.lazada.vn/",
             "X-Requested-With": "XMLHttpRequest",
         }
+        # Plain page/catalog requests must not look like XHR
+        self.page_headers = {k: v for k, v in self.headers.items() if k != "X-Requested-With"}
+        # Keep-alive pool shared by every HTTP call of this scraper instance
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=8,
+            max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504]),
+        ))
+
+    def warmup(self) -> None:
+        # HEAD on the homepage leaves a live TLS connection (and cookies) in the session pool
+        try:
+            self._session.head("https://www.lazada.vn/", headers=self.page_headers, timeout=5)
+        except requests.RequestException:
+            pass
 
     def crawl_search_results(self, search_url: str, max_products: int = 10) -> List[CrawledProductItem]:
         query = None
@@ -69,44 +94,42 @@ class LazadaScraper(BaseScraper):
 
                     html_products = self._parse_html_products(driver.page_source, max_products)
                     if html_products:
-                        driver.quit()
                         return html_products
 
-                    driver.get(api_url)
-                    time.sleep(3)
-
-                    content = None
-                    pre = driver.find_elements(By.TAG_NAME, "pre")
-                    if pre:
-                        content = pre[0].text
-                    else:
-                        content = driver.find_element(By.TAG_NAME, "body").text
+                    # Fetch the ajax endpoint from inside the page: reuses the browser
+                    # cookies and returns the raw body in a single WebDriver round-trip
+                    driver.set_script_timeout(15)
+                    content = driver.execute_async_script(
+                        "var done = arguments[arguments.length - 1];"
+                        "fetch(arguments[0], {credentials: 'include'})"
+                        ".then(function (r) { return r.text(); })"
+                        ".then(done, function () { done(null); });",
+                        api_url,
+                    )
 
                     try:
                         data = json.loads(content)
                     except Exception:
-                        html_products = self._parse_html_products(driver.page_source, max_products)
+                        html_products = self._parse_html_products(content or "", max_products)
                         if html_products:
-                            driver.quit()
                             return html_products
                         data = {}
                 except Exception:
                     if driver:
-                        driver.quit()
+                        with suppress(Exception):
+                            driver.quit()
                     driver = None
 
             if not data:
                 try:
-                    headers = self.headers.copy()
-                    headers.pop("X-Requested-With", None)
-                    res = requests.get(api_url, headers=headers, timeout=15)
+                    res = self._session.get(api_url, headers=self.page_headers, timeout=15)
                     try:
                         data = res.json()
                     except Exception:
                         html_products = self._parse_html_products(res.text, max_products)
                         if html_products:
                             return html_products
-                        page_res = requests.get(f"https://www.lazada.vn/catalog/?q={q}", headers=headers, timeout=15)
+                        page_res = self._session.get(f"https://www.lazada.vn/catalog/?q={q}", headers=self.page_headers, timeout=15)
                         html_products = self._parse_html_products(page_res.text, max_products)
                         if html_products:
                             return html_products
@@ -159,10 +182,8 @@ class LazadaScraper(BaseScraper):
 
         finally:
             if driver:
-                try:
+                with suppress(Exception):
                     driver.quit()
-                except Exception:
-                    pass
 
     def _parse_html_products(self, html_content: str, max_products: int = 10) -> List[CrawledProductItem]:
         try:
@@ -690,18 +711,29 @@ class LazadaScraper(BaseScraper):
                     try:
                         # Check browser logs for network requests
                         logs = driver.get_log('performance')
+                        api_headers = {**self.headers, "Referer": product_url}
                         for log in logs:
                             try:
                                 message = json.loads(log['message'])
                                 if message.get('message', {}).get('method') == 'Network.responseReceived':
-                                    url = message.get('message', {}).get('params', {}).get('response', {}).get('url', '')
+                                    params = message.get('message', {}).get('params', {})
+                                    url = params.get('response', {}).get('url', '')
                                     if 'review' in url.lower() or 'rating' in url.lower() or 'feedback' in url.lower():
                                         print(f"[LAZADA] 🔍 Found potential review API: {url}")
-                                        # Try to fetch the response
+                                        # Read the body the browser already received; re-fetch only if Chrome evicted it
                                         try:
-                                            response = requests.get(url, headers=self.headers, timeout=10)
-                                            if response.status_code == 200:
-                                                data = response.json()
+                                            data = None
+                                            try:
+                                                body = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': params.get('requestId')})
+                                                raw = body.get('body', '')
+                                                if body.get('base64Encoded'):
+                                                    raw = base64.b64decode(raw).decode('utf-8', 'replace')
+                                                data = json.loads(raw)
+                                            except Exception:
+                                                response = self._session.get(url, headers=api_headers, timeout=10)
+                                                if response.status_code == 200:
+                                                    data = response.json()
+                                            if data is not None:
                                                 # Try to parse reviews from API response
                                                 if isinstance(data, dict):
                                                     # Common patterns for review data
@@ -715,11 +747,9 @@ class LazadaScraper(BaseScraper):
                                                     if reviews_data and isinstance(reviews_data, list):
                                                         print(f"[LAZADA] ✅ Found {len(reviews_data)} reviews via API")
                                                         # Convert API data to CrawledReview objects
-                                                        for r in reviews_data[:review_limit]:
-                                                            if len(all_reviews) >= review_limit:
-                                                                break
+                                                        for r in islice(reviews_data, review_limit - len(all_reviews)):
                                                             all_reviews.append(CrawledReview(
-                                                                author=r.get('author') or r.get('user') or r.get('name') or "Anonymous",
+                                                                author=r.get('author') or r.get('user') or r.get('name') or _ANONYMOUS,
                                                                 rating=int(r.get('rating', r.get('score', 5))),
                                                                 content=r.get('content') or r.get('comment') or r.get('text') or "",
                                                                 time=str(r.get('time') or r.get('date') or r.get('created_at') or ""),
@@ -770,7 +800,7 @@ class LazadaScraper(BaseScraper):
                     
                     try:
                         # 1. Extract Author - từ cấu trúc Lazada: item-top > user-info > infos > reviewer
-                        author = "Anonymous"
+                        author = _ANONYMOUS
                         # Try Lazada structure first: item-top > user-info > infos > p > span.reviewer
                         item_top = item.find('div', class_='item-top')
                         if item_top:
@@ -783,13 +813,13 @@ class LazadaScraper(BaseScraper):
                                         author = reviewer_elem.get_text(strip=True)
                         
                         # Fallback: try other selectors
-                        if author == "Anonymous":
+                        if author == _ANONYMOUS:
                             reviewer_elem = item.find('span', class_='reviewer')
                             if reviewer_elem:
                                 author = reviewer_elem.get_text(strip=True)
                         
                         # Fallback: try alternative selectors
-                        if author == "Anonymous":
+                        if author == _ANONYMOUS:
                             reviewer_selectors = [
                                 ('span', lambda x: x and ('user' in str(x).lower() or 'name' in str(x).lower() or 'author' in str(x).lower())),
                                 ('div', lambda x: x and ('user' in str(x).lower() or 'name' in str(x).lower() or 'author' in str(x).lower())),
@@ -1070,10 +1100,8 @@ class LazadaScraper(BaseScraper):
                                     # Pattern: "Helpful(2)" or "Hữu ích(2)"
                                     helpful_match = re.search(r'\((\d+)\)', helpful_text)
                                     if helpful_match:
-                                        try:
+                                        with suppress(ValueError):
                                             helpful_count = int(helpful_match.group(1))
-                                        except:
-                                            pass
                         
                         # Fallback: try old method
                         if helpful_count == 0:
@@ -1082,10 +1110,8 @@ class LazadaScraper(BaseScraper):
                                 helpful_text = helpful_elem.get_text(strip=True)
                                 helpful_match = re.search(r'\((\d+)\)', helpful_text)
                                 if helpful_match:
-                                    try:
+                                    with suppress(ValueError):
                                         helpful_count = int(helpful_match.group(1))
-                                    except:
-                                        pass
                         
                         # 7. Extract Seller Response (optional) - từ seller-reply-wrapper-v2
                         seller_respond = None
@@ -1105,7 +1131,7 @@ class LazadaScraper(BaseScraper):
                                     seller_respond = ' '.join(seller_text_parts)
                         
                         all_reviews.append(CrawledReview(
-                            author=author[:200] if author else "Anonymous",
+                            author=author[:200] if author else _ANONYMOUS,
                             rating=rating,
                             content=content[:2000],
                             time=review_time,
@@ -1132,10 +1158,8 @@ class LazadaScraper(BaseScraper):
                 print(f"[LAZADA] ✅ Successfully crawled {len(all_reviews)} reviews")
         finally:
             if driver:
-                try:
+                with suppress(Exception):
                     driver.quit()
-                except Exception:
-                    pass
 
         return CrawledProductDetail(
             link=product_url,
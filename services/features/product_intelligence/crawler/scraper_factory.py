@@ -1,9 +1,14 @@
-from typing import Optional
+import threading
+from typing import Dict
 from services.features.product_intelligence.crawler.base_scraper import BaseScraper
 from services.features.product_intelligence.crawler.lazada_scraper import LazadaScraper
 from services.features.product_intelligence.crawler.tiki_scraper import TikiScraper
 from services.features.product_intelligence.crawler.shopee_scraper import ShopeeScraper
 
+# One shared scraper per platform; its pooled HTTP session is reused across URLs and crawl threads
+_platform_scrapers: Dict[str, BaseScraper] = {}
+_platform_scrapers_lock = threading.Lock()
+
 class ScraperFactory:
     @staticmethod
     def get_scraper(url_or_platform: str) -> BaseScraper:
@@ -15,3 +20,15 @@ class ScraperFactory:
             return ShopeeScraper()
         else:
             return ShopeeScraper()
+
+    @staticmethod
+    def get_scraper_for_platform(platform: str) -> BaseScraper:
+        """Shared scraper per platform, created once under a lock so concurrent crawls never build two."""
+        key = platform.lower()
+        scraper = _platform_scrapers.get(key)
+        if scraper is None:
+            with _platform_scrapers_lock:
+                scraper = _platform_scrapers.get(key)
+                if scraper is None:
+                    scraper = _platform_scrapers[key] = ScraperFactory.get_scraper(key)
+        return scraper
@@ -8,27 +8,167 @@ Flow:
 3. Parse HTML từ rendered page
 """
 
+import os
 import re
+import asyncio
 import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice, repeat
 import urllib.parse
 import json
 import logging
 import requests
-from typing import List, Optional
+from requests.adapters import HTTPAdapter
+from contextlib import suppress
+from typing import Dict, List, Optional
 from pathlib import Path
 
 import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 
+from core.cache import get_cache
+from core.settings import settings
 from services.features.product_intelligence.crawler.base_scraper import BaseScraper
 from services.features.product_intelligence.crawler.cookie_manager import CookieManager
 from schemas.product_crawler import CrawledProductItem, CrawledProductDetail, CrawledReview
 
-# Setup logger
+# Setup logger - level/handlers come from the app logging config (core/logger.py)
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
+
+# Precompiled patterns used while parsing search results / product URLs
+_PRODUCT_HREF_RE = re.compile(r'-i\.')
+_LINE_CLAMP_RE = re.compile(r'line-clamp')
+_PRICE_CHAR_RE = re.compile(r'[₫đ\d]')
+_PRICE_NUM_RE = re.compile(r'[\d.,]+')
+PRODUCT_LINK_CSS = 'a[href*="-i."]'
+_IDS_RE = re.compile(r'i\.(\d+)\.(\d+)')
+_EMBEDDED_STATE_RE = re.compile(r'<script[^>]*id="__NEXT_DATA__"[^>]*>(.+?)</script>', re.S)
+
+# Prefix ảnh đính kèm review (ghép bằng str.__add__ thay vì f-string cho từng ảnh)
+_IMG_PREFIX = "https://down-vn.img.susercontent.com/"
+
+# Resources the scraper never reads; blocked on pooled browsers to cut page weight
+BLOCKED_RESOURCE_URLS = [
+    '*.jpg', '*.jpeg', '*.png', '*.webp', '*.gif',
+    '*.woff', '*.woff2', '*.css',
+    '*/analytics/*', '*/tracking/*',
+]
+
+BLOCKED_RESOURCE_SUFFIXES = ('.jpg', '.jpeg', '.png', '.webp', '.gif', '.woff', '.woff2', '.css')
+
+try:
+    from playwright.sync_api import sync_playwright
+except ImportError:
+    sync_playwright = None
+
+# orjson parses review/search payloads straight from bytes, several times faster than json
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# requests only decodes brotli responses when the brotli package is installed
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+# Read product cards straight from the live DOM instead of serializing page_source
+_SEARCH_RESULTS_JS = """
+const out = [];
+for (const a of document.querySelectorAll('a[href*="-i."]')) {
+    const p = a.closest('div') || a;
+    const nameEl = p.querySelector('div[class*="line-clamp"]');
+    const priceEl = Array.from(p.querySelectorAll('span')).find(s => /[₫đ\\d]/.test(s.innerText));
+    const img = p.querySelector('img');
+    out.push({
+        href: a.href,
+        name: (nameEl && nameEl.innerText.trim()) || a.getAttribute('title') || a.innerText.trim(),
+        price: priceEl ? priceEl.innerText.trim() : null,
+        img: img ? (img.src || img.getAttribute('data-src')) : null,
+    });
+}
+return out;
+"""
+_ERROR_PAGE_JS = """
+const t = document.body ? document.body.innerText : '';
+return t.includes('sự cố tải') || t.includes('thử lại');
+"""
+
+# lxml (libxml2) parses large search pages several times faster than html.parser
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+
+def _normalize_cookies(cookies: List[dict]) -> List[dict]:
+    """
+    Saved Selenium cookies → list dict đã validate (bỏ cookie thiếu name/value)
+    Dùng được trực tiếp cho Network.setCookies và requests cookie jar
+    """
+    normalized = []
+    for c in cookies:
+        if not c.get('name') or not c.get('value'):
+            continue
+        cookie = {
+            'name': c['name'],
+            'value': c['value'],
+            'domain': c.get('domain', '.shopee.vn'),
+            'path': c.get('path', '/'),
+            'httpOnly': c.get('httpOnly', False),
+            'secure': c.get('secure', False),
+        }
+        if c.get('expiry'):
+            cookie['expires'] = c['expiry']
+        normalized.append(cookie)
+    return normalized
+
+
+class _RequestBudget:
+    """
+    Giới hạn tốc độ kiểu sliding window: tối đa max_requests request trong window giây
+    Chỉ sleep khi đã dùng hết budget (thay cho sleep cố định giữa các page)
+    """
+    
+    __slots__ = ("window", "_stamps", "_lock")
+    
+    def __init__(self, max_requests: int = 10, window: float = 5.0):
+        self.window = window
+        self._stamps = deque(maxlen=max_requests)
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._stamps and now - self._stamps[0] >= self.window:
+                    self._stamps.popleft()
+                if len(self._stamps) < self._stamps.maxlen:
+                    self._stamps.append(now)
+                    return
+                wait = self.window - (now - self._stamps[0])
+            time.sleep(wait)
+
+
+# Dùng chung cho mọi scraper trong process: get_ratings bị rate limit theo IP
+_RATINGS_BUDGET = _RequestBudget(max_requests=10, window=5.0)
+_RATINGS_API = "https://shopee.vn/api/v2/item/get_ratings"
+_RATINGS_PAGE_SIZE = 20
 
 
 class ShopeeScraper(BaseScraper):
@@ -37,12 +177,115 @@ class ShopeeScraper(BaseScraper):
     Yêu cầu: Chạy scripts/shopee_login.py trước để lấy cookies
     """
     
+    # Browsers are reused across scraper instances - Chrome startup is the slowest step.
+    # One pool per account so a session/login state never crosses accounts; quit via shutdown_driver_pools()
+    DRIVER_POOL_SIZE = os.cpu_count() or 2
+    _driver_pools: Dict[str, "queue.Queue[uc.Chrome]"] = {}
+    _driver_lock = threading.Lock()
+    # Chrome khóa user_data_dir (SingletonLock): mỗi profile Playwright chỉ được mở bởi 1 thread tại một thời điểm
+    _profile_locks: Dict[str, threading.Lock] = {}
+    
     def __init__(self, account_name: str = "default"):
         self.base_url = "https://shopee.vn"
         self.cookie_manager = CookieManager(account_name)
         self.account_name = account_name
+        self.cache = get_cache()
+        self.REVIEWS_CACHE_TTL = 3600  # 1 hour
+        # API session dùng chung cho instance (keep-alive + pool); tạo sẵn ở đây vì instance
+        # được chia sẻ giữa các crawl thread, tạo lazily sẽ bị race
+        self._session = requests.Session()
+        self._session.headers.update({
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+            "Accept": "application/json",
+            "Accept-Encoding": ACCEPT_ENCODING,
+            "Accept-Language": "vi-VN,vi;q=0.9",
+        })
+        self._session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20, pool_block=False))
         logger.info(f"ShopeeScraper initialized with account: {account_name}")
     
+    def _get_session(self, cookies: List[dict]) -> requests.Session:
+        """Session dùng chung của instance, cookies được refresh mỗi lần gọi"""
+        for c in _normalize_cookies(cookies):
+            self._session.cookies.set(c['name'], c['value'], domain=c['domain'], path=c['path'])
+        return self._session
+    
+    @property
+    def _driver_pool(self) -> "queue.Queue[uc.Chrome]":
+        """Pool driver của account hiện tại (tạo lần đầu khi cần)"""
+        pool = self._driver_pools.get(self.account_name)
+        if pool is None:
+            with self._driver_lock:
+                pool = self._driver_pools.setdefault(self.account_name, queue.Queue(maxsize=self.DRIVER_POOL_SIZE))
+        return pool
+    
+    @classmethod
+    def shutdown_driver_pools(cls) -> None:
+        """Quit mọi driver đang nằm trong pool (gọi khi app shutdown)"""
+        with cls._driver_lock:
+            pools = list(cls._driver_pools.values())
+            cls._driver_pools.clear()
+        closed = 0
+        for pool in pools:
+            while True:
+                try:
+                    driver = pool.get_nowait()
+                except queue.Empty:
+                    break
+                with suppress(Exception):
+                    driver.quit()
+                closed += 1
+        if closed:
+            logger.info(f"[SHOPEE] 🔒 Closed {closed} pooled browsers")
+    
+    def _get_driver(self) -> uc.Chrome:
+        """Lấy driver còn sống từ pool, hoặc khởi tạo driver mới"""
+        while True:
+            try:
+                driver = self._driver_pool.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                if driver.session_id:
+                    driver.current_url  # cheap liveness probe
+                    return driver
+            except Exception:
+                pass
+            with suppress(Exception):
+                driver.quit()
+        
+        options = uc.ChromeOptions()
+        # KHÔNG dùng headless - Shopee detect và block
+        # options.add_argument("--headless=new")  # DISABLED
+        options.add_argument("--window-size=1920,1080")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--lang=vi-VN")
+        options.add_argument("--start-maximized")
+        
+        # uc patches the chromedriver binary on startup, which is not safe to run concurrently
+        with self._driver_lock:
+            driver = uc.Chrome(options=options, version_main=None)
+        
+        # Scraping only needs the DOM - skip images/fonts/css/trackers (img src attributes stay intact)
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_RESOURCE_URLS})
+        except Exception as e:
+            logger.debug(f"Failed to block resources: {e}")
+        return driver
+    
+    def _return_driver(self, driver: uc.Chrome) -> None:
+        """Trả driver về pool (xóa cookies/storage của mọi domain); quit nếu pool đã đầy hoặc driver lỗi"""
+        try:
+            # delete_all_cookies() chỉ xóa domain hiện tại - CDP xóa toàn bộ cookie store của browser
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': self.base_url, 'storageTypes': 'all'})
+            self._driver_pool.put_nowait(driver)
+        except Exception:
+            with suppress(Exception):
+                driver.quit()
+    
     def _auto_login_internal(self, timeout_seconds: int = 120) -> bool:
         """
         Auto login nội bộ - mở browser, chờ user login, lưu cookies
@@ -53,10 +296,8 @@ class ShopeeScraper(BaseScraper):
         driver = None
         
         try:
-            print(f"\n{'='*60}")
-            print(f"[SHOPEE AUTO LOGIN] 🔐 Starting auto login")
-            print(f"[SHOPEE AUTO LOGIN] ⏰ Timeout: {timeout_seconds}s")
-            print(f"{'='*60}")
+            logger.info(f"[SHOPEE AUTO LOGIN] 🔐 Starting auto login")
+            logger.info(f"[SHOPEE AUTO LOGIN] ⏰ Timeout: {timeout_seconds}s")
             
             options = uc.ChromeOptions()
             options.add_argument("--window-size=1920,1080")
@@ -64,86 +305,98 @@ class ShopeeScraper(BaseScraper):
             options.add_argument("--start-maximized")
             
             driver = uc.Chrome(options=options, version_main=None)
-            print("[SHOPEE AUTO LOGIN] ✅ Browser opened")
+            logger.info("[SHOPEE AUTO LOGIN] ✅ Browser opened")
             
             # Navigate to login page
-            print("[SHOPEE AUTO LOGIN] 🌐 Loading login page...")
+            logger.info("[SHOPEE AUTO LOGIN] 🌐 Loading login page...")
             driver.get("https://shopee.vn/buyer/login")
-            time.sleep(3)
+            self._wait_page_ready(driver)
             
-            print("[SHOPEE AUTO LOGIN] ⏳ Waiting for you to login...")
-            print("[SHOPEE AUTO LOGIN] 💡 Login bằng OTP, SMS hoặc Password")
-            print("-" * 60)
+            logger.info("[SHOPEE AUTO LOGIN] ⏳ Waiting for you to login...")
+            logger.info("[SHOPEE AUTO LOGIN] 💡 Login bằng OTP, SMS hoặc Password")
             
-            # Poll for login completion
+            # Wait for login completion - returns as soon as the URL leaves the login page
             start_time = time.time()
-            check_interval = 2
+            next_log_at = start_time + 10
             
-            while True:
-                elapsed = time.time() - start_time
-                
-                if elapsed > timeout_seconds:
-                    print(f"\n[SHOPEE AUTO LOGIN] ⏰ Timeout sau {timeout_seconds}s")
+            def login_done(d) -> bool:
+                nonlocal next_log_at
+                now = time.time()
+                # Log progress mỗi 10 giây
+                if now >= next_log_at:
+                    remaining = timeout_seconds - int(now - start_time)
+                    logger.info(f"[SHOPEE AUTO LOGIN] ⏳ Đang chờ... ({remaining}s còn lại)")
+                    next_log_at += 10
+                current_url = d.current_url
+                return "/login" not in current_url and "/buyer/login" not in current_url
+            
+            try:
+                WebDriverWait(driver, timeout_seconds, poll_frequency=0.25).until(login_done)
+            except TimeoutException:
+                logger.warning(f"[SHOPEE AUTO LOGIN] ⏰ Timeout sau {timeout_seconds}s")
+                return False
+            
+            logger.info(f"[SHOPEE AUTO LOGIN] ✅ Login detected!")
+            
+            self._wait_page_ready(driver)
+            
+            # Check for traffic verification
+            current_url = driver.current_url
+            if "/verify/traffic" in current_url:
+                logger.warning("[SHOPEE AUTO LOGIN] ⚠️  Traffic verification detected")
+                time.sleep(10)
+                if "/verify/traffic" in driver.current_url:
                     return False
-                
-                try:
-                    current_url = driver.current_url
-                    
-                    # Log progress mỗi 10 giây
-                    if int(elapsed) % 10 == 0 and int(elapsed) > 0:
-                        remaining = timeout_seconds - int(elapsed)
-                        print(f"[SHOPEE AUTO LOGIN] ⏳ Đang chờ... ({remaining}s còn lại)")
-                    
-                    # Check if login successful
-                    if "/login" not in current_url and "/buyer/login" not in current_url:
-                        print(f"\n[SHOPEE AUTO LOGIN] ✅ Login detected!")
-                        
-                        time.sleep(3)
-                        
-                        # Check for traffic verification
-                        current_url = driver.current_url
-                        if "/verify/traffic" in current_url:
-                            print("[SHOPEE AUTO LOGIN] ⚠️  Traffic verification detected")
-                            time.sleep(10)
-                            if "/verify/traffic" in driver.current_url:
-                                return False
-                        
-                        # Get and save cookies
-                        cookies = driver.get_cookies()
-                        if not cookies:
-                            return False
-                        
-                        self.cookie_manager.save_cookies(cookies)
-                        print(f"[SHOPEE AUTO LOGIN] 💾 Saved {len(cookies)} cookies")
-                        print("[SHOPEE AUTO LOGIN] ✅ SUCCESS!")
-                        print("=" * 60)
-                        
-                        return True
-                    
-                except Exception as e:
-                    logger.debug(f"Check error: {e}")
-                
-                time.sleep(check_interval)
+            
+            # Get and save cookies
+            cookies = driver.get_cookies()
+            if not cookies:
+                return False
+            
+            self.cookie_manager.save_cookies(cookies)
+            logger.info(f"[SHOPEE AUTO LOGIN] 💾 Saved {len(cookies)} cookies")
+            logger.info("[SHOPEE AUTO LOGIN] ✅ SUCCESS!")
+            
+            return True
             
         except Exception as e:
-            print(f"[SHOPEE AUTO LOGIN] ❌ Error: {str(e)}")
+            logger.error(f"[SHOPEE AUTO LOGIN] ❌ Error: {str(e)}")
             return False
         finally:
             if driver:
-                try:
+                with suppress(Exception):
                     driver.quit()
-                    print("[SHOPEE AUTO LOGIN] 🔒 Browser closed")
-                except:
-                    pass
+                    logger.info("[SHOPEE AUTO LOGIN] 🔒 Browser closed")
+
+    def _wait_page_ready(self, driver: uc.Chrome, timeout: int = 10) -> None:
+        """Chờ document.readyState == 'complete' (thay cho sleep cố định)"""
+        with suppress(TimeoutException):
+            WebDriverWait(driver, timeout, poll_frequency=0.25).until(
+                lambda d: d.execute_script("return document.readyState") == "complete"
+            )
+    
+    def _wait_search_loaded(self, driver: uc.Chrome, timeout: int = 15) -> None:
+        """Chờ product link đầu tiên xuất hiện, hoặc bị redirect sang login/verify"""
+        with suppress(TimeoutException):
+            WebDriverWait(driver, timeout, poll_frequency=0.25).until(
+                lambda d: d.find_elements(By.CSS_SELECTOR, PRODUCT_LINK_CSS)
+                or "/login" in d.current_url
+                or "/verify/" in d.current_url
+            )
+    
+    def _set_browser_cookies(self, driver: uc.Chrome, cookies: List[dict]) -> None:
+        """Apply tất cả cookies trong 1 lệnh CDP thay vì add_cookie từng cái"""
+        try:
+            driver.execute_cdp_cmd('Network.setCookies', {'cookies': _normalize_cookies(cookies)})
+        except Exception as e:
+            logger.debug(f"Failed to set cookies: {e}")
 
     def crawl_search_results(self, search_url: str, max_products: int = 10) -> List[CrawledProductItem]:
         """
         Crawl search results sử dụng Selenium + Saved Cookies
         """
-        print(f"\n{'='*60}")
-        print(f"[SHOPEE] 🔍 Crawling search results")
-        print(f"[SHOPEE] URL: {search_url}")
-        print(f"{'='*60}")
+        logger.info(f"[SHOPEE] 🔍 Crawling search results")
+        logger.info(f"[SHOPEE] URL: {search_url}")
         
         # Extract query từ URL
         query = search_url
@@ -156,20 +409,20 @@ class ShopeeScraper(BaseScraper):
                 pass
         
         if not query or not query.strip():
-            print("[SHOPEE] ❌ Empty query")
+            logger.error("[SHOPEE] ❌ Empty query")
             return []
         
-        print(f"[SHOPEE] 🔎 Query: {query}")
+        logger.info(f"[SHOPEE] 🔎 Query: {query}")
         
         # Load cookies
         saved_cookies = self.cookie_manager.load_cookies()
         has_cookies = saved_cookies and len(saved_cookies) > 0
         
         if has_cookies:
-            print(f"[SHOPEE] 🍪 Found {len(saved_cookies)} saved cookies")
+            logger.info(f"[SHOPEE] 🍪 Found {len(saved_cookies)} saved cookies")
         else:
-            print("[SHOPEE] ⚠️  No saved cookies found")
-            print("[SHOPEE] � Auto-login sẽ được thực hiện...")
+            logger.warning("[SHOPEE] ⚠️  No saved cookies found")
+            logger.info("[SHOPEE] � Auto-login sẽ được thực hiện...")
             
             # Auto login
             login_result = self._auto_login_internal()
@@ -177,229 +430,461 @@ class ShopeeScraper(BaseScraper):
             if login_result:
                 saved_cookies = self.cookie_manager.load_cookies()
                 has_cookies = saved_cookies and len(saved_cookies) > 0
-                print(f"[SHOPEE] ✅ Auto-login thành công! {len(saved_cookies)} cookies")
+                logger.info(f"[SHOPEE] ✅ Auto-login thành công! {len(saved_cookies)} cookies")
             else:
-                print("[SHOPEE] ❌ Auto-login thất bại!")
+                logger.error("[SHOPEE] ❌ Auto-login thất bại!")
                 return []
         
+        # Try the JSON search endpoint first - no browser startup needed
+        products = self._fetch_search_via_api(query, saved_cookies, max_products)
+        if products:
+            logger.info(f"[SHOPEE] ✅ API search success! Found {len(products)} products")
+            return products
+        
         # Build search URL
         encoded_query = urllib.parse.quote(query)
         search_page_url = f"{self.base_url}/search?keyword={encoded_query}"
         
+        # Persistent Playwright profile (if installed) keeps cookies across runs
+        if sync_playwright is not None:
+            logger.warning("[SHOPEE] ⚠️  API search failed, trying Playwright profile...")
+            products = self._crawl_search_via_playwright(search_page_url, saved_cookies, max_products)
+            if products:
+                logger.info(f"[SHOPEE] ✅ Playwright success! Found {len(products)} products")
+                return products
+        
+        logger.warning("[SHOPEE] ⚠️  Falling back to Selenium...")
+        
         driver = None
         try:
-            # Initialize undetected-chromedriver
-            print("[SHOPEE] 🚀 Starting browser...")
-            
-            options = uc.ChromeOptions()
-            # KHÔNG dùng headless - Shopee detect và block
-            # options.add_argument("--headless=new")  # DISABLED
-            options.add_argument("--window-size=1920,1080")
-            options.add_argument("--disable-gpu")
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--lang=vi-VN")
-            options.add_argument("--start-maximized")
-            
-            driver = uc.Chrome(options=options, version_main=None)
-            print("[SHOPEE] ✅ Browser started (NON-HEADLESS)")
+            # Get undetected-chromedriver from pool
+            logger.info("[SHOPEE] 🚀 Starting browser...")
+            driver = self._get_driver()
+            logger.info("[SHOPEE] ✅ Browser ready (NON-HEADLESS)")
             
             # Load homepage first để set cookies
-            print("[SHOPEE] 🏠 Loading homepage...")
+            logger.info("[SHOPEE] 🏠 Loading homepage...")
             driver.get(self.base_url)
-            time.sleep(3)
+            self._wait_page_ready(driver)
             
             # Apply saved cookies
             if has_cookies:
-                print("[SHOPEE] 🍪 Applying saved cookies...")
-                for cookie in saved_cookies:
-                    try:
-                        cookie_dict = {
-                            'name': cookie.get('name'),
-                            'value': cookie.get('value'),
-                            'domain': cookie.get('domain', '.shopee.vn'),
-                            'path': cookie.get('path', '/'),
-                        }
-                        # Only add if name and value exist
-                        if cookie_dict['name'] and cookie_dict['value']:
-                            driver.add_cookie(cookie_dict)
-                    except Exception as e:
-                        logger.debug(f"Failed to add cookie: {e}")
+                logger.info("[SHOPEE] 🍪 Applying saved cookies...")
+                self._set_browser_cookies(driver, saved_cookies)
                 
-                print(f"[SHOPEE] ✅ Applied cookies")
+                logger.info(f"[SHOPEE] ✅ Applied cookies")
                 
                 # Refresh để apply cookies
                 driver.refresh()
-                time.sleep(3)
+                self._wait_page_ready(driver)
             
             # Now load search page
-            print(f"[SHOPEE] 🔍 Loading search page...")
+            logger.info(f"[SHOPEE] 🔍 Loading search page...")
             driver.get(search_page_url)
-            time.sleep(5)
+            self._wait_search_loaded(driver)
             
             # Check current URL
             current_url = driver.current_url
             page_title = driver.title
-            print(f"[SHOPEE] 📄 Page loaded")
-            print(f"[SHOPEE]    URL: {current_url[:80]}...")
-            print(f"[SHOPEE]    Title: {page_title}")
+            logger.info(f"[SHOPEE] 📄 Page loaded")
+            logger.info(f"[SHOPEE]    URL: {current_url[:80]}...")
+            logger.info(f"[SHOPEE]    Title: {page_title}")
             
             # Check for login/verification redirect
             if "/login" in current_url:
-                print("[SHOPEE] ⚠️  Login required - cookies expired!")
-                print("[SHOPEE] 💡 Run: POST /api/v1/shopee/session/auto-login")
+                logger.warning("[SHOPEE] ⚠️  Login required - cookies expired!")
+                logger.info("[SHOPEE] 💡 Run: POST /api/v1/shopee/session/auto-login")
                 self.cookie_manager.clear_cookies()
                 return []
             
             # Handle captcha verification
             if "/verify/captcha" in current_url:
-                print("[SHOPEE] ⚠️  Captcha verification detected!")
-                print("[SHOPEE] 👆 Vui lòng giải captcha trong browser...")
-                print("[SHOPEE] ⏳ Đang chờ bạn hoàn thành captcha (tối đa 120s)...")
+                logger.warning("[SHOPEE] ⚠️  Captcha verification detected!")
+                logger.info("[SHOPEE] 👆 Vui lòng giải captcha trong browser...")
+                logger.info("[SHOPEE] ⏳ Đang chờ bạn hoàn thành captcha (tối đa 120s)...")
                 
                 # Wait for user to solve captcha - TĂNG LÊN 120s
                 captcha_timeout = 120
                 start_time = time.time()
-                captcha_solved = False
+                next_log_at = start_time + 20
                 
-                while time.time() - start_time < captcha_timeout:
-                    time.sleep(2)
-                    
+                def captcha_done(d) -> bool:
+                    nonlocal next_log_at
+                    now = time.time()
+                    if now >= next_log_at:
+                        remaining = captcha_timeout - int(now - start_time)
+                        logger.info(f"[SHOPEE] ⏳ Còn {remaining}s để giải captcha...")
+                        next_log_at += 20
+                    return "/verify/captcha" not in d.current_url
+                
+                try:
+                    WebDriverWait(driver, captcha_timeout, poll_frequency=0.5).until(captcha_done)
+                    captcha_solved = True
+                except TimeoutException:
+                    captcha_solved = False
+                except Exception as e:
+                    logger.warning(f"[SHOPEE] ⚠️  Browser error: {e}")
+                    logger.info("[SHOPEE] 💡 Browser có thể đã bị đóng, thử lại...")
+                    return []
+                
+                if captcha_solved:
+                    logger.info("[SHOPEE] ✅ Captcha solved!")
+                    # Update cookies after captcha
                     try:
-                        current_url = driver.current_url
+                        new_cookies = driver.get_cookies()
+                        self.cookie_manager.save_cookies_if_changed(new_cookies)
+                        logger.info(f"[SHOPEE] 💾 Updated cookies after captcha")
                     except Exception as e:
-                        print(f"[SHOPEE] ⚠️  Browser error: {e}")
-                        print("[SHOPEE] 💡 Browser có thể đã bị đóng, thử lại...")
-                        return []
-                    
-                    remaining = int(captcha_timeout - (time.time() - start_time))
-                    if remaining % 20 == 0 and remaining > 0:
-                        print(f"[SHOPEE] ⏳ Còn {remaining}s để giải captcha...")
-                    
-                    if "/verify/captcha" not in current_url:
-                        print("[SHOPEE] ✅ Captcha solved!")
-                        captcha_solved = True
-                        # Update cookies after captcha
-                        try:
-                            new_cookies = driver.get_cookies()
-                            self.cookie_manager.save_cookies(new_cookies)
-                            print(f"[SHOPEE] 💾 Updated cookies after captcha")
-                        except:
-                            pass
-                        break
+                        logger.debug(f"[SHOPEE] Failed to save cookies after captcha: {e}")
                 
                 if not captcha_solved:
-                    print("[SHOPEE] ⏰ Captcha timeout sau 120s!")
-                    print("[SHOPEE] 💡 Thử lại - bạn có 2 phút để giải captcha")
+                    logger.warning("[SHOPEE] ⏰ Captcha timeout sau 120s!")
+                    logger.info("[SHOPEE] 💡 Thử lại - bạn có 2 phút để giải captcha")
                     return []
                 
                 # Check if now on search page
                 try:
                     current_url = driver.current_url
                     if "/search" not in current_url:
-                        print(f"[SHOPEE] 🔄 Reloading search page...")
+                        logger.info(f"[SHOPEE] 🔄 Reloading search page...")
                         driver.get(search_page_url)
-                        time.sleep(5)
+                        self._wait_search_loaded(driver)
                 except Exception as e:
-                    print(f"[SHOPEE] ⚠️  Error after captcha: {e}")
+                    logger.warning(f"[SHOPEE] ⚠️  Error after captcha: {e}")
                     return []
             
             # Handle traffic verification  
             if "/verify/traffic" in current_url:
-                print("[SHOPEE] ⚠️  Traffic verification detected!")
-                print("[SHOPEE] 🔄 Waiting for manual verification...")
-                print("[SHOPEE] 💡 Bạn có thể cần verify trong browser popup")
+                logger.warning("[SHOPEE] ⚠️  Traffic verification detected!")
+                logger.info("[SHOPEE] 🔄 Waiting for manual verification...")
+                logger.info("[SHOPEE] 💡 Bạn có thể cần verify trong browser popup")
                 
                 # Chờ user verify (nếu có captcha)
                 time.sleep(10)
                 
                 # Thử lại
                 driver.get(search_page_url)
-                time.sleep(5)
+                self._wait_search_loaded(driver)
                 
                 current_url = driver.current_url
                 if "/verify/traffic" in current_url:
-                    print("[SHOPEE] ❌ Still blocked!")
-                    print("[SHOPEE] 💡 Solutions:")
-                    print("[SHOPEE]    1. Wait 5-10 minutes and try again")
-                    print("[SHOPEE]    2. Use a VPN to change IP")
-                    print("[SHOPEE]    3. Login again: POST /api/v1/shopee/session/auto-login")
+                    logger.error("[SHOPEE] ❌ Still blocked!")
+                    logger.info("[SHOPEE] 💡 Solutions:")
+                    logger.info("[SHOPEE]    1. Wait 5-10 minutes and try again")
+                    logger.info("[SHOPEE]    2. Use a VPN to change IP")
+                    logger.info("[SHOPEE]    3. Login again: POST /api/v1/shopee/session/auto-login")
                     return []
                 else:
-                    print("[SHOPEE] ✅ Traffic verification passed!")
+                    logger.info("[SHOPEE] ✅ Traffic verification passed!")
             
             # Check for error page
-            page_source = driver.page_source
-            if "sự cố tải" in page_source or "thử lại" in page_source or "error" in current_url.lower():
-                print("[SHOPEE] ⚠️  Shopee đang gặp sự cố hoặc rate limiting!")
-                print("[SHOPEE] 🔄 Retrying in 5 seconds...")
+            if driver.execute_script(_ERROR_PAGE_JS) or "error" in current_url.lower():
+                logger.warning("[SHOPEE] ⚠️  Shopee đang gặp sự cố hoặc rate limiting!")
+                logger.info("[SHOPEE] 🔄 Retrying in 5 seconds...")
                 
                 time.sleep(5)
                 driver.refresh()
-                time.sleep(5)
+                self._wait_search_loaded(driver)
                 
                 # Check again
-                page_source = driver.page_source
-                if "sự cố tải" in page_source or "thử lại" in page_source:
-                    print("[SHOPEE] ❌ Vẫn bị lỗi sau khi retry!")
-                    print("[SHOPEE] 💡 Giải pháp:")
-                    print("[SHOPEE]    1. Đợi 5-10 phút rồi thử lại")
-                    print("[SHOPEE]    2. Dùng VPN để đổi IP")
-                    print("[SHOPEE]    3. IP của bạn có thể đang bị rate limit")
+                if driver.execute_script(_ERROR_PAGE_JS):
+                    logger.error("[SHOPEE] ❌ Vẫn bị lỗi sau khi retry!")
+                    logger.info("[SHOPEE] 💡 Giải pháp:")
+                    logger.info("[SHOPEE]    1. Đợi 5-10 phút rồi thử lại")
+                    logger.info("[SHOPEE]    2. Dùng VPN để đổi IP")
+                    logger.info("[SHOPEE]    3. IP của bạn có thể đang bị rate limit")
                     return []
                 else:
-                    print("[SHOPEE] ✅ Retry thành công!")
+                    logger.info("[SHOPEE] ✅ Retry thành công!")
             
             # Scroll to load products
-            print("[SHOPEE] 📜 Scrolling to load products...")
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
-            time.sleep(2)
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
+            logger.info("[SHOPEE] 📜 Scrolling to load products...")
+            for script in ("window.scrollTo(0, document.body.scrollHeight/2);",
+                           "window.scrollTo(0, document.body.scrollHeight);"):
+                prev_count = len(driver.find_elements(By.CSS_SELECTOR, PRODUCT_LINK_CSS))
+                driver.execute_script(script)
+                # Lazy-loaded cards: continue as soon as more product links show up
+                with suppress(TimeoutException):
+                    WebDriverWait(driver, 5, poll_frequency=0.25).until(
+                        lambda d: len(d.find_elements(By.CSS_SELECTOR, PRODUCT_LINK_CSS)) > prev_count
+                    )
             
             # Update cookies
             new_cookies = driver.get_cookies()
-            if len(new_cookies) > 0:
-                self.cookie_manager.save_cookies(new_cookies)
-                print(f"[SHOPEE] 💾 Updated {len(new_cookies)} cookies")
+            if len(new_cookies) > 0 and self.cookie_manager.save_cookies_if_changed(new_cookies):
+                logger.info(f"[SHOPEE] 💾 Updated {len(new_cookies)} cookies")
             
-            # Parse products from HTML
-            print("[SHOPEE] 🔎 Parsing products from HTML...")
-            products = self._parse_search_results(driver.page_source, max_products)
+            # Extract products from live DOM, parse full HTML only if that finds nothing
+            logger.info("[SHOPEE] 🔎 Extracting products from page...")
+            products = self._extract_search_results(driver, max_products)
+            if not products:
+                logger.info("[SHOPEE] 🔎 Parsing products from HTML...")
+                products = self._parse_search_results(driver.page_source, max_products)
             
-            print(f"[SHOPEE] ✅ Found {len(products)} products")
+            logger.info(f"[SHOPEE] ✅ Found {len(products)} products")
             for i, p in enumerate(products[:3], 1):
-                print(f"[SHOPEE]    {i}. {p.name[:50]}...")
+                logger.info(f"[SHOPEE]    {i}. {p.name[:50]}...")
             
             return products
             
         except Exception as e:
-            print(f"[SHOPEE] ❌ Error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.error(f"[SHOPEE] ❌ Error: {str(e)}", exc_info=True)
             return []
         finally:
             if driver:
+                self._return_driver(driver)
+
+    def _fetch_search_via_api(
+        self,
+        query: str,
+        cookies: List[dict],
+        max_products: int
+    ) -> List[CrawledProductItem]:
+        """
+        Search trực tiếp qua API v4 (NHANH!)
+        Trả về [] khi bị chặn (anti-bot) để fallback sang Selenium
+        """
+        try:
+            session = self._get_session(cookies)
+            headers = {
+                "Referer": f"{self.base_url}/search?keyword={urllib.parse.quote(query)}",
+                "X-Requested-With": "XMLHttpRequest",
+                "X-API-Source": "pc",
+            }
+            
+            params = {
+                "by": "relevancy",
+                "keyword": query,
+                "limit": min(max_products, 60),
+                "newest": 0,
+                "order": "desc",
+                "page_type": "search",
+                "version": 2,
+            }
+            resp = session.get(f"{self.base_url}/api/v4/search/search_items", params=params, headers=headers, timeout=15)
+            
+            if resp.status_code != 200:
+                logger.error(f"[SHOPEE API] ❌ Search status {resp.status_code}")
+                return []
+            
+            data = _loads(resp.content)
+            if data.get("error"):
+                logger.error(f"[SHOPEE API] ❌ Search API error: {data.get('error')}")
+                return []
+            
+            return self._items_from_json(data.get("items") or [], max_products)
+            
+        except Exception as e:
+            logger.error(f"[SHOPEE API] ❌ Search error: {str(e)}")
+            return []
+
+    def _crawl_search_via_playwright(
+        self,
+        search_page_url: str,
+        cookies: List[dict],
+        max_products: int
+    ) -> List[CrawledProductItem]:
+        """
+        Crawl search bằng Playwright persistent context (data/profiles/shopee_<account>)
+        Profile giữ cookies/local storage giữa các lần chạy → không cần apply cookies + refresh
+        Trả về [] khi bị redirect login/verify để fallback sang Selenium
+        """
+        with self._driver_lock:
+            profile_lock = self._profile_locks.setdefault(self.account_name, threading.Lock())
+        # Profile đang bận → bỏ qua Playwright ngay, caller fallback sang Selenium (không chờ)
+        if not profile_lock.acquire(blocking=False):
+            logger.warning(f"[SHOPEE] ⚠️  Playwright profile busy for account {self.account_name}, skipping")
+            return []
+        
+        try:
+            return self._crawl_search_with_profile(search_page_url, cookies, max_products)
+        finally:
+            profile_lock.release()
+    
+    def _crawl_search_with_profile(
+        self,
+        search_page_url: str,
+        cookies: List[dict],
+        max_products: int
+    ) -> List[CrawledProductItem]:
+        """Phần chạy Playwright của _crawl_search_via_playwright (caller giữ profile lock)"""
+        profile_dir = Path("data/profiles") / f"shopee_{self.account_name}"
+        is_new_profile = not profile_dir.exists()
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        
+        try:
+            with sync_playwright() as p:
+                context = p.chromium.launch_persistent_context(
+                    user_data_dir=str(profile_dir),
+                    headless=settings.SHOPEE_PLAYWRIGHT_HEADLESS,
+                    args=["--lang=vi-VN", "--window-size=1920,1080"],
+                    locale="vi-VN",
+                )
                 try:
-                    driver.quit()
-                except:
-                    pass
+                    # Seed a fresh profile from CookieManager once - one call, not a per-cookie loop
+                    if is_new_profile and cookies:
+                        context.add_cookies([
+                            {k: c[k] for k in ("name", "value", "domain", "path", "httpOnly", "secure", "expires") if k in c}
+                            for c in _normalize_cookies(cookies)
+                        ])
+                    
+                    page = context.pages[0] if context.pages else context.new_page()
+                    page.route(
+                        lambda url: url.endswith(BLOCKED_RESOURCE_SUFFIXES),
+                        lambda route: route.abort(),
+                    )
+                    page.goto(search_page_url, wait_until="domcontentloaded")
+                    with suppress(Exception):
+                        page.wait_for_selector(PRODUCT_LINK_CSS, timeout=15000)
+                    
+                    if "/login" in page.url or "/verify/" in page.url:
+                        logger.warning(f"[SHOPEE] ⚠️  Playwright redirected: {page.url[:80]}")
+                        return []
+                    
+                    page.mouse.wheel(0, 10000)
+                    with suppress(Exception):
+                        page.wait_for_load_state("networkidle", timeout=5000)
+                    
+                    cards = page.evaluate("() => {" + _SEARCH_RESULTS_JS + "}") or []
+                    return self._items_from_cards(cards, max_products)
+                finally:
+                    context.close()
+                    
+        except Exception as e:
+            logger.error(f"[SHOPEE] ❌ Playwright error: {str(e)}")
+            return []
+
+    def _extract_search_results(self, driver: uc.Chrome, max_products: int = 10) -> List[CrawledProductItem]:
+        """Lấy products bằng JS trên DOM đang render (không cần page_source + BeautifulSoup)"""
+        try:
+            cards = driver.execute_script(_SEARCH_RESULTS_JS) or []
+        except Exception as e:
+            logger.debug(f"JS extraction failed: {e}")
+            return []
+        
+        return self._items_from_cards(cards, max_products)
+    
+    def _items_from_cards(self, cards: List[dict], max_products: int) -> List[CrawledProductItem]:
+        """Map product cards (kết quả _SEARCH_RESULTS_JS) sang CrawledProductItem"""
+        results = []
+        seen_ids = set()
+        
+        for card in cards:
+            if len(results) >= max_products:
+                break
+            
+            link = card.get("href") or ""
+            if "-i." not in link:
+                continue
+            ids = _IDS_RE.search(link)
+            key = ids.groups() if ids else link
+            if key in seen_ids:
+                continue
+            seen_ids.add(key)
+            
+            name = card.get("name") or ""
+            if len(name) < 5:
+                continue
+            
+            price = None
+            numbers = _PRICE_NUM_RE.findall(card.get("price") or "")
+            if numbers:
+                with suppress(ValueError):
+                    price = float(numbers[0].replace('.', '').replace(',', ''))
+            
+            img = card.get("img")
+            if img and not img.startswith("http"):
+                img = None
+            
+            results.append(CrawledProductItem(
+                name=name,
+                price=price,
+                sold=None,
+                rating=None,
+                img=img,
+                link=link,
+                platform="shopee"
+            ))
+        
+        return results
 
+    def _items_from_json(self, items: list, max_products: int) -> List[CrawledProductItem]:
+        """Map search items (API / embedded page state) sang CrawledProductItem"""
+        results = []
+        for item in items:
+            if len(results) >= max_products:
+                break
+            
+            item_basic = item.get("item_basic") or item
+            shopid = item_basic.get("shopid")
+            itemid = item_basic.get("itemid")
+            name = item_basic.get("name") or ""
+            if not shopid or not itemid or not name:
+                continue
+            
+            # Shopee stores price * 100000
+            price = (item_basic.get("price") or item_basic.get("price_min") or 0) / 100000
+            item_rating = item_basic.get("item_rating") or {}
+            image = item_basic.get("image")
+            
+            results.append(CrawledProductItem(
+                name=name,
+                price=price or None,
+                sold=item_basic.get("historical_sold") or item_basic.get("sold"),
+                rating=item_rating.get("rating_star"),
+                img=f"https://down-vn.img.susercontent.com/file/{image}" if image else None,
+                link=f"{self.base_url}/product-i.{shopid}.{itemid}",
+                platform="shopee",
+                review_count=item_basic.get("cmt_count"),
+            ))
+        
+        return results
+    
+    def _find_embedded_items(self, node, depth: int = 0) -> Optional[list]:
+        """Tìm list items có shopid/itemid trong page state JSON (path thay đổi theo layout)"""
+        if depth > 8:
+            return None
+        if isinstance(node, list):
+            if node and isinstance(node[0], dict) and ("item_basic" in node[0] or "itemid" in node[0]):
+                return node
+            children = node
+        elif isinstance(node, dict):
+            children = node.values()
+        else:
+            return None
+        for child in children:
+            found = self._find_embedded_items(child, depth + 1)
+            if found:
+                return found
+        return None
+    
     def _parse_search_results(self, html: str, max_products: int = 10) -> List[CrawledProductItem]:
         """Parse products từ HTML search results"""
+        # Embedded page state (1 json parse) trước, BeautifulSoup chỉ khi không có
+        m = _EMBEDDED_STATE_RE.search(html)
+        if m:
+            try:
+                items = self._find_embedded_items(_loads(m.group(1)))
+                if items:
+                    results = self._items_from_json(items, max_products)
+                    if results:
+                        return results
+            except ValueError as e:
+                logger.debug(f"Embedded state is not valid JSON: {e}")
+        
         try:
             from bs4 import BeautifulSoup
         except ImportError:
-            print("[SHOPEE] ❌ BeautifulSoup not installed")
+            logger.error("[SHOPEE] ❌ BeautifulSoup not installed")
             return []
         
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, HTML_PARSER)
         results = []
         
         # Shopee product selectors (may change)
         selectors = [
             # Selector 1: Product links with -i. pattern
-            ("a", {"href": lambda x: x and "-i." in x}),
+            ("a", {"href": _PRODUCT_HREF_RE}),
             # Selector 2: data-sqe attribute
             ("div", {"data-sqe": "link"}),
         ]
@@ -409,16 +894,15 @@ class ShopeeScraper(BaseScraper):
             found = soup.find_all(tag, attrs)
             if found:
                 product_links = found
-                print(f"[SHOPEE] Found {len(found)} items with selector: {tag}, {attrs}")
+                logger.info(f"[SHOPEE] Found {len(found)} items with selector: {tag}, {attrs}")
                 break
         
         if not product_links:
-            print("[SHOPEE] ⚠️  No products found in HTML")
-            # Debug: print first 1000 chars
-            print(f"[SHOPEE] HTML preview: {html[:1000]}")
+            logger.warning("[SHOPEE] ⚠️  No products found in HTML")
+            logger.debug("No product links in %d chars of search HTML", len(html))
             return []
         
-        seen_links = set()
+        seen_ids = set()
         
         for elem in product_links:
             if len(results) >= max_products:
@@ -429,29 +913,31 @@ class ShopeeScraper(BaseScraper):
                 if elem.name == "a":
                     link = elem.get("href", "")
                 else:
-                    link_elem = elem.find("a", href=lambda x: x and "-i." in x)
+                    link_elem = elem.find("a", href=_PRODUCT_HREF_RE)
                     link = link_elem.get("href", "") if link_elem else ""
                 
                 if not link or "-i." not in link:
                     continue
                 
+                # Skip duplicates by (shopid, itemid) - catches relative/absolute/tracking variants
+                ids = _IDS_RE.search(link)
+                key = ids.groups() if ids else link
+                if key in seen_ids:
+                    continue
+                seen_ids.add(key)
+                
                 # Normalize link
                 if link.startswith("/"):
                     link = self.base_url + link
                 elif not link.startswith("http"):
                     link = self.base_url + "/" + link
                 
-                # Skip duplicates
-                if link in seen_links:
-                    continue
-                seen_links.add(link)
-                
                 # Get parent container for more info
                 parent = elem.find_parent("div") or elem
                 
                 # Get name
                 name = ""
-                name_elem = parent.find("div", class_=lambda x: x and "line-clamp" in str(x))
+                name_elem = parent.find("div", class_=_LINE_CLAMP_RE)
                 if name_elem:
                     name = name_elem.get_text(strip=True)
                 if not name:
@@ -462,16 +948,14 @@ class ShopeeScraper(BaseScraper):
                 
                 # Get price
                 price = None
-                price_elem = parent.find("span", string=re.compile(r'₫|đ|\d'))
+                price_elem = parent.find("span", string=_PRICE_CHAR_RE)
                 if price_elem:
                     price_text = price_elem.get_text(strip=True)
                     # Extract numbers
-                    numbers = re.findall(r'[\d.,]+', price_text)
+                    numbers = _PRICE_NUM_RE.findall(price_text)
                     if numbers:
-                        try:
+                        with suppress(ValueError):
                             price = float(numbers[0].replace('.', '').replace(',', ''))
-                        except:
-                            pass
                 
                 # Get image
                 img = None
@@ -499,47 +983,46 @@ class ShopeeScraper(BaseScraper):
 
     def _extract_ids(self, url: str) -> tuple[Optional[str], Optional[str]]:
         """Extract shopid và itemid từ URL"""
-        m = re.search(r"i\.(\d+)\.(\d+)", url)
+        m = _IDS_RE.search(url)
         if m:
             return m.group(1), m.group(2)
         return None, None
 
-    def crawl_product_details(self, product_url: str, review_limit: int = 30) -> CrawledProductDetail:
+    def crawl_product_details(self, product_url: str, review_limit: int = 30, force_refresh: bool = False) -> CrawledProductDetail:
         """
         Crawl product details và reviews
         Ưu tiên API (nhanh) → Fallback Selenium nếu cần
+        force_refresh=True bỏ qua cache review pages
         """
-        print(f"\n{'='*60}")
-        print(f"[SHOPEE] 📦 Crawling product details")
-        print(f"[SHOPEE] URL: {product_url}")
-        print(f"{'='*60}")
+        logger.info(f"[SHOPEE] 📦 Crawling product details")
+        logger.info(f"[SHOPEE] URL: {product_url}")
         
         shopid, itemid = self._extract_ids(product_url)
         if not shopid or not itemid:
-            print(f"[SHOPEE] ❌ Cannot extract IDs from URL")
+            logger.error(f"[SHOPEE] ❌ Cannot extract IDs from URL")
             return CrawledProductDetail(link=product_url)
         
-        print(f"[SHOPEE] 🔑 Shop ID: {shopid}, Item ID: {itemid}")
+        logger.info(f"[SHOPEE] 🔑 Shop ID: {shopid}, Item ID: {itemid}")
         
         # Load cookies
         saved_cookies = self.cookie_manager.load_cookies()
         
         if not saved_cookies:
-            print("[SHOPEE] ❌ No cookies found!")
-            print("[SHOPEE] 💡 Run: POST /api/v1/shopee/session/auto-login")
+            logger.error("[SHOPEE] ❌ No cookies found!")
+            logger.info("[SHOPEE] 💡 Run: POST /api/v1/shopee/session/auto-login")
             return CrawledProductDetail(link=product_url)
         
-        print(f"[SHOPEE] 🍪 Found {len(saved_cookies)} cookies")
+        logger.info(f"[SHOPEE] 🍪 Found {len(saved_cookies)} cookies")
         
         # ========================================
         # PHƯƠNG PHÁP 1: API TRỰC TIẾP (NHANH!)
         # ========================================
-        print("[SHOPEE] 🚀 Trying API method (faster)...")
+        logger.info("[SHOPEE] 🚀 Trying API method (faster)...")
         
-        all_reviews = self._fetch_reviews_via_api(saved_cookies, shopid, itemid, review_limit)
+        all_reviews = self._fetch_reviews_via_api(saved_cookies, shopid, itemid, review_limit, force_refresh)
         
         if all_reviews:
-            print(f"[SHOPEE] ✅ API method success! Got {len(all_reviews)} reviews")
+            logger.info(f"[SHOPEE] ✅ API method success! Got {len(all_reviews)} reviews")
             return CrawledProductDetail(
                 link=product_url,
                 category="",
@@ -552,7 +1035,7 @@ class ShopeeScraper(BaseScraper):
         # ========================================
         # PHƯƠNG PHÁP 2: SELENIUM (FALLBACK)
         # ========================================
-        print("[SHOPEE] ⚠️  API failed, trying Selenium fallback...")
+        logger.warning("[SHOPEE] ⚠️  API failed, trying Selenium fallback...")
         all_reviews = self._fetch_reviews_via_selenium(product_url, saved_cookies, shopid, itemid, review_limit)
         
         return CrawledProductDetail(
@@ -564,106 +1047,271 @@ class ShopeeScraper(BaseScraper):
             comments=all_reviews
         )
     
+    def crawl_product_details_batch(
+        self,
+        urls: List[str],
+        review_limit: int = 30,
+        workers: int = 4
+    ) -> List[CrawledProductDetail]:
+        """
+        Crawl nhiều sản phẩm song song, giữ nguyên thứ tự urls
+        API và Selenium fallback đều chạy trên ThreadPool; mỗi thread giữ 1 driver riêng từ pool của account
+        (không fork process từ server đang chạy thread, driver luôn quay về pool để shutdown quit được)
+        """
+        saved_cookies = self.cookie_manager.load_cookies()
+        if not saved_cookies:
+            logger.error("[SHOPEE] ❌ No cookies found!")
+            logger.info("[SHOPEE] 💡 Run: POST /api/v1/shopee/session/auto-login")
+            return [CrawledProductDetail(link=url) for url in urls]
+        
+        def via_api(url: str) -> List[CrawledReview]:
+            shopid, itemid = self._extract_ids(url)
+            if not shopid or not itemid:
+                return []
+            return self._fetch_reviews_via_api(saved_cookies, shopid, itemid, review_limit)
+        
+        results = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for url, reviews in zip(urls, executor.map(via_api, urls)):
+                if reviews:
+                    results[url] = CrawledProductDetail(
+                        link=url,
+                        total_rating=len(reviews),
+                        comments=reviews
+                    )
+        
+        pending = [url for url in urls if url not in results and all(self._extract_ids(url))]
+        if pending:
+            # Số browser đồng thời không vượt quá kích thước pool => mọi driver đều được trả về pool
+            selenium_workers = min(workers, len(pending), self.DRIVER_POOL_SIZE)
+            logger.warning(f"[SHOPEE] ⚠️  API failed for {len(pending)} products, trying Selenium with {selenium_workers} browsers...")
+            with ThreadPoolExecutor(max_workers=selenium_workers) as executor:
+                details = executor.map(self._crawl_one_via_selenium, pending, repeat(saved_cookies), repeat(review_limit))
+                results.update(zip(pending, details))
+        
+        return [results.get(url) or CrawledProductDetail(link=url) for url in urls]
+    
+    @staticmethod
+    def _review_from_rating(r: dict) -> CrawledReview:
+        """
+        get_ratings row → CrawledReview
+        Fields được ép kiểu ở đây nên dùng model_construct (bỏ qua validation của pydantic)
+        """
+        return CrawledReview.model_construct(
+            author=r.get("author_username") or "Anonymous",
+            rating=int(r.get("rating_star", 5)),
+            content=r.get("comment") or "",
+            time=str(r.get("ctime", "")),
+            images=list(map(_IMG_PREFIX.__add__, r.get("images") or ())),
+            helpful_count=int(r.get("like_count") or 0),
+            seller_respond=None,
+        )
+    
+    @staticmethod
+    def _ratings_params(shopid: str, itemid: str, offset: int) -> dict:
+        """Query params của 1 page get_ratings"""
+        return {
+            "itemid": itemid,
+            "shopid": shopid,
+            "filter": 0,
+            "flag": 1,
+            "limit": _RATINGS_PAGE_SIZE,
+            "offset": offset,
+            "type": 0
+        }
+    
+    @staticmethod
+    def _ratings_cache_key(shopid: str, itemid: str, offset: int) -> str:
+        """Cache key của 1 page get_ratings (dùng chung cho API sync/async và Selenium)"""
+        return f"shopee:ratings:{shopid}:{itemid}:{offset}:{_RATINGS_PAGE_SIZE}"
+    
+    @staticmethod
+    def _parse_ratings_payload(status: int, content: bytes) -> Optional[list]:
+        """
+        Response get_ratings → list ratings của page
+        None khi lỗi (HTTP status hoặc API error), [] khi hết reviews
+        """
+        if status != 200:
+            logger.error(f"[SHOPEE API] ❌ Status {status}")
+            return None
+        
+        data = _loads(content)
+        
+        # Check for API errors
+        if data.get("error"):
+            logger.error(f"[SHOPEE API] ❌ API error: {data.get('error')}")
+            return None
+        
+        return (data.get("data") or {}).get("ratings") or []
+    
+    def _ratings_to_reviews(self, pages: List[Optional[list]], review_limit: int) -> List[CrawledReview]:
+        """
+        Gộp các page get_ratings (theo thứ tự offset) thành CrawledReview
+        Page None (lỗi) → [] để trigger fallback
+        """
+        # Select the rows first (one bounded pass), then build models - no per-row length checks
+        rows = []
+        for ratings in pages:
+            if ratings is None:
+                return []  # Return empty to trigger fallback
+            
+            if not ratings:
+                logger.info(f"[SHOPEE API] 📭 No more reviews")
+                break
+            
+            rows.extend(islice(ratings, review_limit - len(rows)))
+            logger.info(f"[SHOPEE API] 📝 Got {len(ratings)} reviews, total: {len(rows)}")
+            if len(rows) >= review_limit:
+                break
+        
+        return [self._review_from_rating(r) for r in rows]
+    
     def _fetch_reviews_via_api(
         self, 
         cookies: List[dict], 
         shopid: str, 
         itemid: str, 
-        review_limit: int
+        review_limit: int,
+        force_refresh: bool = False
     ) -> List[CrawledReview]:
         """
         Fetch reviews trực tiếp qua API (NHANH!)
         Chỉ cần cookies, không cần Selenium
+        Mỗi page được cache theo (shopid, itemid, offset)
         """
-        import requests
-        
-        all_reviews: List[CrawledReview] = []
-        
         try:
-            # Create session with cookies
-            session = requests.Session()
-            session.headers.update({
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-                "Accept": "application/json",
-                "Accept-Language": "vi-VN,vi;q=0.9",
-                "Referer": f"https://shopee.vn/product-i.{shopid}.{itemid}",
-            })
+            # Reuse the instance session (TCP/TLS kept alive across products)
+            session = self._get_session(cookies)
+            headers = {"Referer": f"https://shopee.vn/product-i.{shopid}.{itemid}"}
             
-            # Apply cookies
-            for c in cookies:
-                if c.get('name') and c.get('value'):
-                    session.cookies.set(
-                        c['name'], 
-                        c['value'], 
-                        domain=c.get('domain', '.shopee.vn')
-                    )
-            
-            # Fetch reviews
-            reviews_api = "https://shopee.vn/api/v2/item/get_ratings"
-            offset = 0
-            limit = 20
+            # Fetch reviews - the API accepts arbitrary offsets, so request all pages at once
+            offsets = list(range(0, review_limit, _RATINGS_PAGE_SIZE))
             
-            while len(all_reviews) < review_limit:
-                params = {
-                    "itemid": itemid,
-                    "shopid": shopid,
-                    "filter": 0,
-                    "flag": 1,
-                    "limit": limit,
-                    "offset": offset,
-                    "type": 0
-                }
+            def fetch_page(offset: int) -> Optional[list]:
+                cache_key = self._ratings_cache_key(shopid, itemid, offset)
+                if not force_refresh:
+                    cached = self.cache.get(cache_key)
+                    if cached is not None:
+                        return cached
                 
-                print(f"[SHOPEE API] � Fetching reviews (offset={offset})...")
-                resp = session.get(reviews_api, params=params, timeout=15)
+                logger.info(f"[SHOPEE API] � Fetching reviews (offset={offset})...")
+                # Chỉ request thật mới tốn budget (cache hit ở trên thì không)
+                _RATINGS_BUDGET.acquire()
+                resp = session.get(
+                    _RATINGS_API, params=self._ratings_params(shopid, itemid, offset), headers=headers, timeout=15
+                )
                 
-                if resp.status_code != 200:
-                    print(f"[SHOPEE API] ❌ Status {resp.status_code}")
-                    return []  # Return empty to trigger fallback
-                
-                data = resp.json()
-                
-                # Check for API errors
-                if data.get("error"):
-                    print(f"[SHOPEE API] ❌ API error: {data.get('error')}")
-                    return []
-                
-                ratings_data = data.get("data") or {}
-                ratings = ratings_data.get("ratings") or []
-                
-                if not ratings:
-                    print(f"[SHOPEE API] 📭 No more reviews")
-                    break
-                
-                for r in ratings:
-                    if len(all_reviews) >= review_limit:
-                        break
-                    
-                    images = r.get("images") or []
-                    image_urls = [
-                        f"https://down-vn.img.susercontent.com/{img}" for img in images
-                    ]
-                    
-                    all_reviews.append(CrawledReview(
-                        author=r.get("author_username") or "Anonymous",
-                        rating=r.get("rating_star", 5),
-                        content=r.get("comment") or "",
-                        time=str(r.get("ctime", "")),
-                        images=image_urls,
-                        helpful_count=r.get("like_count", 0)
-                    ))
-                
-                offset += len(ratings)
-                print(f"[SHOPEE API] 📝 Got {len(ratings)} reviews, total: {len(all_reviews)}")
-                
-                time.sleep(0.3)  # Small delay
+                ratings = self._parse_ratings_payload(resp.status_code, resp.content)
+                if ratings is not None:
+                    self.cache.setex(cache_key, self.REVIEWS_CACHE_TTL, ratings)
+                return ratings
             
-            return all_reviews
+            if not offsets:
+                return []
+            
+            with ThreadPoolExecutor(max_workers=min(8, len(offsets))) as executor:
+                pages = list(executor.map(fetch_page, offsets))
+            
+            return self._ratings_to_reviews(pages, review_limit)
             
         except Exception as e:
-            print(f"[SHOPEE API] ❌ Error: {str(e)}")
+            logger.error(f"[SHOPEE API] ❌ Error: {str(e)}")
             return []
     
+    async def _fetch_reviews_via_api_async(
+        self,
+        cookies: List[dict],
+        shopid: str,
+        itemid: str,
+        review_limit: int,
+        force_refresh: bool = False
+    ) -> List[CrawledReview]:
+        """
+        Bản async của _fetch_reviews_via_api: mọi page chạy trên 1 event loop (aiohttp)
+        Không có aiohttp → chạy bản sync trong thread
+        """
+        if aiohttp is None:
+            return await asyncio.to_thread(
+                self._fetch_reviews_via_api, cookies, shopid, itemid, review_limit, force_refresh
+            )
+        
+        offsets = list(range(0, review_limit, _RATINGS_PAGE_SIZE))
+        if not offsets:
+            return []
+        
+        headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+            "Accept": "application/json",
+            "Accept-Language": "vi-VN,vi;q=0.9",
+            "Referer": f"https://shopee.vn/product-i.{shopid}.{itemid}",
+        }
+        session_cookies = {c['name']: c['value'] for c in _normalize_cookies(cookies)}
+        
+        async def fetch_page(session: "aiohttp.ClientSession", offset: int) -> Optional[list]:
+            cache_key = self._ratings_cache_key(shopid, itemid, offset)
+            if not force_refresh:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
+            
+            # acquire() có thể sleep - chạy trong thread để không block event loop
+            await asyncio.to_thread(_RATINGS_BUDGET.acquire)
+            async with session.get(_RATINGS_API, params=self._ratings_params(shopid, itemid, offset)) as resp:
+                ratings = self._parse_ratings_payload(resp.status, await resp.read())
+            
+            if ratings is not None:
+                self.cache.setex(cache_key, self.REVIEWS_CACHE_TTL, ratings)
+            return ratings
+        
+        try:
+            timeout = aiohttp.ClientTimeout(total=15)
+            async with aiohttp.ClientSession(headers=headers, cookies=session_cookies, timeout=timeout) as session:
+                pages = await asyncio.gather(*(fetch_page(session, offset) for offset in offsets))
+            return self._ratings_to_reviews(pages, review_limit)
+            
+        except Exception as e:
+            logger.error(f"[SHOPEE API] ❌ Error: {str(e)}")
+            return []
+    
+    async def crawl_product_details_async(self, product_url: str, review_limit: int = 30, force_refresh: bool = False) -> CrawledProductDetail:
+        """
+        Bản async của crawl_product_details cho batch jobs:
+        asyncio.gather(*(scraper.crawl_product_details_async(u) for u in urls))
+        """
+        shopid, itemid = self._extract_ids(product_url)
+        if not shopid or not itemid:
+            return CrawledProductDetail(link=product_url)
+        
+        saved_cookies = self.cookie_manager.load_cookies()
+        if not saved_cookies:
+            return CrawledProductDetail(link=product_url)
+        
+        all_reviews = await self._fetch_reviews_via_api_async(saved_cookies, shopid, itemid, review_limit, force_refresh)
+        if not all_reviews:
+            # Selenium is blocking - keep it off the event loop
+            all_reviews = await asyncio.to_thread(
+                self._fetch_reviews_via_selenium, product_url, saved_cookies, shopid, itemid, review_limit
+            )
+        
+        return CrawledProductDetail(
+            link=product_url,
+            category="",
+            description="",
+            detailed_rating={},
+            total_rating=len(all_reviews),
+            comments=all_reviews
+        )
+    
+    def _crawl_one_via_selenium(self, product_url: str, cookies: List[dict], review_limit: int) -> CrawledProductDetail:
+        """Worker Selenium của crawl_product_details_batch (chạy trong thread, driver lấy từ pool)"""
+        shopid, itemid = self._extract_ids(product_url)
+        reviews = self._fetch_reviews_via_selenium(product_url, cookies, shopid, itemid, review_limit)
+        return CrawledProductDetail(
+            link=product_url,
+            total_rating=len(reviews),
+            comments=reviews
+        )
+    
     def _fetch_reviews_via_selenium(
         self,
         product_url: str,
@@ -676,44 +1324,23 @@ class ShopeeScraper(BaseScraper):
         Fetch reviews via Selenium (FALLBACK)
         Dùng khi API bị block
         """
-        import requests
-        
         driver = None
         all_reviews: List[CrawledReview] = []
         
         try:
-            print("[SHOPEE SELENIUM] 🚀 Starting browser...")
-            
-            options = uc.ChromeOptions()
-            # Non-headless để bypass detection
-            options.add_argument("--window-size=1920,1080")
-            options.add_argument("--disable-gpu")
-            options.add_argument("--no-sandbox")
-            options.add_argument("--lang=vi-VN")
-            
-            driver = uc.Chrome(options=options, version_main=None)
+            logger.debug("[SHOPEE SELENIUM] Starting browser")
+            driver = self._get_driver()
             
             # Load homepage and apply cookies
             driver.get(self.base_url)
-            time.sleep(2)
+            self._wait_page_ready(driver)
             
-            for cookie in cookies:
-                try:
-                    cookie_dict = {
-                        'name': cookie.get('name'),
-                        'value': cookie.get('value'),
-                        'domain': cookie.get('domain', '.shopee.vn'),
-                        'path': cookie.get('path', '/'),
-                    }
-                    if cookie_dict['name'] and cookie_dict['value']:
-                        driver.add_cookie(cookie_dict)
-                except:
-                    pass
+            self._set_browser_cookies(driver, cookies)
             
             # Load product page
-            print("[SHOPEE SELENIUM] 📄 Loading product page...")
+            logger.debug("[SHOPEE SELENIUM] Loading product page")
             driver.get(product_url)
-            time.sleep(5)
+            self._wait_page_ready(driver, timeout=15)
             
             # Scroll to reviews
             driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
@@ -733,28 +1360,20 @@ class ShopeeScraper(BaseScraper):
             for c in browser_cookies:
                 session.cookies.set(c['name'], c['value'])
             
-            reviews_api = "https://shopee.vn/api/v2/item/get_ratings"
             offset = 0
-            limit = 20
             
             while len(all_reviews) < review_limit:
-                params = {
-                    "itemid": itemid,
-                    "shopid": shopid,
-                    "filter": 0,
-                    "flag": 1,
-                    "limit": limit,
-                    "offset": offset,
-                    "type": 0
-                }
-                
                 try:
-                    resp = session.get(reviews_api, params=params, timeout=15)
-                    if resp.status_code != 200:
-                        break
-                    
-                    data = resp.json().get("data") or {}
-                    ratings = data.get("ratings") or []
+                    # Page đã có trong cache (API path lấy được một phần) thì không tốn budget
+                    cache_key = self._ratings_cache_key(shopid, itemid, offset)
+                    ratings = self.cache.get(cache_key)
+                    if ratings is None:
+                        _RATINGS_BUDGET.acquire()
+                        resp = session.get(_RATINGS_API, params=self._ratings_params(shopid, itemid, offset), timeout=15)
+                        ratings = self._parse_ratings_payload(resp.status_code, resp.content)
+                        if ratings is None:
+                            break
+                        self.cache.setex(cache_key, self.REVIEWS_CACHE_TTL, ratings)
                     
                     if not ratings:
                         break
@@ -763,40 +1382,24 @@ class ShopeeScraper(BaseScraper):
                         if len(all_reviews) >= review_limit:
                             break
                         
-                        images = r.get("images") or []
-                        image_urls = [
-                            f"https://down-vn.img.susercontent.com/{img}" for img in images
-                        ]
-                        
-                        all_reviews.append(CrawledReview(
-                            author=r.get("author_username") or "Anonymous",
-                            rating=r.get("rating_star", 5),
-                            content=r.get("comment") or "",
-                            time=str(r.get("ctime", "")),
-                            images=image_urls,
-                            helpful_count=r.get("like_count", 0)
-                        ))
+                        all_reviews.append(self._review_from_rating(r))
                     
                     offset += len(ratings)
-                    print(f"[SHOPEE SELENIUM] 📝 Got {len(ratings)} reviews, total: {len(all_reviews)}")
-                    time.sleep(0.5)
+                    logger.debug("[SHOPEE SELENIUM] Got %d reviews, total %d", len(ratings), len(all_reviews))
                     
                 except Exception as e:
-                    print(f"[SHOPEE SELENIUM] ⚠️  API error: {e}")
+                    logger.warning("[SHOPEE SELENIUM] API error: %s", e)
                     break
             
             # Update cookies
-            self.cookie_manager.save_cookies(browser_cookies)
-            print(f"[SHOPEE SELENIUM] ✅ Total reviews: {len(all_reviews)}")
+            self.cookie_manager.save_cookies_if_changed(browser_cookies)
+            logger.debug("[SHOPEE SELENIUM] Total reviews: %d", len(all_reviews))
             
             return all_reviews
             
         except Exception as e:
-            print(f"[SHOPEE SELENIUM] ❌ Error: {str(e)}")
+            logger.error("[SHOPEE SELENIUM] Error: %s", e)
             return []
         finally:
             if driver:
-                try:
-                    driver.quit()
-                except:
-                    pass
+                self._return_driver(driver)
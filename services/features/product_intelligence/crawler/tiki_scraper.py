@@ -1,10 +1,34 @@
+import asyncio
+import json
+import math
+import re
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
 from services.features.product_intelligence.crawler.base_scraper import BaseScraper
 from schemas.product_crawler import CrawledProductItem, CrawledProductDetail, CrawledReview
 
+# orjson decodes straight from bytes (no charset detection), much faster on review payloads
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+REVIEWS_PER_PAGE = 20
+
+# ".../ten-san-pham-p123456.html?spid=..." → "123456"
+_TIKI_PID_RE = re.compile(r'-p(\d+)(?=[.?#]|$)')
+
 
 class TikiScraper(BaseScraper):
     def __init__(self):
@@ -12,6 +36,21 @@ class TikiScraper(BaseScraper):
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
             "Referer": "https://tiki.vn/",
         }
+        # Keep-alive pool shared by the search, detail and concurrent review requests
+        self._session = requests.Session()
+        self._session.headers.update(self.headers)
+        self._session.mount("https://", HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=Retry(total=2, backoff_factor=0.3),
+        ))
+
+    def warmup(self) -> None:
+        # HEAD on the homepage leaves a live TLS connection in the session pool
+        try:
+            self._session.head("https://tiki.vn/", timeout=5)
+        except requests.RequestException:
+            pass
 
     def crawl_search_results(self, search_url: str, max_products: int = 10) -> List[CrawledProductItem]:
         query = search_url
@@ -30,8 +69,8 @@ class TikiScraper(BaseScraper):
         api_url = f"https://tiki.vn/api/v2/products?limit={max_products}&q={q}"
 
         try:
-            res = requests.get(api_url, headers=self.headers, timeout=10)
-            data = res.json()
+            res = self._session.get(api_url, timeout=10)
+            data = _loads(res.content)
             products = data.get("data", [])
 
             results = []
@@ -60,70 +99,114 @@ class TikiScraper(BaseScraper):
         except Exception:
             return []
 
+    def _extract_product_id(self, product_url: str) -> str:
+        m = _TIKI_PID_RE.search(product_url)
+        return m.group(1) if m else ""
+
+    def _review_pages(self, data: dict, review_limit: int) -> List[int]:
+        # Only request pages that can hold reviews (20 per page)
+        review_count = data.get("review_count")
+        wanted = review_limit if review_count is None else min(review_limit, int(review_count or 0))
+        return list(range(1, math.ceil(wanted / REVIEWS_PER_PAGE) + 1))
+
+    def _build_detail(self, product_url: str, data: dict, pages: List[list], review_limit: int) -> CrawledProductDetail:
+        comments = []
+        for reviews_list in pages:
+            if not reviews_list:
+                break
+
+            for r in reviews_list:
+                if len(comments) >= review_limit:
+                    break
+
+                images = []
+                if r.get("images"):
+                    images = [img.get("full_path") for img in r.get("images") if img.get("full_path")]
+
+                comments.append(CrawledReview(
+                    author=r.get("created_by", {}).get("full_name", "Anonymous"),
+                    rating=r.get("rating", 5),
+                    content=r.get("content", ""),
+                    time=str(r.get("created_at", "")),
+                    images=images,
+                    helpful_count=r.get("thank_count", 0),
+                    seller_respond=None
+                ))
+
+        detailed_rating = data.get("rating_average", 0)
+        if isinstance(detailed_rating, (int, float)):
+            detailed_rating = {
+                "avg": detailed_rating,
+                "count": data.get("review_count", 0)
+            }
+
+        return CrawledProductDetail(
+            link=product_url,
+            category=data.get("categories", {}).get("name", ""),
+            description=data.get("description", ""),
+            detailed_rating=detailed_rating,
+            total_rating=data.get("review_count", 0),
+            comments=comments
+        )
+
     def crawl_product_details(self, product_url: str, review_limit: int = 30) -> CrawledProductDetail:
         try:
-            product_id = ""
-            if "-p" in product_url:
-                part = product_url.split("-p")[-1]
-                product_id = part.split(".")[0].split("?")[0]
-
+            product_id = self._extract_product_id(product_url)
             if not product_id:
                 return CrawledProductDetail(link=product_url)
 
             api_url = f"https://tiki.vn/api/v2/products/{product_id}"
-            res = requests.get(api_url, headers=self.headers, timeout=10)
+            res = self._session.get(api_url, timeout=10)
             if res.status_code != 200:
                 return CrawledProductDetail(link=product_url)
 
-            data = res.json()
-            description = data.get("description", "")
+            data = _loads(res.content)
 
-            comments = []
-            page = 1
-            while len(comments) < review_limit:
-                reviews_api = f"https://tiki.vn/api/v2/reviews?product_id={product_id}&limit=20&page={page}"
-                rev_res = requests.get(reviews_api, headers=self.headers, timeout=10)
+            def fetch_page(page: int) -> list:
+                reviews_api = f"https://tiki.vn/api/v2/reviews?product_id={product_id}&limit={REVIEWS_PER_PAGE}&page={page}"
+                rev_res = self._session.get(reviews_api, timeout=10)
                 if rev_res.status_code != 200:
-                    break
+                    return []
+                return _loads(rev_res.content).get("data", [])
 
-                rev_data = rev_res.json()
-                reviews_list = rev_data.get("data", [])
-                if not reviews_list:
-                    break
+            # Review pages are independent - fetch them concurrently
+            page_numbers = self._review_pages(data, review_limit)
+            pages = []
+            if page_numbers:
+                with ThreadPoolExecutor(max_workers=min(10, len(page_numbers))) as executor:
+                    pages = list(executor.map(fetch_page, page_numbers))
+
+            return self._build_detail(product_url, data, pages, review_limit)
+        except Exception:
+            return CrawledProductDetail(link=product_url)
+
+    async def crawl_product_details_async(self, product_url: str, review_limit: int = 30) -> CrawledProductDetail:
+        """Async variant: all review pages on one aiohttp session (falls back to a worker thread)."""
+        if aiohttp is None:
+            return await asyncio.to_thread(self.crawl_product_details, product_url, review_limit)
+
+        try:
+            product_id = self._extract_product_id(product_url)
+            if not product_id:
+                return CrawledProductDetail(link=product_url)
+
+            connector = aiohttp.TCPConnector(limit=10)
+            timeout = aiohttp.ClientTimeout(total=10)
+            async with aiohttp.ClientSession(headers=self.headers, connector=connector, timeout=timeout) as session:
+                async with session.get(f"https://tiki.vn/api/v2/products/{product_id}") as res:
+                    if res.status != 200:
+                        return CrawledProductDetail(link=product_url)
+                    data = _loads(await res.read())
+
+                async def fetch_page(page: int) -> list:
+                    reviews_api = f"https://tiki.vn/api/v2/reviews?product_id={product_id}&limit={REVIEWS_PER_PAGE}&page={page}"
+                    async with session.get(reviews_api) as rev_res:
+                        if rev_res.status != 200:
+                            return []
+                        return _loads(await rev_res.read()).get("data", [])
+
+                pages = await asyncio.gather(*(fetch_page(p) for p in self._review_pages(data, review_limit)))
 
-                for r in reviews_list:
-                    if len(comments) >= review_limit:
-                        break
-
-                    images = []
-                    if r.get("images"):
-                        images = [img.get("full_path") for img in r.get("images") if img.get("full_path")]
-
-                    comments.append(CrawledReview(
-                        author=r.get("created_by", {}).get("full_name", "Anonymous"),
-                        rating=r.get("rating", 5),
-                        content=r.get("content", ""),
-                        time=str(r.get("created_at", "")),
-                        images=images,
-                        helpful_count=r.get("thank_count", 0),
-                        seller_respond=None
-                    ))
-                page += 1
-
-            detailed_rating = data.get("rating_average", 0)
-            if isinstance(detailed_rating, (int, float)):
-                detailed_rating = {
-                    "avg": detailed_rating,
-                    "count": data.get("review_count", 0)
-                }
-
-            return CrawledProductDetail(
-                link=product_url,
-                category=data.get("categories", {}).get("name", ""),
-                description=description,
-                detailed_rating=detailed_rating,
-                total_rating=data.get("review_count", 0),
-                comments=comments
-            )
+            return self._build_detail(product_url, data, pages, review_limit)
         except Exception:
-            return CrawledProductDetail(link=product_url)
\ No newline at end of file
+            return CrawledProductDetail(link=product_url)
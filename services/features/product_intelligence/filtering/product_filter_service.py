@@ -1,4 +1,5 @@
-from typing import List, Tuple, Dict, Any
+from dataclasses import dataclass, field
+from typing import List, Tuple, Dict, Any, Optional
 import logging
 
 from schemas.product_crawler import CrawledProductItemExtended
@@ -6,6 +7,107 @@ from schemas.product_filter import ProductFilterCriteria
 
 logger = logging.getLogger(__name__)
 
+# (original, lowercased) pairs for required and excluded keywords
+KeywordPairs = Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]
+
+
+@dataclass(slots=True)
+class _PreformattedCriteria:
+    """Threshold fragments and joined lists of a criteria object, formatted once per filter call"""
+    min_rating: str = ""
+    max_rating: str = ""
+    min_review_count: str = ""
+    max_review_count: str = ""
+    min_price: str = ""
+    max_price: str = ""
+    min_sales_count: str = ""
+    min_trust_score: str = ""
+    platforms: str = ""
+    required_keywords: str = ""
+    trust_badge_types: str = ""
+    required_brands: str = ""
+    seller_locations: str = ""
+    
+    @classmethod
+    def from_criteria(cls, criteria: ProductFilterCriteria) -> "_PreformattedCriteria":
+        texts = cls()
+        if criteria.min_rating is not None:
+            texts.min_rating = f"≥ {criteria.min_rating}"
+        if criteria.max_rating is not None:
+            texts.max_rating = f"≤ {criteria.max_rating}"
+        if criteria.min_review_count is not None:
+            texts.min_review_count = f"≥ {criteria.min_review_count}"
+        if criteria.max_review_count is not None:
+            texts.max_review_count = f"≤ {criteria.max_review_count}"
+        if criteria.min_price is not None:
+            texts.min_price = f"≥ {criteria.min_price:,.0f} VND"
+        if criteria.max_price is not None:
+            texts.max_price = f"≤ {criteria.max_price:,.0f} VND"
+        if criteria.min_sales_count is not None:
+            texts.min_sales_count = f"≥ {criteria.min_sales_count}"
+        if criteria.min_trust_score is not None:
+            texts.min_trust_score = f"≥ {criteria.min_trust_score}"
+        if criteria.platforms:
+            texts.platforms = ", ".join(criteria.platforms)
+        if criteria.required_keywords:
+            texts.required_keywords = ", ".join(criteria.required_keywords)
+        if criteria.trust_badge_types:
+            texts.trust_badge_types = ", ".join(criteria.trust_badge_types)
+        if criteria.required_brands:
+            texts.required_brands = ", ".join(criteria.required_brands)
+        if criteria.seller_locations:
+            texts.seller_locations = ", ".join(criteria.seller_locations)
+        return texts
+
+
+@dataclass(slots=True)
+class RejectionBuffer:
+    """Rejected products stored column-wise; dicts are only built for what gets serialized"""
+    names: List[str] = field(default_factory=list)
+    urls: List[str] = field(default_factory=list)
+    platforms: List[str] = field(default_factory=list)
+    prices: List[float] = field(default_factory=list)
+    ratings: List[Optional[float]] = field(default_factory=list)
+    review_counts: List[Optional[int]] = field(default_factory=list)
+    sales_counts: List[Optional[int]] = field(default_factory=list)
+    is_malls: List[bool] = field(default_factory=list)
+    brands: List[Optional[str]] = field(default_factory=list)
+    reasons: List[str] = field(default_factory=list)
+    
+    def __len__(self) -> int:
+        return len(self.reasons)
+    
+    def append(self, product: CrawledProductItemExtended, reason: str) -> None:
+        self.names.append(product.product_name)
+        self.urls.append(product.product_url)
+        self.platforms.append(product.platform)
+        self.prices.append(product.price_current)
+        self.ratings.append(product.rating_score)
+        self.review_counts.append(product.review_count)
+        self.sales_counts.append(product.sales_count)
+        self.is_malls.append(product.is_mall)
+        self.brands.append(product.brand)
+        self.reasons.append(reason)
+    
+    def top_n_as_dicts(self, n: Optional[int] = None) -> List[Dict[str, Any]]:
+        """First n rejected products (all when n is None) in the API dict shape"""
+        end = len(self) if n is None else min(n, len(self))
+        return [
+            {
+                "product_name": self.names[i],
+                "product_url": self.urls[i],
+                "platform": self.platforms[i],
+                "price": self.prices[i],
+                "rating": self.ratings[i],
+                "review_count": self.review_counts[i],
+                "sales_count": self.sales_counts[i],
+                "is_mall": self.is_malls[i],
+                "brand": self.brands[i],
+                "reason": self.reasons[i]
+            }
+            for i in range(end)
+        ]
+
 
 class ProductFilterService:
     """Filter products based on criteria"""
@@ -15,35 +117,35 @@ class ProductFilterService:
         products: List[CrawledProductItemExtended],
         criteria: ProductFilterCriteria
     ) -> List[CrawledProductItemExtended]:
-        """Filter products based on criteria"""
-        
-        filtered = []
-        
-        for product in products:
-            if self._matches_criteria(product, criteria):
-                filtered.append(product)
-        
-        return filtered
+        """Filter products based on criteria (same rules as filter_products_with_reasons)"""
+        keywords = self._lowered_keywords(criteria)
+        texts = _PreformattedCriteria.from_criteria(criteria)
+        return [
+            product for product in products
+            if self._matches_criteria_with_reason(product, criteria, keywords, texts)[0]
+        ]
     
     def filter_products_with_reasons(
         self,
         products: List[CrawledProductItemExtended],
         criteria: ProductFilterCriteria
-    ) -> Tuple[List[CrawledProductItemExtended], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    ) -> Tuple[List[CrawledProductItemExtended], RejectionBuffer, List[Dict[str, Any]]]:
         """
         Filter products and return both passed and rejected products with reasons
         Returns: (filtered_products, rejected_products_with_reasons, passed_products_with_reasons)
         """
         filtered = []
-        rejected = []
+        rejected = RejectionBuffer()
         passed = []
+        keywords = self._lowered_keywords(criteria)
+        texts = _PreformattedCriteria.from_criteria(criteria)
         
         for product in products:
-            match_result, reason = self._matches_criteria_with_reason(product, criteria)
+            match_result, reason = self._matches_criteria_with_reason(product, criteria, keywords, texts)
             if match_result:
                 filtered.append(product)
                 # Generate reason why product passed
-                passed_reason = self._generate_passed_reason(product, criteria)
+                passed_reason = self._generate_passed_reason(product, criteria, texts)
                 passed.append({
                     "product_name": product.product_name,
                     "product_url": product.product_url,
@@ -57,54 +159,46 @@ class ProductFilterService:
                     "reason": passed_reason
                 })
             else:
-                rejected.append({
-                    "product_name": product.product_name,
-                    "product_url": product.product_url,
-                    "platform": product.platform,
-                    "price": product.price_current,
-                    "rating": product.rating_score,
-                    "review_count": product.review_count,
-                    "sales_count": product.sales_count,
-                    "is_mall": product.is_mall,
-                    "brand": product.brand,
-                    "reason": reason
-                })
+                rejected.append(product, reason)
         
         return filtered, rejected, passed
     
     def _generate_passed_reason(
         self,
         product: CrawledProductItemExtended,
-        criteria: ProductFilterCriteria
+        criteria: ProductFilterCriteria,
+        texts: Optional[_PreformattedCriteria] = None
     ) -> str:
         """Generate reason why product passed all criteria"""
         reasons = []
+        if texts is None:
+            texts = _PreformattedCriteria.from_criteria(criteria)
         
         # Rating
         if criteria.min_rating is not None:
             if product.rating_score is not None:
-                reasons.append(f"Rating: {product.rating_score:.1f} (≥ {criteria.min_rating})")
+                reasons.append(f"Rating: {product.rating_score:.1f} ({texts.min_rating})")
         if criteria.max_rating is not None:
             if product.rating_score is not None:
-                reasons.append(f"Rating: {product.rating_score:.1f} (≤ {criteria.max_rating})")
+                reasons.append(f"Rating: {product.rating_score:.1f} ({texts.max_rating})")
         
         # Review count
         if criteria.min_review_count is not None:
             if product.review_count is not None:
-                reasons.append(f"Reviews: {product.review_count} (≥ {criteria.min_review_count})")
+                reasons.append(f"Reviews: {product.review_count} ({texts.min_review_count})")
         if criteria.max_review_count is not None:
             if product.review_count is not None:
-                reasons.append(f"Reviews: {product.review_count} (≤ {criteria.max_review_count})")
+                reasons.append(f"Reviews: {product.review_count} ({texts.max_review_count})")
         
         # Price
         if criteria.min_price is not None:
-            reasons.append(f"Giá: {product.price_current:,.0f} VND (≥ {criteria.min_price:,.0f} VND)")
+            reasons.append(f"Giá: {product.price_current:,.0f} VND ({texts.min_price})")
         if criteria.max_price is not None:
-            reasons.append(f"Giá: {product.price_current:,.0f} VND (≤ {criteria.max_price:,.0f} VND)")
+            reasons.append(f"Giá: {product.price_current:,.0f} VND ({texts.max_price})")
         
         # Platform
         if criteria.platforms is not None:
-            reasons.append(f"Platform: {product.platform} (trong {', '.join(criteria.platforms)})")
+            reasons.append(f"Platform: {product.platform} (trong {texts.platforms})")
         
         # Mall
         if criteria.is_mall is not None:
@@ -118,17 +212,17 @@ class ProductFilterService:
         
         # Required keywords
         if criteria.required_keywords is not None:
-            reasons.append(f"Có từ khóa: {', '.join(criteria.required_keywords)}")
+            reasons.append(f"Có từ khóa: {texts.required_keywords}")
         
         # Sales count
         if criteria.min_sales_count is not None:
             if product.sales_count is not None:
-                reasons.append(f"Đã bán: {product.sales_count} (≥ {criteria.min_sales_count})")
+                reasons.append(f"Đã bán: {product.sales_count} ({texts.min_sales_count})")
         
         # Trust score
         if criteria.min_trust_score is not None:
             if product.trust_score is not None:
-                reasons.append(f"Trust score: {product.trust_score} (≥ {criteria.min_trust_score})")
+                reasons.append(f"Trust score: {product.trust_score} ({texts.min_trust_score})")
         
         # Trust badge
         if criteria.trust_badge_types is not None:
@@ -138,30 +232,34 @@ class ProductFilterService:
         # Required brands
         if criteria.required_brands is not None:
             if product.brand is not None:
-                reasons.append(f"Thương hiệu: {product.brand} (trong {', '.join(criteria.required_brands)})")
+                reasons.append(f"Thương hiệu: {product.brand} (trong {texts.required_brands})")
         
         # Seller location
         if criteria.seller_locations is not None:
             if product.seller_location is not None:
-                reasons.append(f"Vị trí seller: {product.seller_location} (trong {', '.join(criteria.seller_locations)})")
+                reasons.append(f"Vị trí seller: {product.seller_location} (trong {texts.seller_locations})")
         
         if reasons:
             return "Đạt tất cả tiêu chí: " + "; ".join(reasons)
         return "Đạt tất cả tiêu chí (không có tiêu chí lọc cụ thể)"
     
-    def _matches_criteria(
-        self,
-        product: CrawledProductItemExtended,
-        criteria: ProductFilterCriteria
-    ) -> bool:
-        """Check if product matches all criteria"""
-        match_result, _ = self._matches_criteria_with_reason(product, criteria)
-        return match_result
+    @staticmethod
+    def _lowered_keywords(criteria: ProductFilterCriteria) -> KeywordPairs:
+        """
+        Lowercase required/excluded keywords once per filter call
+        Returns: ([(keyword, keyword_lower), ...] for required, same for excluded)
+        """
+        return (
+            [(kw, kw.lower()) for kw in criteria.required_keywords or []],
+            [(kw, kw.lower()) for kw in criteria.excluded_keywords or []],
+        )
     
     def _matches_criteria_with_reason(
         self,
         product: CrawledProductItemExtended,
-        criteria: ProductFilterCriteria
+        criteria: ProductFilterCriteria,
+        keywords: Optional[KeywordPairs] = None,
+        texts: Optional[_PreformattedCriteria] = None
     ) -> Tuple[bool, str]:
         """
         Check if product matches all criteria and return reason if not
@@ -169,41 +267,46 @@ class ProductFilterService:
         """
         
         reasons = []
+        if keywords is None:
+            keywords = self._lowered_keywords(criteria)
+        required_keywords, excluded_keywords = keywords
+        if texts is None:
+            texts = _PreformattedCriteria.from_criteria(criteria)
         
         # Rating filter
         if criteria.min_rating is not None:
             if product.rating_score is None:
-                reasons.append(f"Không có rating (yêu cầu: ≥ {criteria.min_rating})")
+                reasons.append(f"Không có rating (yêu cầu: {texts.min_rating})")
             elif product.rating_score < criteria.min_rating:
-                reasons.append(f"Rating quá thấp: {product.rating_score:.1f} (yêu cầu: ≥ {criteria.min_rating})")
+                reasons.append(f"Rating quá thấp: {product.rating_score:.1f} (yêu cầu: {texts.min_rating})")
         
         if criteria.max_rating is not None:
             if product.rating_score is not None and product.rating_score > criteria.max_rating:
-                reasons.append(f"Rating quá cao: {product.rating_score:.1f} (yêu cầu: ≤ {criteria.max_rating})")
+                reasons.append(f"Rating quá cao: {product.rating_score:.1f} (yêu cầu: {texts.max_rating})")
         
         if criteria.min_review_count is not None:
             if product.review_count is None:
-                reasons.append(f"Không có review (yêu cầu: ≥ {criteria.min_review_count})")
+                reasons.append(f"Không có review (yêu cầu: {texts.min_review_count})")
             elif product.review_count < criteria.min_review_count:
-                reasons.append(f"Số review quá ít: {product.review_count} (yêu cầu: ≥ {criteria.min_review_count})")
+                reasons.append(f"Số review quá ít: {product.review_count} (yêu cầu: {texts.min_review_count})")
         
         if criteria.max_review_count is not None:
             if product.review_count is not None and product.review_count > criteria.max_review_count:
-                reasons.append(f"Số review quá nhiều: {product.review_count} (yêu cầu: ≤ {criteria.max_review_count})")
+                reasons.append(f"Số review quá nhiều: {product.review_count} (yêu cầu: {texts.max_review_count})")
         
         # Price filter
         if criteria.min_price is not None:
             if product.price_current < criteria.min_price:
-                reasons.append(f"Giá quá thấp: {product.price_current:,.0f} VND (yêu cầu: ≥ {criteria.min_price:,.0f} VND)")
+                reasons.append(f"Giá quá thấp: {product.price_current:,.0f} VND (yêu cầu: {texts.min_price})")
         
         if criteria.max_price is not None:
             if product.price_current > criteria.max_price:
-                reasons.append(f"Giá quá cao: {product.price_current:,.0f} VND (yêu cầu: ≤ {criteria.max_price:,.0f} VND)")
+                reasons.append(f"Giá quá cao: {product.price_current:,.0f} VND (yêu cầu: {texts.max_price})")
         
         # Platform filter
         if criteria.platforms is not None:
             if product.platform not in criteria.platforms:
-                reasons.append(f"Platform không phù hợp: {product.platform} (yêu cầu: {', '.join(criteria.platforms)})")
+                reasons.append(f"Platform không phù hợp: {product.platform} (yêu cầu: {texts.platforms})")
         
         # Mall filter
         if criteria.is_mall is not None:
@@ -219,47 +322,46 @@ class ProductFilterService:
                 actual = "Đã xác thực" if product.is_verified_seller else "Chưa xác thực"
                 reasons.append(f"Trạng thái xác thực không phù hợp: {actual} (yêu cầu: {expected})")
         
+        if required_keywords or excluded_keywords:
+            product_name_lower = product.product_name_lower
+        
         # Required keywords filter
-        if criteria.required_keywords is not None:
-            product_name_lower = product.product_name.lower()
-            missing_keywords = [kw for kw in criteria.required_keywords if kw.lower() not in product_name_lower]
-            if missing_keywords:
-                reasons.append(f"Thiếu từ khóa bắt buộc: {', '.join(missing_keywords)}")
+        if required_keywords and not all(kw_lower in product_name_lower for _, kw_lower in required_keywords):
+            missing_keywords = [kw for kw, kw_lower in required_keywords if kw_lower not in product_name_lower]
+            reasons.append(f"Thiếu từ khóa bắt buộc: {', '.join(missing_keywords)}")
         
         # Excluded keywords filter
-        if criteria.excluded_keywords is not None:
-            product_name_lower = product.product_name.lower()
-            found_keywords = [kw for kw in criteria.excluded_keywords if kw.lower() in product_name_lower]
-            if found_keywords:
-                reasons.append(f"Có từ khóa loại trừ: {', '.join(found_keywords)}")
+        if excluded_keywords and any(kw_lower in product_name_lower for _, kw_lower in excluded_keywords):
+            found_keywords = [kw for kw, kw_lower in excluded_keywords if kw_lower in product_name_lower]
+            reasons.append(f"Có từ khóa loại trừ: {', '.join(found_keywords)}")
         
         # Sales count filter
         if criteria.min_sales_count is not None:
             if product.sales_count is None:
-                reasons.append(f"Không có thông tin số lượng bán (yêu cầu: ≥ {criteria.min_sales_count})")
+                reasons.append(f"Không có thông tin số lượng bán (yêu cầu: {texts.min_sales_count})")
             elif product.sales_count < criteria.min_sales_count:
-                reasons.append(f"Số lượng bán quá ít: {product.sales_count} (yêu cầu: ≥ {criteria.min_sales_count})")
+                reasons.append(f"Số lượng bán quá ít: {product.sales_count} (yêu cầu: {texts.min_sales_count})")
         
         # Trust score filter
         if criteria.min_trust_score is not None:
             if product.trust_score is None:
-                reasons.append(f"Không có trust score (yêu cầu: ≥ {criteria.min_trust_score})")
+                reasons.append(f"Không có trust score (yêu cầu: {texts.min_trust_score})")
             elif product.trust_score < criteria.min_trust_score:
-                reasons.append(f"Trust score quá thấp: {product.trust_score} (yêu cầu: ≥ {criteria.min_trust_score})")
+                reasons.append(f"Trust score quá thấp: {product.trust_score} (yêu cầu: {texts.min_trust_score})")
         
         # Trust badge filter
         if criteria.trust_badge_types is not None:
             if product.trust_badge_type is None:
-                reasons.append(f"Không có trust badge (yêu cầu: {', '.join(criteria.trust_badge_types)})")
+                reasons.append(f"Không có trust badge (yêu cầu: {texts.trust_badge_types})")
             elif product.trust_badge_type not in criteria.trust_badge_types:
-                reasons.append(f"Trust badge không phù hợp: {product.trust_badge_type} (yêu cầu: {', '.join(criteria.trust_badge_types)})")
+                reasons.append(f"Trust badge không phù hợp: {product.trust_badge_type} (yêu cầu: {texts.trust_badge_types})")
         
         # Required brands filter
         if criteria.required_brands is not None:
             if product.brand is None:
-                reasons.append(f"Không có thương hiệu (yêu cầu: {', '.join(criteria.required_brands)})")
+                reasons.append(f"Không có thương hiệu (yêu cầu: {texts.required_brands})")
             elif product.brand not in criteria.required_brands:
-                reasons.append(f"Thương hiệu không phù hợp: {product.brand} (yêu cầu: {', '.join(criteria.required_brands)})")
+                reasons.append(f"Thương hiệu không phù hợp: {product.brand} (yêu cầu: {texts.required_brands})")
         
         # Excluded brands filter
         if criteria.excluded_brands is not None:
@@ -269,9 +371,9 @@ class ProductFilterService:
         # Seller location filter
         if criteria.seller_locations is not None:
             if product.seller_location is None:
-                reasons.append(f"Không có thông tin vị trí seller (yêu cầu: {', '.join(criteria.seller_locations)})")
+                reasons.append(f"Không có thông tin vị trí seller (yêu cầu: {texts.seller_locations})")
             elif product.seller_location not in criteria.seller_locations:
-                reasons.append(f"Vị trí seller không phù hợp: {product.seller_location} (yêu cầu: {', '.join(criteria.seller_locations)})")
+                reasons.append(f"Vị trí seller không phù hợp: {product.seller_location} (yêu cầu: {texts.seller_locations})")
         
         if reasons:
             return False, "; ".join(reasons)
@@ -1,10 +1,13 @@
 from .base import BaseSearchProvider
+from .ecommerce_provider import ECommerceProvider, ProviderConfig
 from .shopee.provider import ShopeeProvider
 from .lazada.provider import LazadaProvider
 from .tiki.provider import TikiProvider
 
 __all__ = [
     "BaseSearchProvider",
+    "ECommerceProvider",
+    "ProviderConfig",
     "ShopeeProvider",
     "LazadaProvider",
     "TikiProvider",
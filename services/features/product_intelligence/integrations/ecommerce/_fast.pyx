@@ -0,0 +1,10 @@
+# cython: language_level=3
+"""
+Optional compiled URL assembly for ECommerceProvider (pure-Python fallback in ecommerce_provider.py)
+Build in place with: cythonize -i _fast.pyx
+"""
+
+
+cpdef str build_budget_url(str prefix, str kw, str min_param, long long lo, str max_param, long long hi):
+    # Typed f-string compiles to a single C-level unicode join
+    return f"{prefix}{kw}&{min_param}={lo}&{max_param}={hi}"
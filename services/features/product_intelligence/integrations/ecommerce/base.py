@@ -1,8 +1,63 @@
+import asyncio
+import logging
+import re
 from abc import ABC, abstractmethod
-from typing import Optional
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import quote
+
+logger = logging.getLogger(__name__)
+
+
+# Characters urllib.parse.quote leaves untouched, plus the space we translate ourselves
+_PLAIN_KEYWORD_RE = re.compile(r'[A-Za-z0-9 _.~-]*')
+
+
+def _make_keyword_encoder(space: str) -> Callable[[str], str]:
+    """
+    Keyword → query value, with spaces encoded as `space` ("%20" or "+")
+    Plain ASCII keywords go through a translate table; anything else falls back to quote()
+    """
+    table = str.maketrans({" ": space})
+    
+    def encode(keyword: str, _plain=_PLAIN_KEYWORD_RE.fullmatch, _table=table, _quote=quote) -> str:
+        if keyword.isascii() and _plain(keyword):
+            return keyword.translate(_table)
+        encoded = _quote(keyword, safe='')
+        return encoded if space == "%20" else encoded.replace("%20", space)
+    
+    return encode
+
+
+def _fmt_vnd(value: float) -> str:
+    """1234567.8 → "1,234,568"; same output as f"{value:,.0f}" but formats an int"""
+    return f"{round(value):,}"
+
+
+@lru_cache(maxsize=1024)
+def _budget_bounds(budget: float):
+    """
+    Search price window around a budget (70% - 130%)
+    Returns: (lo_int, hi_int, lo_str, hi_str); strings use the "1,234,567" VND format
+    """
+    lo = budget * 0.7
+    hi = budget * 1.3
+    return int(lo), int(hi), _fmt_vnd(lo), _fmt_vnd(hi)
+
+
+# Bound once; calling the bound .format skips the attribute lookup on every description
+_RANGE_FMT = " ~ {} - {} VND".format
+
+# Link builders memoized with lru_cache by providers (see clear_cache / cache_info)
+_CACHED_BUILDERS = ("build_search_url", "format_title", "format_description")
 
 
 class BaseSearchProvider(ABC):
+    __slots__ = ()
+    
+    # True only for providers that implement search(); the rest only build links
+    supports_search = False
+    
     @property
     @abstractmethod
     def platform_name(self) -> str:
@@ -24,3 +79,56 @@ class BaseSearchProvider(ABC):
         budget: Optional[float]
     ) -> str:
         pass
+    
+    @staticmethod
+    def _format_range(budget: float) -> str:
+        """Budget range suffix, e.g. ' ~ 700,000 - 1,300,000 VND' (shared by the price-window providers)"""
+        _, _, lo_str, hi_str = _budget_bounds(budget)
+        return _RANGE_FMT(lo_str, hi_str)
+    
+    def build_search_urls_bulk(
+        self,
+        keywords: List[str],
+        budgets: Optional[List[Optional[float]]] = None
+    ) -> List[str]:
+        """build_search_url over many keywords; budgets is parallel to keywords (None = no budget)"""
+        if budgets is None:
+            return list(map(self.build_search_url, keywords))
+        return list(map(self.build_search_url, keywords, budgets))
+    
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Drop memoized links (test isolation)"""
+        for name in _CACHED_BUILDERS:
+            cache_clear = getattr(getattr(cls, name), "cache_clear", None)
+            if cache_clear is not None:
+                cache_clear()
+    
+    @classmethod
+    def cache_info(cls) -> Dict[str, Dict[str, int]]:
+        """Hit/miss counters of the memoized link builders"""
+        info = {}
+        for name in _CACHED_BUILDERS:
+            cache_info = getattr(getattr(cls, name), "cache_info", None)
+            if cache_info is not None:
+                info[name] = cache_info()._asdict()
+        return info
+    
+    def search(
+        self,
+        keyword: str,
+        budget: Optional[float] = None,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """Fetch search results directly; check supports_search before calling"""
+        raise NotImplementedError(f"{self.platform_name} does not support direct search")
+    
+    async def search_async(
+        self,
+        keyword: str,
+        budget: Optional[float] = None,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """Run the blocking search in a worker thread so callers on an event loop are not blocked"""
+        return await asyncio.to_thread(self.search, keyword, budget, limit)
+
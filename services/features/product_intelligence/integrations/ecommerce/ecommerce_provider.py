@@ -0,0 +1,172 @@
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from .base import BaseSearchProvider, _budget_bounds, _make_keyword_encoder
+
+__all__ = ("ECommerceProvider", "ProviderConfig")
+
+# Compiled variant of the budget URL assembly (_fast.pyx); only present when built with Cython
+try:
+    from ._fast import build_budget_url as _fast_budget_url
+except ImportError:
+    _fast_budget_url = None
+
+
+@dataclass(frozen=True, slots=True)
+class ProviderConfig:
+    """Everything that differs between marketplaces sharing the keyword + price-window search URL"""
+    name: str
+    base_url: str
+    space: str  # encoding of spaces in the keyword: "%20" or "+"
+    min_param: str
+    max_param: str
+    
+    def __post_init__(self):
+        # Static URL parts must already be percent-encoded ASCII: keywords are encoded
+        # to ASCII too, so built URLs never need another quoting pass downstream
+        for part in (self.base_url, self.space, self.min_param, self.max_param):
+            if not part.isascii() or any(ch.isspace() for ch in part):
+                raise ValueError(f"{self.name}: URL part {part!r} must be pre-encoded ASCII")
+    
+    @property
+    def title_suffix(self) -> str:
+        return f" ({self.name})"
+    
+    @property
+    def desc_prefix(self) -> str:
+        return f"{self.name}: "
+
+
+def _make_url_builders(config: ProviderConfig):
+    """
+    Specialize the URL builders for one config: keyword encoder, no-budget and budget variants
+    Templates and helpers are bound as default args, so each call only reads locals
+    """
+    plain_tmpl = config.base_url + "{kw}"
+    budget_tmpl = f"{plain_tmpl}&{config.min_param}={{lo}}&{config.max_param}={{hi}}"
+    
+    encode = _make_keyword_encoder(config.space)
+    
+    def build_no_budget(keyword: str, _fmt=plain_tmpl.format, _encode=encode) -> str:
+        return _fmt(kw=_encode(keyword))
+    
+    if _fast_budget_url is not None:
+        def build_with_budget(keyword: str, budget: float, _join=_fast_budget_url,
+                              _prefix=config.base_url, _min=config.min_param, _max=config.max_param,
+                              _encode=encode, _bounds=_budget_bounds) -> str:
+            lo, hi, _, _ = _bounds(budget)
+            return _join(_prefix, _encode(keyword), _min, lo, _max, hi)
+    else:
+        def build_with_budget(keyword: str, budget: float, _fmt=budget_tmpl.format,
+                              _encode=encode, _bounds=_budget_bounds) -> str:
+            lo, hi, _, _ = _bounds(budget)
+            return _fmt(kw=_encode(keyword), lo=lo, hi=hi)
+    
+    return build_no_budget, build_with_budget
+
+
+# Builders specialized once per config (ProviderConfig is frozen, so it is a valid cache key)
+_url_builders = lru_cache(maxsize=None)(_make_url_builders)
+
+
+# Memoized link builders are module-level and keyed on the config, not on `self`: an
+# lru_cache on a method would hold every provider instance alive for the process lifetime.
+# Same (keyword, brand, budget) triples recur across retries and re-ranking passes.
+@lru_cache(maxsize=4096)
+def _cached_search_url(config: ProviderConfig, keyword: str, budget: Optional[float]) -> str:
+    build_no_budget, build_with_budget = _url_builders(config)
+    if budget:
+        return build_with_budget(keyword, budget)
+    return build_no_budget(keyword)
+
+
+@lru_cache(maxsize=4096)
+def _cached_title(config: ProviderConfig, keyword: str, brand: Optional[str]) -> str:
+    if brand:
+        return f"{brand} {keyword}" + config.title_suffix
+    return keyword + config.title_suffix
+
+
+@lru_cache(maxsize=4096)
+def _cached_description(config: ProviderConfig, keyword: str, brand: Optional[str], budget: Optional[float]) -> str:
+    parts = [config.desc_prefix]
+    if brand:
+        parts += (brand, " ")
+    parts.append(keyword)
+    
+    if budget:
+        parts.append(ECommerceProvider._format_range(budget))
+    
+    return "".join(parts)
+
+
+_CACHED_FUNCTIONS = {
+    "build_search_url": _cached_search_url,
+    "format_title": _cached_title,
+    "format_description": _cached_description,
+}
+
+
+class ECommerceProvider(BaseSearchProvider):
+    """Search provider driven entirely by a ProviderConfig"""
+    
+    __slots__ = ("config", "_platform", "_build_no_budget", "_build_with_budget")
+    
+    def __init__(self, config: ProviderConfig):
+        self.config = config
+        # Interned so results grouped by platform can compare names by identity
+        self._platform = sys.intern(config.name)
+        # URL builders specialized once per config, shared with the memoized module functions
+        self._build_no_budget, self._build_with_budget = _url_builders(config)
+    
+    @property
+    def platform_name(self) -> str:
+        return self._platform
+    
+    # Do not wrap the link builders with numba.jit: they only do str work, which Numba
+    # runs in object mode, slower than plain CPython. The compiled path is _fast.pyx.
+    def build_search_url(self, keyword: str, budget: Optional[float] = None) -> str:
+        return _cached_search_url(self.config, keyword, budget)
+    
+    def build_search_urls_bulk(
+        self,
+        keywords: List[str],
+        budgets: Optional[List[Optional[float]]] = None
+    ) -> List[str]:
+        """
+        Bulk variant of build_search_url: calls the specialized builders directly,
+        skipping the per-call cache and method dispatch
+        """
+        plain = self._build_no_budget
+        if budgets is None:
+            return list(map(plain, keywords))
+        
+        with_budget = self._build_with_budget
+        return [
+            with_budget(keyword, budget) if budget else plain(keyword)
+            for keyword, budget in zip(keywords, budgets)
+        ]
+    
+    def format_title(self, keyword: str, brand: Optional[str] = None) -> str:
+        return _cached_title(self.config, keyword, brand)
+    
+    def format_description(
+        self, 
+        keyword: str, 
+        brand: Optional[str], 
+        budget: Optional[float]
+    ) -> str:
+        return _cached_description(self.config, keyword, brand, budget)
+    
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Drop memoized links (test isolation); the caches are shared by every config"""
+        for cached in _CACHED_FUNCTIONS.values():
+            cached.cache_clear()
+    
+    @classmethod
+    def cache_info(cls) -> Dict[str, Dict[str, int]]:
+        """Hit/miss counters of the memoized link builders, summed over every config"""
+        return {name: cached.cache_info()._asdict() for name, cached in _CACHED_FUNCTIONS.items()}
@@ -1,33 +1,64 @@
+import sys
+from functools import lru_cache
 from typing import Optional
-from ..base import BaseSearchProvider
+from ..base import BaseSearchProvider, _fmt_vnd, _make_keyword_encoder
+
+__all__ = ("LazadaProvider", "LAZADA_BUILD_URL", "LAZADA_FORMAT_TITLE", "LAZADA_FORMAT_DESCRIPTION")
+
+_BASE_URL = "https://www.lazada.vn/catalog/?q="
+_encode_keyword = _make_keyword_encoder("+")
+_BUDGET_FMT = " (Ngân sách: ~{} VND)".format
+
+# Interned so results grouped by platform can compare names by identity
+_PLATFORM = sys.intern("Lazada")
+_TITLE_SUFFIX = sys.intern(" (Lazada)")
+_DESC_PREFIX = sys.intern("Lazada: ")
 
 
 class LazadaProvider(BaseSearchProvider):
 
-    BASE_URL = "https://www.lazada.vn/catalog/?q="
+    __slots__ = ()
+    
+    BASE_URL = _BASE_URL
     
     @property
     def platform_name(self) -> str:
-        return "Lazada"
+        return _PLATFORM
     
-    def build_search_url(self, keyword: str, budget: Optional[float] = None) -> str:
-        url = f"{self.BASE_URL}{keyword.replace(' ', '%20')}"
-        return url
+    # Do not wrap the link builders with numba.jit: they only do str work, which Numba
+    # runs in object mode, slower than plain CPython. The compiled path is _fast.pyx.
+    # Reads no instance state, so hot loops can call LAZADA_BUILD_URL directly
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def build_search_url(keyword: str, budget: Optional[float] = None) -> str:
+        return _BASE_URL + _encode_keyword(keyword)
     
-    def format_title(self, keyword: str, brand: Optional[str] = None) -> str:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def format_title(keyword: str, brand: Optional[str] = None) -> str:
         if brand:
-            return f"{brand} {keyword} (Lazada)"
-        return f"{keyword} (Lazada)"
+            return f"{brand} {keyword}" + _TITLE_SUFFIX
+        return keyword + _TITLE_SUFFIX
     
+    @staticmethod
+    @lru_cache(maxsize=4096)
     def format_description(
-        self, 
         keyword: str, 
         brand: Optional[str], 
         budget: Optional[float]
     ) -> str:
-        base = f"Lazada: {brand + ' ' if brand else ''}{keyword}"
+        parts = [_DESC_PREFIX]
+        if brand:
+            parts += (brand, " ")
+        parts.append(keyword)
         
         if budget:
-            return f"{base} (Ngân sách: ~{budget:,.0f} VND)"
+            parts.append(_BUDGET_FMT(_fmt_vnd(budget)))
         
-        return base
+        return "".join(parts)
+
+
+# Pre-resolved references for hot loops that build many links
+LAZADA_BUILD_URL = LazadaProvider.build_search_url
+LAZADA_FORMAT_TITLE = LazadaProvider.format_title
+LAZADA_FORMAT_DESCRIPTION = LazadaProvider.format_description
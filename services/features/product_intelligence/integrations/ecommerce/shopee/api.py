@@ -1,4 +1,8 @@
+import asyncio
+import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
 import re
 from typing import List, Dict, Any
@@ -6,9 +10,33 @@ from typing import List, Dict, Any
 # Setup logger
 logger = logging.getLogger(__name__)
 
-def search_shopee_products(keyword: str, limit: int = 20, min_price: float = None, max_price: float = None) -> List[Dict[str, Any]]:
-    url = "https://shopee.vn/api/v4/search/search_items"
-    
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+SEARCH_API_URL = "https://shopee.vn/api/v4/search/search_items"
+
+_SHOPEE_IMG = "https://cf.shopee.vn/file/"
+
+_SLUG_RE = re.compile(r'[^a-z0-9-]')
+_SLUG_TRANS = str.maketrans({" ": "-", "/": "-"})
+
+# Module-level session so repeated searches reuse the TCP/TLS connection to shopee.vn
+_SHOPEE_SESSION = requests.Session()
+_SHOPEE_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=2, backoff_factor=0.3),
+))
+
+def _build_search_request(keyword: str, limit: int, min_price: float = None, max_price: float = None):
     params = {
         "keyword": keyword,
         "by": "relevancy",
@@ -34,66 +62,114 @@ def search_shopee_products(keyword: str, limit: int = 20, min_price: float = Non
         "X-Requested-With": "XMLHttpRequest",
         "X-API-Source": "pc",
     }
+    return params, headers
+
+
+def _items_from_body(body: bytes) -> List[Dict[str, Any]]:
+    # Keep only "items"; dropping the top-level dict lets tracking/ads metadata be freed right away
+    data = _loads(body)
+    items = data.get("items") or []
+    del data
+    return items
+
+
+def _parse_search_items(items: List[Dict[str, Any]], keyword: str, limit: int) -> List[Dict[str, Any]]:
+    if not items:
+        logger.warning(f"No items found for keyword '{keyword}'")
+        return []
     
-    try:
-        logger.info(f"Searching Shopee for '{keyword}' (Price: {min_price}-{max_price})")
-        response = requests.get(url, params=params, headers=headers, timeout=15)
+    products = []
+    
+    for item in items[:limit]:
+        item_basic = item.get("item_basic", {})
         
-        if response.status_code != 200:
-            logger.error(f"Shopee API returned status {response.status_code}: {response.text[:200]}")
-            return []
+        # Price calculations (Shopee stores price * 100000)
+        price = item_basic.get("price", 0) / 100000
+        price_min = item_basic.get("price_min", 0) / 100000
+        price_max = item_basic.get("price_max", 0) / 100000
         
-        data = response.json()
-        items = data.get("items", [])
+        # Build product URL
+        shop_id = item_basic.get("shopid")
+        item_id = item_basic.get("itemid")
+        name = item_basic.get("name", "")
+        item_rating = item_basic.get("item_rating")
         
-        if not items:
-            logger.warning(f"No items found for keyword '{keyword}'")
-            return []
+        # Create slug
+        name_slug = _SLUG_RE.sub('', name.lower().translate(_SLUG_TRANS))
         
-        products = []
+        product_url = f"https://shopee.vn/{name_slug}-i.{shop_id}.{item_id}"
         
-        for item in items[:limit]:
-            item_basic = item.get("item_basic", {})
-            
-            # Price calculations (Shopee stores price * 100000)
-            price = item_basic.get("price", 0) / 100000
-            price_min = item_basic.get("price_min", 0) / 100000
-            price_max = item_basic.get("price_max", 0) / 100000
-            
-            # Build product URL
-            shop_id = item_basic.get("shopid")
-            item_id = item_basic.get("itemid")
-            name = item_basic.get("name", "")
-            
-            # Create slug
-            name_slug = name.lower().replace(" ", "-").replace("/", "-")
-            name_slug = re.sub(r'[^a-z0-9-]', '', name_slug)
-            
-            product_url = f"https://shopee.vn/{name_slug}-i.{shop_id}.{item_id}"
-            
-            product = {
-                "name": name,
-                "price": price if price > 0 else price_min,
-                "price_min": price_min,
-                "price_max": price_max,
-                "currency": "VND",
-                "url": product_url,
-                "image": f"https://cf.shopee.vn/file/{item_basic.get('image', '')}",
-                "rating": item_basic.get("item_rating", {}).get("rating_star", 0) if item_basic.get("item_rating") else 0,
-                "sold": item_basic.get("sold", 0),
-                "shop_name": item_basic.get("shop_name", ""),
-                "shopid": shop_id,
-                "itemid": item_id,
-            }
+        product = {
+            "name": name,
+            "price": price if price > 0 else price_min,
+            "price_min": price_min,
+            "price_max": price_max,
+            "currency": "VND",
+            "url": product_url,
+            "image": _SHOPEE_IMG + (item_basic.get('image') or ''),
+            "rating": item_rating.get("rating_star", 0) if item_rating else 0,
+            "sold": item_basic.get("sold", 0),
+            "shop_name": item_basic.get("shop_name", ""),
+            "shopid": shop_id,
+            "itemid": item_id,
+        }
+        
+        products.append(product)
+    
+    logger.info(f"Found {len(products)} products on Shopee")
+    return products
+
+
+def search_shopee_products(keyword: str, limit: int = 20, min_price: float = None, max_price: float = None) -> List[Dict[str, Any]]:
+    params, headers = _build_search_request(keyword, limit, min_price, max_price)
+    
+    try:
+        logger.info(f"Searching Shopee for '{keyword}' (Price: {min_price}-{max_price})")
+        with _SHOPEE_SESSION.get(SEARCH_API_URL, params=params, headers=headers, timeout=15, stream=True) as response:
+            if response.status_code != 200:
+                if logger.isEnabledFor(logging.ERROR):
+                    logger.error("Shopee API returned status %d: %r", response.status_code, response.content[:200])
+                return []
             
-            products.append(product)
+            body = b"".join(response.iter_content(8192))
         
-        logger.info(f"Found {len(products)} products on Shopee")
-        return products
+        items = _items_from_body(body)
+        del body
+        return _parse_search_items(items, keyword, limit)
         
     except requests.exceptions.Timeout:
         logger.error("Shopee API request timed out")
         return []
     except Exception as e:
-        logger.error(f"Shopee search error: {str(e)}", exc_info=True)
+        logger.error("Shopee search error: %s", e, exc_info=True)
+        return []
+
+
+async def search_shopee_products_async(keyword: str, limit: int = 20, min_price: float = None, max_price: float = None) -> List[Dict[str, Any]]:
+    """Async variant of search_shopee_products; falls back to a worker thread without aiohttp"""
+    if aiohttp is None:
+        return await asyncio.to_thread(search_shopee_products, keyword, limit, min_price, max_price)
+    
+    params, headers = _build_search_request(keyword, limit, min_price, max_price)
+    
+    try:
+        logger.info(f"Searching Shopee for '{keyword}' (Price: {min_price}-{max_price})")
+        timeout = aiohttp.ClientTimeout(total=15)
+        async with aiohttp.ClientSession(headers=headers, timeout=timeout) as session:
+            async with session.get(SEARCH_API_URL, params=params) as response:
+                body = await response.read()
+                if response.status != 200:
+                    if logger.isEnabledFor(logging.ERROR):
+                        logger.error("Shopee API returned status %d: %r", response.status, body[:200])
+                    return []
+        
+        items = _items_from_body(body)
+        del body
+        return _parse_search_items(items, keyword, limit)
+        
+    except asyncio.TimeoutError:
+        logger.error("Shopee API request timed out")
+        return []
+    except Exception as e:
+        logger.error("Shopee search error: %s", e, exc_info=True)
         return []
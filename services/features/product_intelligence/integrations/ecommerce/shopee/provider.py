@@ -1,39 +1,56 @@
-from typing import Optional
-from ..base import BaseSearchProvider
+from typing import Any, Dict, List, Optional
+from ..base import _budget_bounds
+from ..ecommerce_provider import ECommerceProvider, ProviderConfig
+from .api import search_shopee_products, search_shopee_products_async
 
+__all__ = ("ShopeeProvider", "SHOPEE_CONFIG", "SHOPEE", "SHOPEE_BUILD_URL", "SHOPEE_FORMAT_TITLE", "SHOPEE_FORMAT_DESCRIPTION")
 
-class ShopeeProvider(BaseSearchProvider):
+SHOPEE_CONFIG = ProviderConfig(
+    name="Shopee",
+    base_url="https://shopee.vn/search?keyword=",
+    space="%20",
+    min_param="minPrice",
+    max_param="maxPrice",
+)
 
-    BASE_URL = "https://shopee.vn/search?keyword="
+
+class ShopeeProvider(ECommerceProvider):
+
+    __slots__ = ()
+    
+    BASE_URL = SHOPEE_CONFIG.base_url
+    supports_search = True
     
-    @property
-    def platform_name(self) -> str:
-        return "Shopee"
+    def __init__(self):
+        super().__init__(SHOPEE_CONFIG)
     
-    def build_search_url(self, keyword: str, budget: Optional[float] = None) -> str:
-        url = f"{self.BASE_URL}{keyword.replace(' ', '%20')}"
-        
-        if budget:
-            min_price = int(budget * 0.7)
-            max_price = int(budget * 1.3)
-            url += f"&minPrice={min_price}&maxPrice={max_price}"
-        
-        return url
+    def _price_bounds(self, budget: Optional[float]):
+        if not budget:
+            return None, None
+        lo, hi, _, _ = _budget_bounds(budget)
+        return lo, hi
     
-    def format_title(self, keyword: str, brand: Optional[str] = None) -> str:
-        if brand:
-            return f"{brand} {keyword} (Shopee)"
-        return f"{keyword} (Shopee)"
+    def search(
+        self,
+        keyword: str,
+        budget: Optional[float] = None,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        min_price, max_price = self._price_bounds(budget)
+        return search_shopee_products(keyword, limit, min_price, max_price)
     
-    def format_description(
-        self, 
-        keyword: str, 
-        brand: Optional[str], 
-        budget: Optional[float]
-    ) -> str:
-        base = f"Shopee: {brand + ' ' if brand else ''}{keyword}"
-        
-        if budget:
-            return f"{base} ~ {budget*0.7:,.0f} - {budget*1.3:,.0f} VND"
-        
-        return base
+    async def search_async(
+        self,
+        keyword: str,
+        budget: Optional[float] = None,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        min_price, max_price = self._price_bounds(budget)
+        return await search_shopee_products_async(keyword, limit, min_price, max_price)
+
+
+# Shared instance + pre-bound methods for hot loops that build many links
+SHOPEE = ShopeeProvider()
+SHOPEE_BUILD_URL = SHOPEE.build_search_url
+SHOPEE_FORMAT_TITLE = SHOPEE.format_title
+SHOPEE_FORMAT_DESCRIPTION = SHOPEE.format_description
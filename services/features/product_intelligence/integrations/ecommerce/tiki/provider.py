@@ -1,39 +1,28 @@
-from typing import Optional
-from ..base import BaseSearchProvider
+from ..ecommerce_provider import ECommerceProvider, ProviderConfig
 
+__all__ = ("TikiProvider", "TIKI_CONFIG", "TIKI", "TIKI_BUILD_URL", "TIKI_FORMAT_TITLE", "TIKI_FORMAT_DESCRIPTION")
 
-class TikiProvider(BaseSearchProvider):
+TIKI_CONFIG = ProviderConfig(
+    name="Tiki",
+    base_url="https://tiki.vn/search?q=",
+    space="+",
+    min_param="price_from",
+    max_param="price_to",
+)
 
-    BASE_URL = "https://tiki.vn/search?q="
-    
-    @property
-    def platform_name(self) -> str:
-        return "Tiki"
-    
-    def build_search_url(self, keyword: str, budget: Optional[float] = None) -> str:
-        url = f"{self.BASE_URL}{keyword.replace(' ', '+')}"
-        
-        if budget:
-            min_price = int(budget * 0.7)
-            max_price = int(budget * 1.3)
-            url += f"&price_from={min_price}&price_to={max_price}"
-        
-        return url
+
+class TikiProvider(ECommerceProvider):
+
+    __slots__ = ()
     
-    def format_title(self, keyword: str, brand: Optional[str] = None) -> str:
-        if brand:
-            return f"{brand} {keyword} (Tiki)"
-        return f"{keyword} (Tiki)"
+    BASE_URL = TIKI_CONFIG.base_url
     
-    def format_description(
-        self, 
-        keyword: str, 
-        brand: Optional[str], 
-        budget: Optional[float]
-    ) -> str:
-        base = f"Tiki: {brand + ' ' if brand else ''}{keyword}"
-        
-        if budget:
-            return f"{base} ~ {budget*0.7:,.0f} - {budget*1.3:,.0f} VND"
-        
-        return base
+    def __init__(self):
+        super().__init__(TIKI_CONFIG)
+
+
+# Shared instance + pre-bound methods for hot loops that build many links
+TIKI = TikiProvider()
+TIKI_BUILD_URL = TIKI.build_search_url
+TIKI_FORMAT_TITLE = TIKI.format_title
+TIKI_FORMAT_DESCRIPTION = TIKI.format_description
@@ -1,9 +1,37 @@
-from .auto_discovery_service import AutoDiscoveryService
-from .auto_discovery_streaming_service import AutoDiscoveryStreamingService
-from .streaming_events import EventEmitter
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .auto_discovery_service import AutoDiscoveryService
+    from .auto_discovery_streaming_service import AutoDiscoveryStreamingService
+    from .streaming_events import EventEmitter, EventSink
+
+# Loaded on first access (PEP 562): importing one submodule, e.g. streaming_events,
+# no longer pulls in the whole auto-discovery dependency tree
+_LAZY = {
+    "AutoDiscoveryService": ".auto_discovery_service",
+    "AutoDiscoveryStreamingService": ".auto_discovery_streaming_service",
+    "EventEmitter": ".streaming_events",
+    "EventSink": ".streaming_events",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        module = importlib.import_module(_LAZY[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY))
+
 
 __all__ = [
     "AutoDiscoveryService",
     "AutoDiscoveryStreamingService",
-    "EventEmitter"
+    "EventEmitter",
+    "EventSink"
 ]
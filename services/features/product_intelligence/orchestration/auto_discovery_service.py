@@ -1,38 +1,92 @@
+import asyncio
 import logging
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import cached_property
+from itertools import zip_longest
 from uuid import UUID
-from typing import Optional, List, Dict, Any, Callable
+from typing import Optional, List, Dict, Any, Callable, Tuple
 
 from sqlalchemy.orm import Session
 
 from services.features.product_intelligence.agents.product_agent import ProductAIAgent
 from services.features.product_intelligence.agents.llm_provider_selector import LLMProviderSelector
 from services.features.product_intelligence.crawler.crawler_service import CrawlerService
-from services.core.project import ProjectService
+from services.core.project import ProjectInfoDTO, ProjectService
 from services.features.product_intelligence.crawler.scraper_factory import ScraperFactory
 from services.features.product_intelligence.ai.filter_intent_parser import FilterIntentParser
 from services.features.product_intelligence.ai.filter_validator import FilterCriteriaValidator
 from services.features.product_intelligence.ai.natural_language_parser import NaturalLanguageParser
-from services.features.product_intelligence.filtering.product_filter_service import ProductFilterService
+from services.features.product_intelligence.ai.llm_cache import cache_scope, nl_parse_cache, filter_intent_cache
+from services.features.product_intelligence.filtering.product_filter_service import ProductFilterService, RejectionBuffer
 from services.features.product_intelligence.ranking.product_ranking_service import ProductRankingService
 from services.features.product_intelligence.auto_import.auto_import_service import AutoImportService
-from services.features.product_intelligence.orchestration.streaming_events import EventEmitter
+from services.features.product_intelligence.orchestration.streaming_events import EventEmitter, EventSink
 from schemas.product_crawler import CrawledProductItem, CrawledProductItemExtended
 from schemas.product_filter import ProductFilterCriteria
+from prompts.product_ai import PROJECT_CONTEXT_SYSTEM_PROMPT
 
 logger = logging.getLogger(__name__)
 
 MAX_CRAWL_PRODUCTS = 20
+MAX_USER_INPUT_LENGTH = 2000
+# Above this filtered/requested ratio the LLM ranks; below it a local sort is used
+RANKING_LLM_THRESHOLD_RATIO = 1.5
+# Platforms crawled when the criteria do not pin one (shopee is excluded from crawling)
+CRAWL_PLATFORMS = ("lazada", "tiki")
+
+_DEFAULT_EXCLUDE_RE = re.compile(r'shopee', re.IGNORECASE)
+_EXCLUDE_NOTHING_RE = re.compile(r'(?!)')
+_PLATFORM_RE = re.compile(r'(lazada|tiki|shopee)', re.IGNORECASE)
+# "1.234.567 ₫" -> "1234567": currency marks and separators are dropped before dot handling
+_PRICE_STRIP_RE = re.compile(r'[,\s₫đ]|vnd', re.IGNORECASE)
+
+
+def _strip_thousand_dots(price_str: str) -> str:
+    """Several dots, or a single dot followed by exactly 3 digits, are thousands separators; any other single dot is a decimal point"""
+    dots = price_str.count('.')
+    if dots > 1:
+        return price_str.replace('.', '')
+    if dots == 1:
+        head, _, tail = price_str.partition('.')
+        if head and len(tail) == 3:
+            return head + tail
+    return price_str
 
 
 class AutoDiscoveryService:
     def __init__(self, db: Session):
         self.db = db
-        self.product_agent = ProductAIAgent(db)
-        self.crawler_service = CrawlerService(db)
-        self.filter_service = ProductFilterService()
-        self.import_service = AutoImportService(db)
-        self.llm_selector = LLMProviderSelector(db)
-        self.project_service = ProjectService(db)
+    
+    # Collaborators are built on first use: requests rejected early (bad input,
+    # missing project) never pay for the ones they do not touch. Each one is
+    # then kept for the lifetime of this service instance (one per request,
+    # bound to self.db), exactly like the eager attributes were. cached_property
+    # takes no lock; the crawl worker threads never touch collaborators, so each
+    # is built once. Assigning the attribute still overrides it (tests, mocks).
+    @cached_property
+    def product_agent(self) -> ProductAIAgent:
+        return ProductAIAgent(self.db)
+    
+    @cached_property
+    def crawler_service(self) -> CrawlerService:
+        return CrawlerService(self.db)
+    
+    @cached_property
+    def filter_service(self) -> ProductFilterService:
+        return ProductFilterService()
+    
+    @cached_property
+    def import_service(self) -> AutoImportService:
+        return AutoImportService(self.db)
+    
+    @cached_property
+    def llm_selector(self) -> LLMProviderSelector:
+        return LLMProviderSelector(self.db)
+    
+    @cached_property
+    def project_service(self) -> ProjectService:
+        return ProjectService(self.db)
     
     def _get_llm_agent(self, user_id: UUID, project_assigned_model_id: Optional[UUID] = None):
         return self.llm_selector.select_agent(
@@ -47,21 +101,41 @@ class AutoDiscoveryService:
         user_input: str,
         on_event: Optional[Callable[[Dict[str, Any]], None]] = None
     ) -> Dict[str, Any]:
-        if not user_input or not user_input.strip():
+        sink = EventSink(on_event) if on_event and not isinstance(on_event, EventSink) else None
+        try:
+            return self._execute_auto_discovery_from_natural_language(
+                project_id=project_id,
+                user_id=user_id,
+                user_input=user_input,
+                on_event=sink or on_event
+            )
+        finally:
+            if sink:
+                sink.close()
+    
+    def _execute_auto_discovery_from_natural_language(
+        self,
+        project_id: UUID,
+        user_id: UUID,
+        user_input: str,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        # isspace() stops at the first non-blank char and, unlike strip(), allocates nothing
+        if not user_input or user_input.isspace():
             return {
                 "status": "error",
                 "message": "Input không được để trống",
                 "error_type": "invalid_input"
             }
         
-        if len(user_input) > 2000:
+        if len(user_input) > MAX_USER_INPUT_LENGTH:
             return {
                 "status": "error",
                 "message": "Input quá dài (tối đa 2000 ký tự)",
                 "error_type": "input_too_long"
             }
         
-        project = self.project_service.get(project_id)
+        project = self.project_service.get_info(project_id)
         if not project:
             return {
                 "status": "error",
@@ -91,17 +165,30 @@ class AutoDiscoveryService:
             on_event(EventEmitter.step_start("0", "Phân tích yêu cầu", "Đang phân tích yêu cầu của bạn..."))
             on_event(EventEmitter.ai_thinking("0", f"Đang hiểu ý định của bạn: {user_input[:100]}..."))
         
-        llm_agent = self._get_llm_agent(
-            user_id=user_id,
-            project_assigned_model_id=project.assigned_model_id
-        )
-        
-        natural_language_parser = NaturalLanguageParser(llm_agent)
-        
-        user_query, filter_criteria_text, max_products, error = natural_language_parser.parse_user_input(
-            user_input,
-            project_info=project_info
-        )
+        # The parse reads the whole project_info, so every field of it is part of the key
+        parse_scope = cache_scope(project_id, project_info)
+        cached_parse = nl_parse_cache.get(user_input, scope=parse_scope)
+        if cached_parse is not None:
+            user_query, filter_criteria_text, max_products = cached_parse
+            error = None
+        else:
+            llm_agent = self._get_llm_agent(
+                user_id=user_id,
+                project_assigned_model_id=project.assigned_model_id
+            )
+            
+            natural_language_parser = NaturalLanguageParser(llm_agent)
+            
+            user_query, filter_criteria_text, max_products, error = natural_language_parser.parse_user_input(
+                user_input,
+                project_info=project_info
+            )
+            if not error:
+                nl_parse_cache.set(
+                    user_input,
+                    (user_query, filter_criteria_text, max_products),
+                    scope=parse_scope
+                )
         
         if on_event:
             if error:
@@ -126,7 +213,8 @@ class AutoDiscoveryService:
             filter_criteria_text=filter_criteria_text,
             max_products=max_products,
             project_assigned_model_id=project.assigned_model_id,
-            on_event=on_event
+            on_event=on_event,
+            project=project
         )
     
     def execute_auto_discovery(
@@ -137,9 +225,50 @@ class AutoDiscoveryService:
         filter_criteria_text: Optional[str] = None,
         max_products: int = 20,
         project_assigned_model_id: Optional[UUID] = None,
-        on_event: Optional[Callable[[Dict[str, Any]], None]] = None
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+        project: Optional[ProjectInfoDTO] = None
+    ) -> Dict[str, Any]:
+        """
+        Sync entry point: runs aexecute_auto_discovery on a fresh event loop.
+        Must be called from a thread without a running loop (sync endpoints, worker threads);
+        async callers await aexecute_auto_discovery directly.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError(
+                "execute_auto_discovery() cannot run inside an event loop; await aexecute_auto_discovery() instead"
+            )
+        return asyncio.run(self.aexecute_auto_discovery(
+            project_id=project_id,
+            user_id=user_id,
+            user_query=user_query,
+            filter_criteria_text=filter_criteria_text,
+            max_products=max_products,
+            project_assigned_model_id=project_assigned_model_id,
+            on_event=on_event,
+            project=project
+        ))
+    
+    async def aexecute_auto_discovery(
+        self,
+        project_id: UUID,
+        user_id: UUID,
+        user_query: str,
+        filter_criteria_text: Optional[str] = None,
+        max_products: int = 20,
+        project_assigned_model_id: Optional[UUID] = None,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+        project: Optional[ProjectInfoDTO] = None
     ) -> Dict[str, Any]:
         
+        # Slow event consumers must not stall the pipeline; nested calls reuse the caller's sink
+        sink = EventSink(on_event) if on_event and not isinstance(on_event, EventSink) else None
+        if sink:
+            on_event = sink
+        search_task = None
         try:
             llm_agent = self._get_llm_agent(
                 user_id=user_id,
@@ -150,13 +279,40 @@ class AutoDiscoveryService:
             criteria_validator = FilterCriteriaValidator(llm_agent)
             ranking_service = ProductRankingService(llm_agent)
             
+            # Callers that already loaded the project pass it in to skip a second SELECT
+            project = project or self.project_service.get_info(project_id)
+            project_name = project.name if project else f"Project {project_id}"
+            # Project context rendered once and shared as the system prompt of validation and search
+            system_prompt = self._render_project_context(project_name, project)
+            
+            # Start the broad AI search (all platforms, no price cap) right away so it overlaps
+            # criteria parsing and validation; it is re-issued below only if the parsed criteria
+            # narrow the platform or the price
+            speculative_request = self._build_search_request(
+                project_id, project_name, user_query, None, project_assigned_model_id
+            )
+            search_task = asyncio.create_task(self.product_agent.asearch_products(
+                project_info=speculative_request[0],
+                user_id=user_id,
+                limit=max_products * 2,
+                platform=speculative_request[1],
+                system=system_prompt
+            ))
+            
             filter_criteria = None
+            criteria_dump = None
             if filter_criteria_text:
                 if on_event:
                     on_event(EventEmitter.step_start("1", "Trích xuất tiêu chí lọc", "Đang phân tích và trích xuất các tiêu chí lọc từ yêu cầu của bạn..."))
                     on_event(EventEmitter.ai_thinking("1", f"Phân tích: '{filter_criteria_text}' → đang trích xuất các tiêu chí như rating, reviews, giá cả, platform..."))
                 
-                criteria, error = intent_parser.parse_user_intent(filter_criteria_text)
+                # The intent parser reads nothing but the text; the scope keeps projects apart
+                intent_scope = cache_scope(project_id)
+                criteria, error = filter_intent_cache.get(filter_criteria_text, scope=intent_scope), None
+                if criteria is None:
+                    criteria, error = await intent_parser.aparse_user_intent(filter_criteria_text)
+                    if not error:
+                        filter_intent_cache.set(filter_criteria_text, criteria, scope=intent_scope)
                 
                 if error:
                     if on_event:
@@ -167,6 +323,8 @@ class AutoDiscoveryService:
                         "error_type": "intent_parsing_failed"
                     }
                 
+                criteria_dump = criteria.model_dump(exclude_none=True)
+                
                 if criteria.platforms:
                     platforms_lower = [p.lower() for p in criteria.platforms]
                     if "shopee" in platforms_lower:
@@ -181,19 +339,20 @@ class AutoDiscoveryService:
                             "message": "Hiện tại công cụ scraper cho Shopee chưa hoàn thiện. Vui lòng tìm kiếm trên Lazada hoặc Tiki thay thế.",
                             "error_type": "platform_not_supported",
                             "suggested_platforms": available_platforms,
-                            "extracted_criteria": criteria.model_dump(exclude_none=True)
+                            "extracted_criteria": criteria_dump
                         }
                 
                 if on_event:
                     on_event(EventEmitter.step_complete("1", "Đã trích xuất tiêu chí lọc thành công", {
-                        "criteria": criteria.model_dump(exclude_none=True)
+                        "criteria": criteria_dump
                     }))
                     on_event(EventEmitter.step_start("2", "Xác thực tiêu chí", "Đang kiểm tra xem tiêu chí có đúng với ý định của bạn không..."))
                     on_event(EventEmitter.ai_thinking("2", f"So sánh tiêu chí đã trích xuất với yêu cầu gốc: đang kiểm tra tính hợp lý..."))
                 
-                is_valid, validation_error = criteria_validator.validate_criteria(
+                is_valid, validation_error = await criteria_validator.avalidate_criteria(
                     filter_criteria_text,
-                    criteria
+                    criteria,
+                    system=system_prompt
                 )
                 
                 if not is_valid:
@@ -203,7 +362,7 @@ class AutoDiscoveryService:
                         "status": "error",
                         "message": validation_error or "AI không hiểu yêu cầu của bạn",
                         "error_type": "criteria_validation_failed",
-                        "extracted_criteria": criteria.model_dump(exclude_none=True)
+                        "extracted_criteria": criteria_dump
                     }
                 
                 if on_event:
@@ -211,358 +370,463 @@ class AutoDiscoveryService:
                 
                 filter_criteria = criteria
             
-            project = self.project_service.get(project_id)
-            project_name = project.name if project else f"Project {project_id}"
-            
-            project_info = {
-                "id": project_id,
-                "name": project_name,
-                "target_product_name": user_query,
-                "target_budget_range": filter_criteria.max_price if filter_criteria else None,
-                "description": user_query or "",
-                "assigned_model_id": project_assigned_model_id
-            }
-            
-            search_platform = "all"
-            if filter_criteria and filter_criteria.platforms:
-                if len(filter_criteria.platforms) == 1:
-                    search_platform = filter_criteria.platforms[0].lower()
-                else:
-                    search_platform = "all"
-            
-            if search_platform == "shopee":
-                search_platform = "all"
+            project_info, search_platform = self._build_search_request(
+                project_id, project_name, user_query, filter_criteria, project_assigned_model_id
+            )
             
             if on_event:
                 on_event(EventEmitter.step_start("3", "Tìm kiếm sản phẩm với AI", "Đang sử dụng AI để tìm kiếm và phân tích sản phẩm..."))
                 on_event(EventEmitter.ai_thinking("3", f"Phân tích thị trường {user_query}: đang tìm các sản phẩm phổ biến, giá cả hợp lý, nhiều thương hiệu..."))
             
-            search_result = self.product_agent.search_products(
-                project_info=project_info,
-                user_id=user_id,
-                limit=max_products * 2,
-                platform=search_platform
+            # Open the scrapers' keep-alive sessions while the AI search is still in flight;
+            # only platforms that are actually crawled, and the crawl waits for them below
+            warm_platforms = CRAWL_PLATFORMS if search_platform == "all" else tuple(
+                platform for platform in (search_platform,) if platform in CRAWL_PLATFORMS
+            )
+            warmup = asyncio.gather(
+                *(asyncio.to_thread(self._warmup_scraper, platform) for platform in warm_platforms),
+                return_exceptions=True
             )
             
-            if not search_result.recommended_products:
-                if on_event:
-                    on_event(EventEmitter.step_error("3", "Tìm kiếm sản phẩm với AI", "Không tìm thấy sản phẩm nào từ AI search", {"error_type": "no_products_found"}))
-                return {
-                    "status": "error",
-                    "message": "Không tìm thấy sản phẩm nào từ AI search",
-                    "error_type": "no_products_found"
-                }
-            
-            if on_event:
-                on_event(EventEmitter.ai_thinking("3", "Đang tạo các link tìm kiếm trên các sàn thương mại điện tử cho từng sản phẩm..."))
-                on_event(EventEmitter.step_complete("3", f"Đã tìm thấy {len(search_result.recommended_products)} sản phẩm và tạo search links", {
-                    "products_found": len(search_result.recommended_products),
-                    "ai_analysis": search_result.ai_analysis[:200] + "..." if search_result.ai_analysis else None
-                }))
+            if (project_info, search_platform) == speculative_request:
+                search_result = await search_task
+            else:
+                self._discard_task(search_task)
+                search_result = await self.product_agent.asearch_products(
+                    project_info=project_info,
+                    user_id=user_id,
+                    limit=max_products * 2,
+                    platform=search_platform,
+                    system=system_prompt
+                )
             
-            all_crawled_products = []
+            for platform, outcome in zip(warm_platforms, await warmup):
+                if isinstance(outcome, Exception):
+                    logger.warning(f"Scraper warmup failed for {platform}: {str(outcome)}")
             
-            search_urls = self._extract_search_urls(
-                search_result.recommended_products,
-                exclude_platforms=["shopee"]
+            return await asyncio.to_thread(
+                self._discover_from_search_result,
+                project_id=project_id,
+                user_id=user_id,
+                user_query=user_query,
+                max_products=max_products,
+                filter_criteria=filter_criteria,
+                criteria_dump=criteria_dump,
+                ranking_service=ranking_service,
+                search_result=search_result,
+                on_event=on_event
             )
-            
+        
+        except Exception as e:
+            logger.error(f"Auto discovery failed: {str(e)}", exc_info=True)
+            return {
+                "status": "error",
+                "message": f"Lỗi trong quá trình tự động hóa: {str(e)}",
+                "error_type": "execution_error"
+            }
+        finally:
+            self._discard_task(search_task)
+            if sink:
+                await asyncio.to_thread(sink.close)
+    
+    @staticmethod
+    def _warmup_scraper(platform: str) -> None:
+        """Build the shared scraper (off the event loop) and open its keep-alive connection"""
+        ScraperFactory.get_scraper_for_platform(platform).warmup()
+    
+    @staticmethod
+    def _discard_task(task: Optional[asyncio.Task]) -> None:
+        """Cancel an unused speculative task, or consume its outcome if it already finished"""
+        if task is None:
+            return
+        if not task.done():
+            task.cancel()
+        elif not task.cancelled():
+            task.exception()
+    
+    @staticmethod
+    def _render_project_context(project_name: str, project: Optional[ProjectInfoDTO]) -> str:
+        """Render the shared system prompt from stable project fields only (no per-request input)"""
+        unspecified = "không xác định"
+        return PROJECT_CONTEXT_SYSTEM_PROMPT.format(
+            name=project_name,
+            description=(project.description if project else None) or unspecified,
+            target_product_name=(project.target_product_name if project else None) or unspecified,
+            target_product_category=(project.target_product_category if project else None) or unspecified,
+            target_budget_range=(project.target_budget_range if project else None) or unspecified,
+            currency=(project.currency if project else None) or "VND",
+            pipeline_type=(project.pipeline_type if project else None) or unspecified
+        )
+    
+    @staticmethod
+    def _build_search_request(
+        project_id: UUID,
+        project_name: str,
+        user_query: str,
+        filter_criteria: Optional[ProductFilterCriteria],
+        project_assigned_model_id: Optional[UUID]
+    ) -> Tuple[Dict[str, Any], str]:
+        project_info = {
+            "id": project_id,
+            "name": project_name,
+            "target_product_name": user_query,
+            "target_budget_range": filter_criteria.max_price if filter_criteria else None,
+            "description": user_query or "",
+            "assigned_model_id": project_assigned_model_id
+        }
+        
+        search_platform = "all"
+        if filter_criteria and filter_criteria.platforms:
+            if len(filter_criteria.platforms) == 1:
+                search_platform = filter_criteria.platforms[0].lower()
+            else:
+                search_platform = "all"
+        
+        if search_platform == "shopee":
+            search_platform = "all"
+        
+        return project_info, search_platform
+    
+    def _discover_from_search_result(
+        self,
+        project_id: UUID,
+        user_id: UUID,
+        user_query: str,
+        max_products: int,
+        filter_criteria: Optional[ProductFilterCriteria],
+        criteria_dump: Optional[Dict[str, Any]],
+        ranking_service: ProductRankingService,
+        search_result: Any,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        if not search_result.recommended_products:
             if on_event:
-                on_event(EventEmitter.step_start("4", "Thu thập thông tin sản phẩm", "Đang thu thập thông tin chi tiết từ các sàn thương mại điện tử..."))
-            
-            max_per_url = max(1, MAX_CRAWL_PRODUCTS // max(len(search_urls), 1))
-            
-            for idx, search_url in enumerate(search_urls, 1):
-                if len(all_crawled_products) >= MAX_CRAWL_PRODUCTS:
-                    break
-                
-                if on_event:
-                    on_event(EventEmitter.step_progress("4", f"Đang crawl URL {idx}/{len(search_urls)}...", {
-                        "current_url": idx,
-                        "total_urls": len(search_urls),
-                        "products_crawled_so_far": len(all_crawled_products)
-                    }))
-                
-                try:
-                    remaining = MAX_CRAWL_PRODUCTS - len(all_crawled_products)
-                    crawl_limit = min(max_per_url, remaining)
+                on_event(EventEmitter.step_error("3", "Tìm kiếm sản phẩm với AI", "Không tìm thấy sản phẩm nào từ AI search", {"error_type": "no_products_found"}))
+            return {
+                "status": "error",
+                "message": "Không tìm thấy sản phẩm nào từ AI search",
+                "error_type": "no_products_found"
+            }
+        
+        if on_event:
+            on_event(EventEmitter.ai_thinking("3", "Đang tạo các link tìm kiếm trên các sàn thương mại điện tử cho từng sản phẩm..."))
+            on_event(EventEmitter.step_complete("3", f"Đã tìm thấy {len(search_result.recommended_products)} sản phẩm và tạo search links", {
+                "products_found": len(search_result.recommended_products),
+                "ai_analysis": search_result.ai_analysis[:200] + "..." if search_result.ai_analysis else None
+            }))
+        
+        all_crawled_products = []
+        
+        search_urls = self._extract_search_urls(
+            search_result.recommended_products,
+            exclude_platforms=["shopee"]
+        )
+        
+        if on_event:
+            on_event(EventEmitter.step_start("4", "Thu thập thông tin sản phẩm", "Đang thu thập thông tin chi tiết từ các sàn thương mại điện tử..."))
+        
+        max_per_url = max(1, MAX_CRAWL_PRODUCTS // max(len(search_urls), 1))
+        
+        if search_urls:
+            # Results are kept per URL and flattened in search_urls order, so the interleaved
+            # platform order survives and the MAX_CRAWL_PRODUCTS cut does not depend on timing
+            results_by_url: Dict[str, List[CrawledProductItemExtended]] = {}
+            executor = ThreadPoolExecutor(max_workers=min(8, len(search_urls)))
+            try:
+                futures = {
+                    executor.submit(self._crawl_one, search_url, max_per_url): search_url
+                    for search_url in search_urls
+                }
+                for done, future in enumerate(as_completed(futures), 1):
+                    search_url = futures[future]
+                    try:
+                        results_by_url[search_url] = future.result()
+                    except Exception as e:
+                        logger.warning(f"Failed to crawl {search_url}: {str(e)}", exc_info=True)
+                        results_by_url[search_url] = []
                     
-                    scraper = ScraperFactory.get_scraper(search_url)
-                    crawled_items = scraper.crawl_search_results(search_url, max_products=crawl_limit)
+                    # Stop once the URLs at the head of the order, all finished, fill the cut
+                    prefix_count = 0
+                    for url in search_urls:
+                        if url not in results_by_url:
+                            break
+                        prefix_count += len(results_by_url[url])
                     
-                    if crawled_items:
-                        for item in crawled_items:
-                            if len(all_crawled_products) >= MAX_CRAWL_PRODUCTS:
-                                break
-                            
-                            extended = self._convert_to_extended(item, search_url)
-                            all_crawled_products.append(extended)
-                
-                except Exception as e:
-                    logger.warning(f"Failed to crawl {search_url}: {str(e)}", exc_info=True)
-                    continue
-            
-            if not all_crawled_products:
-                if on_event:
-                    on_event(EventEmitter.step_error("4", "Thu thập thông tin sản phẩm", "Không thể crawl được sản phẩm nào từ các search links", {"error_type": "crawl_failed"}))
-                return {
-                    "status": "error",
-                    "message": "Không thể crawl được sản phẩm nào từ các search links. Có thể do: (1) Links không hợp lệ, (2) Platform chặn requests, (3) Network issues. Vui lòng thử lại sau.",
-                    "error_type": "crawl_failed",
-                    "products_found": 0
-                }
-            
-            if on_event:
-                on_event(EventEmitter.step_complete("4", f"Đã thu thập {len(all_crawled_products)} sản phẩm", {"total_crawled": len(all_crawled_products)}))
-            
-            if on_event:
-                on_event(EventEmitter.step_start("5", "Lọc sản phẩm", "Đang lọc sản phẩm theo tiêu chí của bạn..."))
-            
-            filtered_products = all_crawled_products
-            rejected_products_with_reasons = []
-            passed_products_with_reasons = []
-            
-            if filter_criteria:
-                filtered_products, rejected_products_with_reasons, passed_products_with_reasons = self.filter_service.filter_products_with_reasons(
-                    all_crawled_products,
-                    filter_criteria
-                )
-                
-                if len(filtered_products) == 0 and len(all_crawled_products) > 0:
-                    logger.warning(
-                        f"Filter criteria too strict: {len(all_crawled_products)} products found, "
-                        f"but 0 products match criteria"
-                    )
-            
+                    if on_event:
+                        on_event(EventEmitter.step_progress("4", f"Đã crawl URL {done}/{len(search_urls)}...", {
+                            "current_url": done,
+                            "total_urls": len(search_urls),
+                            "products_crawled_so_far": min(MAX_CRAWL_PRODUCTS, sum(map(len, results_by_url.values())))
+                        }))
+                    
+                    if prefix_count >= MAX_CRAWL_PRODUCTS:
+                        break
+            finally:
+                # Do not wait for crawls still running once enough products are in
+                executor.shutdown(wait=False, cancel_futures=True)
+            
+            all_crawled_products = [
+                item
+                for search_url in search_urls
+                for item in results_by_url.get(search_url, ())
+            ][:MAX_CRAWL_PRODUCTS]
+        
+        if not all_crawled_products:
             if on_event:
-                on_event(EventEmitter.step_complete("5", f"Đã lọc xong: {len(filtered_products)}/{len(all_crawled_products)} sản phẩm đạt yêu cầu", {
-                    "total": len(all_crawled_products),
-                    "passed": len(filtered_products),
-                    "rejected": len(all_crawled_products) - len(filtered_products),
-                    "rejected_products": rejected_products_with_reasons[:10],  # Limit to first 10 for performance
-                    "passed_products": passed_products_with_reasons,  # Include all passed products with reasons
-                    "crawled_products_summary": [
-                        {
-                            "product_name": p.product_name[:100],  # Truncate long names
-                            "product_url": p.product_url,
-                            "platform": p.platform,
-                            "price": p.price_current,
-                            "rating": p.rating_score,
-                            "review_count": p.review_count,
-                            "sales_count": p.sales_count,
-                            "is_mall": p.is_mall,
-                            "brand": p.brand
-                        }
-                        for p in all_crawled_products[:20]  # Limit to first 20
-                    ]
-                }))
+                on_event(EventEmitter.step_error("4", "Thu thập thông tin sản phẩm", "Không thể crawl được sản phẩm nào từ các search links", {"error_type": "crawl_failed"}))
+            return {
+                "status": "error",
+                "message": "Không thể crawl được sản phẩm nào từ các search links. Có thể do: (1) Links không hợp lệ, (2) Platform chặn requests, (3) Network issues. Vui lòng thử lại sau.",
+                "error_type": "crawl_failed",
+                "products_found": 0
+            }
+        
+        # Built once and shared by the events and the result; consumers only serialize it
+        crawled_summary = [
+            {
+                "product_name": p.product_name[:100],  # Truncate long names
+                "product_url": p.product_url,
+                "platform": p.platform,
+                "price": p.price_current,
+                "rating": p.rating_score,
+                "review_count": p.review_count,
+                "sales_count": p.sales_count,
+                "is_mall": p.is_mall,
+                "brand": p.brand
+            }
+            for p in all_crawled_products[:20]  # Limit to first 20
+        ]
+        
+        if on_event:
+            on_event(EventEmitter.step_complete("4", f"Đã thu thập {len(all_crawled_products)} sản phẩm", {"total_crawled": len(all_crawled_products)}))
+        
+        if on_event:
+            on_event(EventEmitter.step_start("5", "Lọc sản phẩm", "Đang lọc sản phẩm theo tiêu chí của bạn..."))
+        
+        filtered_products = all_crawled_products
+        rejected_products_with_reasons = RejectionBuffer()
+        passed_products_with_reasons = []
+        
+        if filter_criteria:
+            filtered_products, rejected_products_with_reasons, passed_products_with_reasons = self.filter_service.filter_products_with_reasons(
+                all_crawled_products,
+                filter_criteria
+            )
             
-            ranking_analysis = None
-            if len(filtered_products) > max_products:
-                if on_event:
-                    on_event(EventEmitter.step_start("5.5", "Đánh giá và chọn sản phẩm tốt nhất", "Đang sử dụng AI để đánh giá và chọn ra sản phẩm tốt nhất..."))
-                    on_event(EventEmitter.ai_thinking("5.5", f"Đang so sánh {len(filtered_products)} sản phẩm: xem xét rating, reviews, giá cả, độ tin cậy..."))
-                
-                filtered_products = ranking_service.rank_and_select_products(
-                    products=filtered_products,
-                    user_query=user_query,
-                    filter_criteria=filter_criteria.model_dump(exclude_none=True) if filter_criteria else None,
-                    limit=max_products
+            if len(filtered_products) == 0 and len(all_crawled_products) > 0:
+                logger.warning(
+                    f"Filter criteria too strict: {len(all_crawled_products)} products found, "
+                    f"but 0 products match criteria"
                 )
-                
-                ranking_analysis = getattr(ranking_service, '_last_ranking_analysis', None)
-                
-                if on_event:
-                    on_event(EventEmitter.step_complete("5.5", f"Đã chọn ra {len(filtered_products)} sản phẩm tốt nhất", {
-                        "selected": len(filtered_products),
-                        "analysis": ranking_analysis
-                    }))
-            else:
-                filtered_products = filtered_products[:max_products]
-            
-            if not filtered_products:
-                # Build detailed error message with reasons
-                error_message = f"Không có sản phẩm nào đạt yêu cầu sau khi lọc.\n\n"
-                error_message += f"Đã tìm thấy {len(all_crawled_products)} sản phẩm, nhưng tất cả đều không đạt tiêu chí:\n\n"
-                
-                if rejected_products_with_reasons:
-                    # Show top 5 rejected products with reasons
-                    for idx, rejected in enumerate(rejected_products_with_reasons[:5], 1):
-                        error_message += f"{idx}. {rejected['product_name'][:80]}...\n"
-                        error_message += f"   Lý do: {rejected['reason']}\n"
-                        error_message += f"   Giá: {rejected['price']:,.0f} VND | Rating: {rejected['rating'] or 'N/A'} | Reviews: {rejected['review_count'] or 'N/A'}\n\n"
-                    
-                    if len(rejected_products_with_reasons) > 5:
-                        error_message += f"... và {len(rejected_products_with_reasons) - 5} sản phẩm khác.\n\n"
-                
-                error_message += "Gợi ý: Hãy thử nới lỏng tiêu chí lọc (ví dụ: giảm số review tối thiểu, tăng giá tối đa, hoặc bỏ một số điều kiện)."
-                
-                if on_event:
-                    on_event(EventEmitter.step_error("5", "Lọc sản phẩm", error_message, {
-                        "error_type": "no_products_after_filter",
-                        "rejected_products": rejected_products_with_reasons,
-                        "crawled_products_summary": [
-                            {
-                                "product_name": p.product_name[:100],
-                                "product_url": p.product_url,
-                                "platform": p.platform,
-                                "price": p.price_current,
-                                "rating": p.rating_score,
-                                "review_count": p.review_count,
-                                "sales_count": p.sales_count,
-                                "is_mall": p.is_mall,
-                                "brand": p.brand
-                            }
-                            for p in all_crawled_products[:20]
-                        ]
-                    }))
-                return {
-                    "status": "error",
-                    "message": error_message,
-                    "error_type": "no_products_after_filter",
-                    "products_found": len(all_crawled_products),
-                    "products_filtered": 0,
-                    "rejected_products": rejected_products_with_reasons,
-                    "crawled_products_summary": [
-                        {
-                            "product_name": p.product_name[:100],
-                            "product_url": p.product_url,
-                            "platform": p.platform,
-                            "price": p.price_current,
-                            "rating": p.rating_score,
-                            "review_count": p.review_count,
-                            "sales_count": p.sales_count,
-                            "is_mall": p.is_mall,
-                            "brand": p.brand
-                        }
-                        for p in all_crawled_products[:20]
-                    ]
-                }
-            
+        
+        rejected_top10 = rejected_products_with_reasons.top_n_as_dicts(10)  # Limit to first 10 for performance
+        
+        if on_event:
+            on_event(EventEmitter.step_complete("5", f"Đã lọc xong: {len(filtered_products)}/{len(all_crawled_products)} sản phẩm đạt yêu cầu", {
+                "total": len(all_crawled_products),
+                "passed": len(filtered_products),
+                "rejected": len(all_crawled_products) - len(filtered_products),
+                "rejected_products": rejected_top10,
+                "passed_products": passed_products_with_reasons,  # Include all passed products with reasons
+                "crawled_products_summary": crawled_summary
+            }))
+        
+        ranking_analysis = None
+        if len(filtered_products) > max_products * RANKING_LLM_THRESHOLD_RATIO:
             if on_event:
-                on_event(EventEmitter.step_start("6", "Lưu sản phẩm", "Đang lưu sản phẩm vào database..."))
+                on_event(EventEmitter.step_start("5.5", "Đánh giá và chọn sản phẩm tốt nhất", "Đang sử dụng AI để đánh giá và chọn ra sản phẩm tốt nhất..."))
+                on_event(EventEmitter.ai_thinking("5.5", f"Đang so sánh {len(filtered_products)} sản phẩm: xem xét rating, reviews, giá cả, độ tin cậy..."))
             
-            imported_ids = self.import_service.import_products(
+            ranking_result = ranking_service.rank_and_select_products(
                 products=filtered_products,
-                project_id=project_id,
-                user_id=user_id
+                user_query=user_query,
+                filter_criteria=criteria_dump,
+                limit=max_products
             )
             
-            if on_event and len(filtered_products) > 1:
-                for idx in range(1, len(filtered_products) + 1):
-                    on_event(EventEmitter.step_progress("6", f"Đang lưu sản phẩm {idx}/{len(filtered_products)}...", {
-                        "imported": min(idx, len(imported_ids)),
-                        "total": len(filtered_products)
-                    }))
+            filtered_products = ranking_result.products
+            ranking_analysis = ranking_result.analysis
             
-            if len(imported_ids) == 0:
-                if on_event:
-                    on_event(EventEmitter.step_error("6", "Lưu sản phẩm", "Không thể import sản phẩm nào vào database", {"error_type": "import_failed"}))
-                return {
-                    "status": "error",
-                    "message": "Không thể import sản phẩm nào vào database. Có thể do lỗi permission hoặc duplicate.",
-                    "error_type": "import_failed",
-                    "products_found": len(all_crawled_products),
-                    "products_filtered": len(filtered_products),
-                    "products_imported": 0
-                }
+            if on_event:
+                on_event(EventEmitter.step_complete("5.5", f"Đã chọn ra {len(filtered_products)} sản phẩm tốt nhất", {
+                    "selected": len(filtered_products),
+                    "analysis": ranking_analysis
+                }))
+        elif len(filtered_products) > max_products:
+            # Only slightly oversubscribed: a local sort is nearly as good as an LLM round-trip
+            filtered_products = ProductRankingService.rank_heuristically(filtered_products, limit=max_products).products
             
             if on_event:
-                on_event(EventEmitter.step_complete("6", f"Đã lưu {len(imported_ids)} sản phẩm thành công", {
-                    "imported": len(imported_ids),
-                    "product_ids": [str(product_id) for product_id in imported_ids]  # Convert UUID to string
+                on_event(EventEmitter.step_complete("5.5", f"Đã chọn ra {len(filtered_products)} sản phẩm tốt nhất (xếp hạng theo rating, reviews, giá)", {
+                    "selected": len(filtered_products),
+                    "ranking_method": "heuristic"
                 }))
+        else:
+            filtered_products = filtered_products[:max_products]
+        
+        if not filtered_products:
+            # Build detailed error message with reasons
+            error_message = f"Không có sản phẩm nào đạt yêu cầu sau khi lọc.\n\n"
+            error_message += f"Đã tìm thấy {len(all_crawled_products)} sản phẩm, nhưng tất cả đều không đạt tiêu chí:\n\n"
+            
+            rejected_all = rejected_products_with_reasons.top_n_as_dicts()
+            
+            if rejected_all:
+                # Show top 5 rejected products with reasons
+                for idx, rejected in enumerate(rejected_all[:5], 1):
+                    error_message += f"{idx}. {rejected['product_name'][:80]}...\n"
+                    error_message += f"   Lý do: {rejected['reason']}\n"
+                    error_message += f"   Giá: {rejected['price']:,.0f} VND | Rating: {rejected['rating'] or 'N/A'} | Reviews: {rejected['review_count'] or 'N/A'}\n\n"
+                
+                if len(rejected_products_with_reasons) > 5:
+                    error_message += f"... và {len(rejected_products_with_reasons) - 5} sản phẩm khác.\n\n"
             
-            message = f"Đã import {len(imported_ids)} sản phẩm thành công"
-            if len(imported_ids) < len(filtered_products):
-                message += f" ({len(filtered_products) - len(imported_ids)} sản phẩm bị bỏ qua do duplicate hoặc lỗi)"
+            error_message += "Gợi ý: Hãy thử nới lỏng tiêu chí lọc (ví dụ: giảm số review tối thiểu, tăng giá tối đa, hoặc bỏ một số điều kiện)."
             
-            result = {
-                "status": "success",
-                "message": message,
-                "filter_criteria": filter_criteria.model_dump(exclude_none=True) if filter_criteria else None,
+            if on_event:
+                on_event(EventEmitter.step_error("5", "Lọc sản phẩm", error_message, {
+                    "error_type": "no_products_after_filter",
+                    "rejected_products": rejected_all,
+                    "crawled_products_summary": crawled_summary
+                }))
+            return {
+                "status": "error",
+                "message": error_message,
+                "error_type": "no_products_after_filter",
                 "products_found": len(all_crawled_products),
-                "products_filtered": len(filtered_products),
-                "products_imported": len(imported_ids),
-                "imported_product_ids": [str(product_id) for product_id in imported_ids]  # Convert UUID to string
+                "products_filtered": 0,
+                "rejected_products": rejected_all,
+                "crawled_products_summary": crawled_summary
             }
+        
+        if on_event:
+            on_event(EventEmitter.step_start("6", "Lưu sản phẩm", "Đang lưu sản phẩm vào database..."))
+        
+        imported_ids = []
+        for product_id, idx in self.import_service.iter_import_products(
+            products=filtered_products,
+            project_id=project_id,
+            user_id=user_id
+        ):
+            if product_id is not None:
+                imported_ids.append(product_id)
             
-            if ranking_analysis:
-                result["ai_analysis"] = ranking_analysis
-            
-            # Include rejected products info if available
-            if rejected_products_with_reasons:
-                result["rejected_products"] = rejected_products_with_reasons[:10]  # Limit to first 10
-                result["rejected_count"] = len(rejected_products_with_reasons)
-            
-            # Include passed products info if available
-            if passed_products_with_reasons:
-                result["passed_products"] = passed_products_with_reasons
-                result["passed_count"] = len(passed_products_with_reasons)
-            
-            # Include crawled products summary
-            result["crawled_products_summary"] = [
-                {
-                    "product_name": p.product_name[:100],
-                    "product_url": p.product_url,
-                    "platform": p.platform,
-                    "price": p.price_current,
-                    "rating": p.rating_score,
-                    "review_count": p.review_count,
-                    "sales_count": p.sales_count,
-                    "is_mall": p.is_mall,
-                    "brand": p.brand
-                }
-                for p in all_crawled_products[:20]  # Limit to first 20
-            ]
-            
+            if on_event and len(filtered_products) > 1:
+                on_event(EventEmitter.step_progress("6", f"Đang lưu sản phẩm {idx}/{len(filtered_products)}...", {
+                    "imported": len(imported_ids),
+                    "total": len(filtered_products)
+                }))
+        
+        if len(imported_ids) == 0:
             if on_event:
-                on_event(EventEmitter.final_result(f"Hoàn thành! Đã tìm và lưu {len(imported_ids)} sản phẩm thành công", result))
-            
-            return result
-            
-        except Exception as e:
-            logger.error(f"Auto discovery failed: {str(e)}", exc_info=True)
+                on_event(EventEmitter.step_error("6", "Lưu sản phẩm", "Không thể import sản phẩm nào vào database", {"error_type": "import_failed"}))
             return {
                 "status": "error",
-                "message": f"Lỗi trong quá trình tự động hóa: {str(e)}",
-                "error_type": "execution_error"
+                "message": "Không thể import sản phẩm nào vào database. Có thể do lỗi permission hoặc duplicate.",
+                "error_type": "import_failed",
+                "products_found": len(all_crawled_products),
+                "products_filtered": len(filtered_products),
+                "products_imported": 0
             }
+        
+        if on_event:
+            on_event(EventEmitter.step_complete("6", f"Đã lưu {len(imported_ids)} sản phẩm thành công", {
+                "imported": len(imported_ids),
+                "product_ids": [str(product_id) for product_id in imported_ids]  # Convert UUID to string
+            }))
+        
+        message = f"Đã import {len(imported_ids)} sản phẩm thành công"
+        if len(imported_ids) < len(filtered_products):
+            message += f" ({len(filtered_products) - len(imported_ids)} sản phẩm bị bỏ qua do duplicate hoặc lỗi)"
+        
+        result = {
+            "status": "success",
+            "message": message,
+            "filter_criteria": criteria_dump,
+            "products_found": len(all_crawled_products),
+            "products_filtered": len(filtered_products),
+            "products_imported": len(imported_ids),
+            "imported_product_ids": [str(product_id) for product_id in imported_ids]  # Convert UUID to string
+        }
+        
+        if ranking_analysis:
+            result["ai_analysis"] = ranking_analysis
+        
+        # Include rejected products info if available
+        if rejected_products_with_reasons:
+            result["rejected_products"] = rejected_top10
+            result["rejected_count"] = len(rejected_products_with_reasons)
+        
+        # Include passed products info if available
+        if passed_products_with_reasons:
+            result["passed_products"] = passed_products_with_reasons
+            result["passed_count"] = len(passed_products_with_reasons)
+        
+        # Include crawled products summary
+        result["crawled_products_summary"] = crawled_summary
+        
+        if on_event:
+            on_event(EventEmitter.final_result(f"Hoàn thành! Đã tìm và lưu {len(imported_ids)} sản phẩm thành công", result))
+        
+        return result
+    
+    def _crawl_one(self, search_url: str, crawl_limit: int) -> List[CrawledProductItemExtended]:
+        platform = self._platform_of_url(search_url)
+        if platform:
+            scraper = ScraperFactory.get_scraper_for_platform(platform)
+        else:
+            scraper = ScraperFactory.get_scraper(search_url)
+        crawled_items = scraper.crawl_search_results(search_url, max_products=crawl_limit)
+        if not crawled_items:
+            return []
+        return [self._convert_to_extended(item, search_url) for item in crawled_items]
+    
+    @staticmethod
+    def _platform_of_url(url: str) -> Optional[str]:
+        match = _PLATFORM_RE.search(url)
+        return match.group(1).lower() if match else None
     
     def _extract_search_urls(self, products: List[Any], exclude_platforms: List[str] = None) -> List[str]:
         if exclude_platforms is None:
-            exclude_platforms = ["shopee"]
-        
-        exclude_platforms_lower = [p.lower() for p in exclude_platforms]
+            exclude_re = _DEFAULT_EXCLUDE_RE
+        elif exclude_platforms:
+            exclude_re = re.compile('|'.join(map(re.escape, exclude_platforms)), re.IGNORECASE)
+        else:
+            exclude_re = _EXCLUDE_NOTHING_RE
         urls = []
         
         for product in products:
             if hasattr(product, 'url') and product.url:
-                url_lower = product.url.lower()
-                if not any(platform in url_lower for platform in exclude_platforms_lower):
+                if not exclude_re.search(product.url):
                     urls.append(product.url)
             elif hasattr(product, 'urls'):
                 if hasattr(product.urls, 'lazada') and product.urls.lazada:
                     urls.append(product.urls.lazada)
                 if hasattr(product.urls, 'tiki') and product.urls.tiki:
                     urls.append(product.urls.tiki)
-                if "shopee" not in exclude_platforms_lower:
+                if not exclude_re.fullmatch("shopee"):
                     if hasattr(product.urls, 'shopee') and product.urls.shopee:
                         urls.append(product.urls.shopee)
             elif isinstance(product, dict):
                 if 'url' in product:
                     url = product['url']
-                    url_lower = url.lower()
-                    if not any(platform in url_lower for platform in exclude_platforms_lower):
+                    if not exclude_re.search(url):
                         urls.append(url)
                 elif 'urls' in product:
                     urls_dict = product['urls']
                     if isinstance(urls_dict, dict):
                         for platform, url in urls_dict.items():
-                            if url and platform.lower() not in exclude_platforms_lower:
+                            if url and not exclude_re.fullmatch(platform):
                                 urls.append(url)
         
-        return list(set(urls))
+        # dict.fromkeys dedupes while keeping the AI's ordering stable
+        by_platform: Dict[Optional[str], List[str]] = {}
+        for url in dict.fromkeys(urls):
+            by_platform.setdefault(self._platform_of_url(url), []).append(url)
+        
+        # Alternate platforms so neither is starved, and never crawl more URLs than products we keep
+        interleaved = [url for batch in zip_longest(*by_platform.values()) for url in batch if url is not None]
+        return interleaved[:MAX_CRAWL_PRODUCTS]
     
     def _convert_to_extended(
         self,
@@ -576,15 +840,8 @@ class AutoDiscoveryService:
                 if isinstance(item.price, (int, float)):
                     price = float(item.price)
                 elif isinstance(item.price, str):
-                    price_str = item.price.replace(',', '').replace('₫', '').replace('đ', '').replace('VND', '').replace('vnd', '').strip()
-                    if '.' in price_str:
-                        parts = price_str.split('.')
-                        if len(parts) > 1 and len(parts[-1]) == 3 and len(parts) == 2:
-                            if len(parts[0]) >= 1:
-                                price_str = ''.join(parts)
-                        elif len(parts) > 2:
-                            price_str = ''.join(parts)
-                    price = float(price_str)
+                    price_str = _PRICE_STRIP_RE.sub('', item.price)
+                    price = float(_strip_thousand_dots(price_str))
             except (ValueError, TypeError) as e:
                 logger.warning(f"Failed to parse price '{item.price}': {str(e)}")
                 price = 0.0
@@ -1,16 +1,18 @@
 import asyncio
 import logging
+from collections import deque
 from uuid import UUID
 from typing import Optional, AsyncGenerator
 from sqlalchemy.orm import Session
-from queue import Queue
-import threading
 
 from services.features.product_intelligence.orchestration.auto_discovery_service import AutoDiscoveryService
-from services.features.product_intelligence.orchestration.streaming_events import EventEmitter
+from services.features.product_intelligence.orchestration.streaming_events import EventEmitter, STEP_PROGRESS
 
 logger = logging.getLogger(__name__)
 
+# Số event tồn tối đa trước khi bỏ bớt step_progress (client SSE đọc chậm hơn worker)
+EVENT_QUEUE_HIGH_WATER = 256
+
 
 class AutoDiscoveryStreamingService:
     """Wrapper service để emit events trong quá trình auto discovery với SSE streaming"""
@@ -36,53 +38,52 @@ class AutoDiscoveryStreamingService:
         Yields:
             Event dictionaries để gửi qua SSE (yield ngay khi có event)
         """
-        event_queue = Queue()
-        result_container = {"result": None, "error": None}
+        loop = asyncio.get_running_loop()
+        pending: deque = deque()
+        cond = asyncio.Condition()
+        
+        async def put_event(event: Optional[dict]):
+            async with cond:
+                # Quá high-water mark thì bỏ step_progress; step_start/complete/error và sentinel luôn được giữ
+                if event is not None and len(pending) >= EVENT_QUEUE_HIGH_WATER and event.get("type") == STEP_PROGRESS:
+                    return
+                pending.append(event)
+                cond.notify()
         
-        def collect_event(event: dict):
-            """Collect events và put vào queue để yield real-time"""
-            event_queue.put(event)
+        def collect_event(event: Optional[dict]):
+            """Đẩy event từ worker thread sang event loop; generator nhận ngay, không cần polling"""
+            asyncio.run_coroutine_threadsafe(put_event(event), loop)
         
         def run_discovery():
             """Run discovery in separate thread để không block async generator"""
             try:
-                result = self.auto_discovery_service.execute_auto_discovery_from_natural_language(
+                self.auto_discovery_service.execute_auto_discovery_from_natural_language(
                     project_id=project_id,
                     user_id=user_id,
                     user_input=user_input,
                     on_event=collect_event
                 )
-                result_container["result"] = result
             except Exception as e:
                 logger.error(f"Streaming execution failed: {str(e)}", exc_info=True)
-                result_container["error"] = str(e)
-                event_queue.put(EventEmitter.step_error(
+                collect_event(EventEmitter.step_error(
                     "unknown",
                     "Lỗi hệ thống",
                     f"Lỗi trong quá trình thực thi: {str(e)}",
                     {"error_type": "execution_error"}
                 ))
             finally:
-                event_queue.put(None)
+                collect_event(None)
         
-        thread = threading.Thread(target=run_discovery, daemon=True)
-        thread.start()
+        task = asyncio.create_task(asyncio.to_thread(run_discovery))
         
         try:
             while True:
-                try:
-                    event = event_queue.get(timeout=0.1)
-                    if event is None:
-                        break
-                    yield event
-                except:
-                    if not thread.is_alive():
-                        if result_container["error"]:
-                            break
-                        await asyncio.sleep(0.05)
-                        continue
-                    await asyncio.sleep(0.05)
+                async with cond:
+                    await cond.wait_for(lambda: pending)
+                    event = pending.popleft()
+                if event is None:
+                    break
+                yield event
         finally:
-            if thread.is_alive():
-                thread.join(timeout=5)
-
+            if not task.done():
+                await asyncio.wait({task}, timeout=5)
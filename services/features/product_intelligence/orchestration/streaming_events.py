@@ -1,5 +1,33 @@
-from datetime import datetime
-from typing import Optional, Dict, Any
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Callable, List
+
+logger = logging.getLogger(__name__)
+
+STEP_START = "step_start"
+AI_THINKING = "ai_thinking"
+STEP_PROGRESS = "step_progress"
+STEP_COMPLETE = "step_complete"
+STEP_ERROR = "step_error"
+FINAL_RESULT = "final_result"
+
+# (millisecond, chuỗi ISO) của timestamp gần nhất; các event phát cùng một ms dùng lại chuỗi đã format
+_ts_cache = (0, "")
+
+
+def _now_iso() -> str:
+    """Timestamp UTC dạng ISO8601 với độ phân giải millisecond"""
+    global _ts_cache
+    ms = time.time_ns() // 1_000_000
+    cached = _ts_cache
+    if cached[0] == ms:
+        return cached[1]
+    iso = datetime.fromtimestamp(ms / 1000, timezone.utc).replace(tzinfo=None).isoformat(timespec="milliseconds")
+    _ts_cache = (ms, iso)
+    return iso
 
 
 class EventEmitter:
@@ -9,31 +37,31 @@ class EventEmitter:
     def step_start(step: str, step_name: str, message: str) -> Dict[str, Any]:
         """Emit khi bắt đầu một step"""
         return {
-            "type": "step_start",
+            "type": STEP_START,
             "step": step,
             "step_name": step_name,
             "message": message,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": _now_iso()
         }
     
     @staticmethod
     def ai_thinking(step: str, message: str) -> Dict[str, Any]:
         """Emit khi AI đang suy nghĩ/processing"""
         return {
-            "type": "ai_thinking",
+            "type": AI_THINKING,
             "step": step,
             "message": message,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": _now_iso()
         }
     
     @staticmethod
     def step_progress(step: str, message: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Emit progress update trong một step"""
         event = {
-            "type": "step_progress",
+            "type": STEP_PROGRESS,
             "step": step,
             "message": message,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": _now_iso()
         }
         if data:
             event["data"] = data
@@ -43,10 +71,10 @@ class EventEmitter:
     def step_complete(step: str, message: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Emit khi hoàn thành một step"""
         event = {
-            "type": "step_complete",
+            "type": STEP_COMPLETE,
             "step": step,
             "message": message,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": _now_iso()
         }
         if data:
             event["data"] = data
@@ -56,11 +84,11 @@ class EventEmitter:
     def step_error(step: str, step_name: str, message: str, error: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Emit khi có lỗi ở một step"""
         event = {
-            "type": "step_error",
+            "type": STEP_ERROR,
             "step": step,
             "step_name": step_name,
             "message": message,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": _now_iso()
         }
         if error:
             event["error"] = error
@@ -70,10 +98,70 @@ class EventEmitter:
     def final_result(message: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """Emit kết quả cuối cùng"""
         return {
-            "type": "final_result",
+            "type": FINAL_RESULT,
             "message": message,
             "data": data,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": _now_iso()
         }
 
 
+class EventSink:
+    """
+    Buffer events vào queue, thread nền gọi callback gốc để orchestrator không bị chặn bởi consumer chậm (SSE/WebSocket).
+    
+    Các step_progress liên tiếp của cùng một step khi chưa được gửi sẽ được gộp lại, chỉ giữ event mới nhất.
+    Instance callable nên có thể truyền thẳng làm on_event.
+    """
+    
+    def __init__(self, callback: Callable[[Dict[str, Any]], None]):
+        self._callback = callback
+        self._cond = threading.Condition()
+        # Mỗi phần tử là slot [event] để progress event mới có thể ghi đè event cũ tại chỗ
+        self._pending: deque = deque()
+        self._progress_slots: Dict[str, List[Dict[str, Any]]] = {}
+        self._closed = False
+        self._thread = threading.Thread(target=self._drain, name="event-sink", daemon=True)
+        self._thread.start()
+    
+    def emit_nowait(self, event: Dict[str, Any]) -> None:
+        """Đưa event vào queue, không chờ callback"""
+        with self._cond:
+            if self._closed:
+                logger.warning(f"EventSink closed, dropping event: {event.get('type')}")
+                return
+            if event.get("type") == STEP_PROGRESS:
+                slot = self._progress_slots.get(event.get("step"))
+                if slot is not None:
+                    slot[0] = event
+                    return
+                slot = [event]
+                self._progress_slots[event.get("step")] = slot
+            else:
+                slot = [event]
+            self._pending.append(slot)
+            self._cond.notify()
+    
+    __call__ = emit_nowait
+    
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Flush các event còn lại rồi dừng thread nền"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+    
+    def _drain(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                slot = self._pending.popleft()
+                event = slot[0]
+                if self._progress_slots.get(event.get("step")) is slot:
+                    del self._progress_slots[event.get("step")]
+            try:
+                self._callback(event)
+            except Exception as e:
+                logger.error(f"Event callback failed: {str(e)}", exc_info=True)
@@ -1,5 +1,5 @@
 import logging
-from typing import List, Optional
+from typing import List, NamedTuple, Optional
 
 from core.llm.base import BaseAgent
 from core.llm.utils import safe_json_parse
@@ -7,13 +7,22 @@ from schemas.product_crawler import CrawledProductItemExtended
 
 logger = logging.getLogger(__name__)
 
+# AI often truncates or embellishes long listing titles; a prefix this long that only one product has
+# identifies it, a prefix shared by several (model variants) falls back to the substring scan
+NAME_PREFIX_LENGTH = 32
+
+
+class RankingResult(NamedTuple):
+    """Selected products plus the AI's analysis (None when the LLM was not used or failed)"""
+    products: List[CrawledProductItemExtended]
+    analysis: Optional[str] = None
+
 
 class ProductRankingService:
     """AI service to rank and select best products from filtered list"""
     
     def __init__(self, llm_agent: BaseAgent):
         self.llm = llm_agent
-        self._last_ranking_analysis = None
     
     def rank_and_select_products(
         self,
@@ -21,7 +30,7 @@ class ProductRankingService:
         user_query: str,
         filter_criteria: Optional[dict] = None,
         limit: int = 10
-    ) -> List[CrawledProductItemExtended]:
+    ) -> RankingResult:
         """
         Use AI to rank products and select the best ones
         
@@ -32,15 +41,15 @@ class ProductRankingService:
             limit: Maximum number of products to return
         
         Returns:
-            List of top-ranked products
+            RankingResult with the top-ranked products and the AI analysis
         """
         
         if not products:
-            return []
+            return RankingResult([])
         
         if len(products) <= limit:
             # If already within limit, return as is
-            return products
+            return RankingResult(products)
         
         # Create products summary for AI
         products_summary = self._create_products_summary(products)
@@ -65,14 +74,14 @@ class ProductRankingService:
             
             if not ranking_result:
                 logger.warning("Failed to parse ranking result, using original order")
-                return products[:limit]
+                return RankingResult(products[:limit])
             
             # Extract selected product URLs/names
             selected_products = ranking_result.get("top_products", [])
             
             if not selected_products:
                 logger.warning("No products selected by AI, using original order")
-                return products[:limit]
+                return RankingResult(products[:limit])
             
             # Map AI selection back to original products
             ranked_products = self._map_ai_selection_to_products(
@@ -81,44 +90,53 @@ class ProductRankingService:
             )
             
             logger.info(f"AI ranked and selected {len(ranked_products)} products from {len(products)} candidates")
-            return ranked_products[:limit]
+            return RankingResult(ranked_products[:limit], ranking_result.get("analysis"))
             
         except Exception as e:
             logger.error(f"AI ranking failed: {str(e)}", exc_info=True)
             # Fallback: return first N products
-            return products[:limit]
+            return RankingResult(products[:limit])
+    
+    @staticmethod
+    def rank_heuristically(
+        products: List[CrawledProductItemExtended],
+        limit: int = 10
+    ) -> RankingResult:
+        """Rank by rating, then review count, then lower price - no LLM call"""
+        ranked = sorted(
+            products,
+            key=lambda p: (
+                -(p.rating_score or 0),
+                -(p.review_count or 0),
+                p.price_current if p.price_current else float("inf")
+            )
+        )
+        return RankingResult(ranked[:limit])
     
     def _create_products_summary(self, products: List[CrawledProductItemExtended]) -> str:
         """Create a summary string of products for AI prompt"""
-        
-        summary_lines = []
-        for idx, product in enumerate(products, 1):
-            rating_str = f"{product.rating_score:.1f}" if product.rating_score else "N/A"
-            review_str = f"{product.review_count}" if product.review_count else "N/A"
-            sales_str = f"{product.sales_count:,}" if product.sales_count else "N/A"
-            mall_str = "Mall" if product.is_mall else "Thường"
-            
-            line = (
-                f"{idx}. {product.product_name}\n"
-                f"   - Giá: {product.price_current:,.0f} VND\n"
-                f"   - Rating: {rating_str}/5.0\n"
-                f"   - Reviews: {review_str}\n"
-                f"   - Đã bán: {sales_str}\n"
-                f"   - Platform: {product.platform}\n"
-                f"   - Loại: {mall_str}\n"
-            )
-            
-            if product.brand:
-                line += f"   - Thương hiệu: {product.brand}\n"
-            
-            if product.trust_score:
-                line += f"   - Trust Score: {product.trust_score:.1f}/100\n"
-            
-            line += f"   - URL: {product.product_url}\n"
-            
-            summary_lines.append(line)
-        
-        return "\n".join(summary_lines)
+        return "\n".join(self._format_product_line(idx, p) for idx, p in enumerate(products, 1))
+    
+    @staticmethod
+    def _format_product_line(idx: int, p: CrawledProductItemExtended) -> str:
+        """One product entry of the ranking prompt, built as a single f-string"""
+        rating_str = f"{p.rating_score:.1f}" if p.rating_score else "N/A"
+        review_str = p.review_count if p.review_count else "N/A"
+        sales_str = f"{p.sales_count:,}" if p.sales_count else "N/A"
+        mall_str = "Mall" if p.is_mall else "Thường"
+        brand_line = f"   - Thương hiệu: {p.brand}\n" if p.brand else ""
+        trust_line = f"   - Trust Score: {p.trust_score:.1f}/100\n" if p.trust_score else ""
+        return (
+            f"{idx}. {p.product_name}\n"
+            f"   - Giá: {p.price_current:,.0f} VND\n"
+            f"   - Rating: {rating_str}/5.0\n"
+            f"   - Reviews: {review_str}\n"
+            f"   - Đã bán: {sales_str}\n"
+            f"   - Platform: {p.platform}\n"
+            f"   - Loại: {mall_str}\n"
+            f"{brand_line}{trust_line}"
+            f"   - URL: {p.product_url}\n"
+        )
     
     def _build_ranking_prompt(
         self,
@@ -204,12 +222,21 @@ Lưu ý:
         # Create lookup by URL (most reliable)
         products_by_url = {p.product_url: p for p in original_products}
         
-        # Create lookup by name (fallback)
+        # Normalize names once; every lookup below reuses them
+        normalized = [(p, p.product_name.lower().strip()) for p in original_products]
+        
+        # Create lookup by name (fallback); first occurrence wins
         products_by_name = {}
-        for p in original_products:
-            name_lower = p.product_name.lower().strip()
-            if name_lower not in products_by_name:
-                products_by_name[name_lower] = p
+        # Prefixes shared by different products are ambiguous and stored as None
+        products_by_prefix = {}
+        for p, name_lower in normalized:
+            products_by_name.setdefault(name_lower, p)
+            prefix = name_lower[:NAME_PREFIX_LENGTH]
+            if products_by_prefix.setdefault(prefix, p) is not p:
+                products_by_prefix[prefix] = None
+        
+        # The AI may list one product twice (or two entries may map to the same one)
+        seen = set()
         
         for selected in ai_selected:
             product = None
@@ -225,18 +252,21 @@ Lưu ý:
                 if name in products_by_name:
                     product = products_by_name[name]
             
-            # Try fuzzy match by name
+            # Try fuzzy match by name: unambiguous prefix first, then substring scan
             if not product:
                 name = selected.get("product_name", "").strip().lower()
-                for orig_product in original_products:
-                    orig_name = orig_product.product_name.lower().strip()
-                    # Check if names are similar (contains or similar)
-                    if name in orig_name or orig_name in name:
-                        product = orig_product
-                        break
+                product = products_by_prefix.get(name[:NAME_PREFIX_LENGTH])
+                if not product:
+                    for orig_product, orig_name in normalized:
+                        # Check if names are similar (contains or similar)
+                        if name in orig_name or orig_name in name:
+                            product = orig_product
+                            break
             
             if product:
-                ranked_products.append(product)
+                if id(product) not in seen:
+                    seen.add(id(product))
+                    ranked_products.append(product)
             else:
                 logger.warning(f"Could not map AI selected product: {selected.get('product_name')}")
         
@@ -0,0 +1,93 @@
+import os
+import sys
+
+import pytest
+
+# Add project root to path
+sys.path.append(os.getcwd())
+os.environ['APP_ENV'] = 'dev'
+
+from services.features.product_intelligence.ai.llm_cache import SemanticLLMCache, cache_scope
+
+
+@pytest.fixture
+def constant_embedder():
+    """Every input embeds to the same unit vector: the worst case for numeric near-duplicates"""
+    np = pytest.importorskip("numpy")
+    return lambda text: np.ones(4, dtype="float32") / 2.0
+
+
+def test_exact_match_is_default_and_numbers_do_not_collide():
+    cache = SemanticLLMCache("test_exact_default")
+    assert cache.semantic is False
+
+    cache.set("Tai nghe dưới 1 triệu", {"max_price": 1000000})
+
+    assert cache.get("TAI NGHE  dưới 1 triệu ") == {"max_price": 1000000}
+    assert cache.get("Tai nghe dưới 2 triệu") is None
+
+
+def test_comparison_operators_are_part_of_the_key():
+    cache = SemanticLLMCache("test_operators")
+    cache.set("giá < 500k", {"max_price": 500000})
+
+    assert cache.get("giá > 500k") is None
+    assert cache.get("GIÁ  < 500k") == {"max_price": 500000}
+
+
+def test_scope_isolates_entries():
+    cache = SemanticLLMCache("test_scope")
+    cache.set("rating trên 4", {"min_rating": 4.0}, scope="tai nghe")
+
+    assert cache.get("rating trên 4", scope="chuột") is None
+
+
+def test_cache_scope_changes_with_any_project_field():
+    project_info = {"target_product_name": "tai nghe", "target_budget_range": 500000.0, "currency": "VND"}
+
+    assert cache_scope("p1", project_info) == cache_scope("p1", dict(project_info))
+    assert cache_scope("p1", project_info) != cache_scope("p2", project_info)
+    assert cache_scope("p1", project_info) != cache_scope("p1", {**project_info, "target_budget_range": 1000000.0})
+
+
+@pytest.mark.parametrize("stored, query", [
+    ("tai nghe dưới 1 triệu", "tai nghe dưới 2 triệu"),
+    ("rating trên 4", "rating trên 3"),
+    ("hơn 100 reviews", "hơn 1000 reviews"),
+    ("giá < 500k", "giá > 500k"),
+])
+def test_semantic_lookup_never_crosses_numbers(constant_embedder, stored, query):
+    cache = SemanticLLMCache("test_semantic_numbers", embedder=constant_embedder, semantic=True)
+    cache.set(stored, {"source": stored})
+
+    assert cache.get(query) is None
+
+
+def test_semantic_lookup_hits_rephrasing_with_same_numbers(constant_embedder):
+    cache = SemanticLLMCache("test_semantic_hit", embedder=constant_embedder, semantic=True)
+    cache.set("tai nghe bluetooth dưới 500k", {"max_price": 500000})
+
+    assert cache.get("mua tai nghe bluetooth giá dưới 500k") == {"max_price": 500000}
+
+
+def test_vector_store_is_bounded(constant_embedder):
+    cache = SemanticLLMCache("test_bounded", embedder=constant_embedder, semantic=True, max_vectors=3)
+    for i in range(10):
+        cache.set(f"sản phẩm {i}", i)
+
+    assert len(cache._store) == 3
+
+
+def test_vector_store_drops_expired_entries(constant_embedder, monkeypatch):
+    from services.features.product_intelligence.ai import llm_cache
+
+    cache = SemanticLLMCache("test_expiry", embedder=constant_embedder, semantic=True, ttl=10)
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    cache.set("sản phẩm 1", 1)
+    cache.set("sản phẩm 2", 2)
+
+    now[0] += 11
+    cache.set("sản phẩm 3", 3)
+
+    assert len(cache._store) == 1
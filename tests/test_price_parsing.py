@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+# Add project root to path
+sys.path.append(os.getcwd())
+os.environ['APP_ENV'] = 'dev'
+
+from services.features.product_intelligence.orchestration.auto_discovery_service import (
+    _PRICE_STRIP_RE,
+    _strip_thousand_dots,
+)
+
+
+def parse_price(raw: str) -> float:
+    return float(_strip_thousand_dots(_PRICE_STRIP_RE.sub('', raw)))
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("150.000đ", 150000.0),
+    ("1.234.567 ₫", 1234567.0),
+    ("1,299,000 VND", 1299000.0),
+    # Several dots are always separators, whatever the group sizes
+    ("1.23.45", 12345.0),
+    ("1.234.5", 12345.0),
+    # A single dot not followed by exactly 3 digits stays a decimal point
+    ("12.5", 12.5),
+    ("99.99", 99.99),
+    (".500", 0.5),
+    ("250000", 250000.0),
+])
+def test_price_dots_match_baseline_rules(raw, expected):
+    assert parse_price(raw) == expected
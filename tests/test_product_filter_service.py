@@ -0,0 +1,64 @@
+import os
+import random
+import sys
+
+import pytest
+
+# Add project root to path
+sys.path.append(os.getcwd())
+os.environ['APP_ENV'] = 'dev'
+
+from schemas.product_crawler import CrawledProductItemExtended
+from schemas.product_filter import ProductFilterCriteria
+from services.features.product_intelligence.filtering.product_filter_service import ProductFilterService
+
+
+def _products(count: int = 400, seed: int = 7):
+    rng = random.Random(seed)
+    names = ["Tai nghe Bluetooth", "Chuột không dây", "Bàn phím cơ", "Tai nghe có dây", "Loa mini"]
+    maybe = lambda value: value if rng.random() > 0.2 else None
+    return [
+        CrawledProductItemExtended(
+            platform=rng.choice(["lazada", "tiki", "shopee"]),
+            product_name=f"{rng.choice(names)} {rng.choice(['Pro', 'Lite', 'cũ', 'Max'])} {i}",
+            product_url=f"https://example.vn/p/{i}",
+            price_current=rng.randrange(50_000, 3_000_000, 1_000),
+            rating_score=maybe(round(rng.uniform(1, 5), 1)),
+            review_count=maybe(rng.randrange(0, 5_000)),
+            sales_count=maybe(rng.randrange(0, 20_000)),
+            is_mall=rng.random() < 0.3,
+            is_verified_seller=rng.random() < 0.5,
+            seller_location=maybe(rng.choice(["Hà Nội", "TP. Hồ Chí Minh", "Đà Nẵng"])),
+            brand=maybe(rng.choice(["Sony", "Logitech", "JBL", "Xiaomi"])),
+            trust_badge_type=maybe(rng.choice(["TikiNOW", "Yêu thích", "LazMall"])),
+            trust_score=maybe(rng.uniform(0, 100)),
+        )
+        for i in range(count)
+    ]
+
+
+CRITERIA = [
+    ProductFilterCriteria(),
+    ProductFilterCriteria(min_rating=4.0, max_price=1_000_000),
+    ProductFilterCriteria(max_rating=3.5, min_review_count=100, max_review_count=2_000),
+    ProductFilterCriteria(min_price=200_000, platforms=["lazada", "tiki"], is_mall=True),
+    ProductFilterCriteria(required_keywords=["TAI NGHE"], excluded_keywords=["cũ"], is_verified_seller=False),
+    ProductFilterCriteria(min_sales_count=1_000, min_trust_score=50),
+    ProductFilterCriteria(trust_badge_types=["TikiNOW"], required_brands=["Sony", "JBL"]),
+    ProductFilterCriteria(excluded_brands=["Xiaomi"], seller_locations=["Hà Nội"]),
+]
+
+
+def _expected(service, products, criteria):
+    return [p for p in products if service._matches_criteria_with_reason(p, criteria)[0]]
+
+
+@pytest.mark.parametrize("criteria", CRITERIA)
+def test_filter_products_agrees_with_reasoned_filter(criteria):
+    service = ProductFilterService()
+    products = _products()
+    expected = _expected(service, products, criteria)
+
+    assert service.filter_products(products, criteria) == expected
+    assert service.filter_products_with_reasons(products, criteria)[0] == expected
+
@@ -0,0 +1,39 @@
+import os
+import sys
+from unittest.mock import MagicMock
+
+# Add project root to path
+sys.path.append(os.getcwd())
+os.environ['APP_ENV'] = 'dev'
+
+from schemas.product_crawler import CrawledProductItemExtended
+from services.features.product_intelligence.ranking.product_ranking_service import ProductRankingService
+
+
+def make_product(name: str, url: str) -> CrawledProductItemExtended:
+    return CrawledProductItemExtended(platform="tiki", product_name=name, product_url=url, price_current=1000000.0)
+
+
+XM4 = make_product("Tai nghe Bluetooth không dây Sony WH-1000XM4 chống ồn", "https://tiki.vn/xm4")
+XM5 = make_product("Tai nghe Bluetooth không dây Sony WH-1000XM5 chống ồn", "https://tiki.vn/xm5")
+MOUSE = make_product("Chuột không dây Logitech M331 Silent Plus - Hàng chính hãng", "https://tiki.vn/m331")
+
+
+def map_selection(names):
+    service = ProductRankingService(MagicMock())
+    return service._map_ai_selection_to_products(
+        [{"product_name": name} for name in names],
+        [XM4, XM5, MOUSE]
+    )
+
+
+def test_shared_prefix_variants_resolve_by_substring():
+    assert map_selection(["Tai nghe Bluetooth không dây Sony WH-1000XM5"]) == [XM5]
+
+
+def test_unique_prefix_matches_embellished_name():
+    assert map_selection(["Chuột không dây Logitech M331 Silent Plus (chính hãng, bảo hành 12 tháng)"]) == [MOUSE]
+
+
+def test_products_are_not_repeated():
+    assert map_selection([XM4.product_name, "tai nghe bluetooth không dây sony wh-1000xm4", XM5.product_name]) == [XM4, XM5]